@@ -19,6 +19,9 @@ class DynamoTables(Enum):
     RESERVATIONS = "Reservations"
     USER_STATS = "UserStats"
     HOLDS = "Holds"
+    SLOT_AVAILABILITY = "SlotAvailability"
+    RECOMMENDATION_SCORES = "RecommendationScores"
+    CONFIRMATION_CODES = "ConfirmationCodes"
 
 # DynamoDB table schemas
 TABLE_SCHEMAS = {
@@ -28,9 +31,19 @@ TABLE_SCHEMAS = {
             {"AttributeName": "userId", "KeyType": "HASH"}
         ],
         "AttributeDefinitions": [
-            {"AttributeName": "userId", "AttributeType": "S"}
+            {"AttributeName": "userId", "AttributeType": "S"},
+            {"AttributeName": "email", "AttributeType": "S"}
         ],
-        "BillingMode": "PAY_PER_REQUEST"
+        "BillingMode": "PAY_PER_REQUEST",
+        "GlobalSecondaryIndexes": [
+            {
+                "IndexName": "UsersByEmail",
+                "KeySchema": [
+                    {"AttributeName": "email", "KeyType": "HASH"},
+                ],
+                "Projection": {"ProjectionType": "ALL"}
+            }
+        ]
     },
     DynamoTables.RESTAURANTS.value: {
         "TableName": DynamoTables.RESTAURANTS.value,
@@ -51,8 +64,19 @@ TABLE_SCHEMAS = {
         "AttributeDefinitions": [
             {"AttributeName": "userId", "AttributeType": "S"},
             {"AttributeName": "restaurantId", "AttributeType": "S"},
+            {"AttributeName": "likedAt", "AttributeType": "S"},
         ],
-        "BillingMode": "PAY_PER_REQUEST"
+        "BillingMode": "PAY_PER_REQUEST",
+        "GlobalSecondaryIndexes": [
+            {
+                "IndexName": "UserFavoritesByLikedAt",
+                "KeySchema": [
+                    {"AttributeName": "userId", "KeyType": "HASH"},
+                    {"AttributeName": "likedAt", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"}
+            }
+        ]
     },
     DynamoTables.RESERVATIONS.value: {
         "TableName": DynamoTables.RESERVATIONS.value,
@@ -93,12 +117,100 @@ TABLE_SCHEMAS = {
         ],
         "AttributeDefinitions": [
             {"AttributeName": "holdId", "AttributeType": "S"},
+            {"AttributeName": "userId", "AttributeType": "S"},
+            {"AttributeName": "ttl", "AttributeType": "N"}
+        ],
+        "BillingMode": "PAY_PER_REQUEST",
+        "GlobalSecondaryIndexes": [
+            {
+                "IndexName": "UserHolds",
+                "KeySchema": [
+                    {"AttributeName": "userId", "KeyType": "HASH"},
+                    {"AttributeName": "ttl", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"}
+            }
+        ]
+    },
+    DynamoTables.SLOT_AVAILABILITY.value: {
+        "TableName": DynamoTables.SLOT_AVAILABILITY.value,
+        "KeySchema": [
+            {"AttributeName": "slotKey", "KeyType": "HASH"},
+            {"AttributeName": "time", "KeyType": "RANGE"},
+        ],
+        "AttributeDefinitions": [
+            {"AttributeName": "slotKey", "AttributeType": "S"},
+            {"AttributeName": "time", "AttributeType": "S"},
         ],
         "BillingMode": "PAY_PER_REQUEST"
     },
+    DynamoTables.RECOMMENDATION_SCORES.value: {
+        "TableName": DynamoTables.RECOMMENDATION_SCORES.value,
+        "KeySchema": [
+            {"AttributeName": "userId", "KeyType": "HASH"},
+            {"AttributeName": "restaurantId", "KeyType": "RANGE"},
+        ],
+        "AttributeDefinitions": [
+            {"AttributeName": "userId", "AttributeType": "S"},
+            {"AttributeName": "restaurantId", "AttributeType": "S"},
+            {"AttributeName": "rankKey", "AttributeType": "S"},
+            {"AttributeName": "rankedShard", "AttributeType": "S"}
+        ],
+        "BillingMode": "PAY_PER_REQUEST",
+        "GlobalSecondaryIndexes": [
+            {
+                "IndexName": "RankedUsers",
+                "KeySchema": [
+                    {"AttributeName": "rankedShard", "KeyType": "HASH"},
+                    {"AttributeName": "userId", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["preferences"]}
+            }
+        ],
+        "LocalSecondaryIndexes": [
+            {
+                "IndexName": "UserRanking",
+                "KeySchema": [
+                    {"AttributeName": "userId", "KeyType": "HASH"},
+                    {"AttributeName": "rankKey", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"}
+            }
+        ]
+    },
+    DynamoTables.CONFIRMATION_CODES.value: {
+        "TableName": DynamoTables.CONFIRMATION_CODES.value,
+        "KeySchema": [
+            {"AttributeName": "code", "KeyType": "HASH"},
+        ],
+        "AttributeDefinitions": [
+            {"AttributeName": "code", "AttributeType": "S"}
+        ],
+        "BillingMode": "PAY_PER_REQUEST"
+    },
+}
+
+# Tables whose rows expire via DynamoDB TTL (attribute holds epoch seconds)
+TABLE_TTL_ATTRIBUTES = {
+    DynamoTables.HOLDS.value: "ttl",
 }
 
 
+def enable_ttl(client, table_name: str):
+    """Turn on TTL for tables listed in TABLE_TTL_ATTRIBUTES."""
+    attribute = TABLE_TTL_ATTRIBUTES.get(table_name)
+    if not attribute:
+        return
+    try:
+        client.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": attribute},
+        )
+        print(f"   ✓ TTL enabled on '{table_name}' ({attribute})")
+    except ClientError as e:
+        print(f"   ⚠️  Could not enable TTL on '{table_name}': {e.response.get('Error', {}).get('Code')}")
+
+
 def create_dynamodb_table(dynamodb, table_name: str):
     """Create DynamoDB table if it doesn't exist."""
     try:
@@ -115,6 +227,7 @@ def create_dynamodb_table(dynamodb, table_name: str):
             # Use low-level client.create_table() directly
             response = client.create_table(**schema)
             print(f"   ✓ Create request sent for '{table_name}'")
+            enable_ttl(client, table_name)
             # Don't wait - DynamoDB Local can be very slow
         except Exception as create_error:
             # Re-raise to be caught by outer exception handler
@@ -248,6 +361,9 @@ def main():
     table_reservations = os.getenv("DDB_RESERVATIONS_TABLE", "Reservations")
     # table_user_stats = os.getenv("DDB_USER_STATS_TABLE", "UserStats")  # Not used, commented out like local_config.py
     table_holds = os.getenv("DDB_HOLDS_TABLE", "Holds")
+    table_slot_availability = os.getenv("DDB_SLOT_AVAILABILITY_TABLE", "SlotAvailability")
+    table_recommendation_scores = os.getenv("DDB_RECOMMENDATION_SCORES_TABLE", "RecommendationScores")
+    table_confirmation_codes = os.getenv("DDB_CONFIRMATION_CODES_TABLE", "ConfirmationCodes")
 
     # Get S3 Bucket names
     bucket_images = os.getenv("S3_IMAGES_BUCKET", "foodtok-local-images")
@@ -260,6 +376,9 @@ def main():
         table_reservations,
         table_favorites,
         table_holds,
+        table_slot_availability,
+        table_recommendation_scores,
+        table_confirmation_codes,
     ]
 
     # Create DDB tables and S3 Buckets
@@ -0,0 +1,284 @@
+# api/async_views.py
+"""
+Async variants of the I/O-bound read views, for ASGI (SERVER_MODE=uvicorn).
+
+A sync view holds a thread for as long as it waits on DynamoDB or Yelp:
+a gthread worker stops at GUNICORN_THREADS requests in flight, and under
+ASGI Django hands every in-flight sync request a thread of its own. These
+views await an aioboto3 client and aiohttp instead, so one worker keeps
+hundreds of requests in flight on its event loop, bounded by CPU rather
+than threads. They take the same parameters and return the same JSON as
+their api/views.py counterparts, sharing its parsing, validation and
+response helpers so only the awaited I/O lives here; api/urls.py routes to
+them when ASYNC_VIEWS=true.
+
+DRF 3.14's @api_view can't wrap a coroutine, so these are plain Django
+async views: async_api_view() answers disallowed methods the way DRF does,
+and responses are rendered with api.renderers.dumps like
+FoodTokJSONRenderer.
+"""
+import functools
+import traceback
+from datetime import date
+
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .aws import async_registry
+from .dynamo import AsyncFastTable
+from .renderers import dumps
+from .restaurants import AsyncRestaurantEnricher
+from .views import (
+    INDEX_FAVORITES_BY_LIKED_AT,
+    INDEX_USER_HOLDS,
+    INDEX_USER_RESERVATIONS,
+    RESTAURANT_DDB_CACHE,
+    TABLE_FAVORITES,
+    TABLE_HOLDS,
+    TABLE_RESERVATIONS,
+    TABLE_RESTAURANT_CACHE,
+    TABLE_USERS,
+    active_hold_filter,
+    active_hold_query,
+    encode_cursor,
+    favorite_check_key,
+    filter_reservations,
+    is_missing_index_error,
+    latest_active_hold,
+    order_by_liked_at,
+    parse_favorites_listing,
+    parse_reservation_listing,
+    profile_cache,
+    reservation_listing,
+    restaurant_enricher as sync_restaurant_enricher,
+    segment_queries,
+    user_reservation_segments,
+)
+
+if async_registry is None:
+    raise RuntimeError("The async views need aioboto3; pip install aioboto3 or set ASYNC_VIEWS=false")
+
+
+def dynamodb_client():
+    return async_registry.client("dynamodb")
+
+
+restaurant_enricher = AsyncRestaurantEnricher(
+    sync_restaurant_enricher,  # one in-process cache for sync and async views
+    get_ddb_client=dynamodb_client if RESTAURANT_DDB_CACHE else None,
+    ddb_table_name=TABLE_RESTAURANT_CACHE,
+)
+
+
+# ----------------------------------------------------
+# Helper functions
+# ----------------------------------------------------
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def async_api_view(methods):
+    """@api_view for async views: CSRF exempt, 405 with DRF's body for any other method."""
+    def decorator(view):
+        @csrf_exempt
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = json_response({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+                response["Allow"] = ", ".join(methods)
+                return response
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def fast_table(name):
+    return AsyncFastTable(await dynamodb_client(), name)
+
+
+async def aquery_segments(table, index_name, segments, limit=None, cursor=None):
+    """Async query_segments (api/views.py), awaiting each query of segment_queries"""
+    queries = segment_queries(index_name, segments, limit=limit, cursor=cursor)
+    try:
+        kwargs = next(queries)
+        while True:
+            kwargs = queries.send(await table.query(**kwargs))
+    except StopIteration as done:
+        return done.value
+
+
+async def ascan_all(table, filter_expression):
+    """Async scan_all (api/views.py)"""
+    items = []
+    scan_kwargs = {"FilterExpression": filter_expression}
+    while True:
+        response = await table.scan(**scan_kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def aquery_active_hold(table, user_id):
+    """Async query_active_hold (api/views.py)"""
+    query_kwargs = active_hold_query(user_id)
+    while True:
+        response = await table.query(**query_kwargs)
+        items = response.get("Items", [])
+        if items:
+            return items[0]
+        if "LastEvaluatedKey" not in response:
+            return None
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+# ----------------------------------------------------
+# Views
+# ----------------------------------------------------
+@async_api_view(["GET"])
+async def get_profile(request, user_id):
+    """
+    GET /api/auth/profile/:userId
+    """
+    try:
+        async def load():
+            users = await fast_table(TABLE_USERS)
+            return (await users.get_item(Key={"userId": user_id})).get("Item")
+
+        # Same cache as the sync view; see api/profiles.py
+        user_data = await profile_cache.aget_or_load(user_id, load)
+
+        if not user_data:
+            return json_response({"error": "User not found"}, status=404)
+
+        return json_response({"user": user_data}, status=200)
+
+    except Exception as e:
+        return json_response({"error": str(e)}, status=500)
+
+
+@async_api_view(["GET"])
+async def get_active_hold(request):
+    """
+    GET /api/reservations/hold/active?userId=user_001
+    """
+    try:
+        user_id = request.GET.get("userId")
+
+        if not user_id:
+            return json_response({"error": "userId required"}, status=400)
+
+        holds = await fast_table(TABLE_HOLDS)
+        try:
+            hold = await aquery_active_hold(holds, user_id)
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                raise
+            print(f"Index {INDEX_USER_HOLDS} missing, falling back to scan")
+            hold = latest_active_hold(await ascan_all(holds, active_hold_filter(user_id)))
+        return json_response({"hold": hold}, status=200)
+
+    except Exception as e:
+        return json_response({"error": str(e)}, status=500)
+
+
+@async_api_view(["GET"])
+async def get_user_reservations(request, user_id):
+    """
+    GET /api/reservations/user/:userId?filter=upcoming|past|all&limit=20&cursor=...
+    """
+    try:
+        if not user_id:
+            return json_response({"error": "userId required"}, status=400)
+
+        try:
+            filter_type, limit, cursor = parse_reservation_listing(request.GET, user_id)
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=400)
+
+        reservations_table = await fast_table(TABLE_RESERVATIONS)
+        today = date.today().isoformat()
+        next_state = None
+
+        try:
+            reservations, next_state = await aquery_segments(
+                reservations_table,
+                INDEX_USER_RESERVATIONS,
+                user_reservation_segments(user_id, filter_type, today),
+                limit=limit,
+                cursor=cursor
+            )
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                raise
+            # Index genuinely absent (old local table): scan everything, no paging
+            print(f"Index {INDEX_USER_RESERVATIONS} missing, falling back to scan")
+            reservations = filter_reservations(
+                await ascan_all(reservations_table, Attr("userId").eq(user_id)), filter_type, today
+            )
+
+        await restaurant_enricher.enrich(reservations)
+
+        return json_response(reservation_listing(reservations, filter_type, next_state), status=200)
+
+    except Exception as e:
+        traceback.print_exc()
+        return json_response({"error": str(e)}, status=500)
+
+
+@async_api_view(["GET"])
+async def get_favorites(request, user_id):
+    """
+    GET /api/favorites/:userId?limit=20&cursor=...&fields=restaurantId,restaurantName
+    """
+    try:
+        try:
+            limit, cursor, segments = parse_favorites_listing(request.GET, user_id)
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=400)
+
+        favorites_table = await fast_table(TABLE_FAVORITES)
+
+        try:
+            favorites, next_state = await aquery_segments(
+                favorites_table, INDEX_FAVORITES_BY_LIKED_AT, segments, limit=limit, cursor=cursor
+            )
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                raise
+            # Table predates the GSI: page the base table and order each page by likedAt
+            print(f"Index {INDEX_FAVORITES_BY_LIKED_AT} missing, falling back to base table order")
+            favorites, next_state = await aquery_segments(favorites_table, None, segments, limit=limit, cursor=cursor)
+            order_by_liked_at(favorites)
+
+        response = json_response(favorites, status=200)
+        if next_state:
+            response["X-Next-Cursor"] = encode_cursor(next_state)
+        return response
+
+    except Exception as e:
+        traceback.print_exc()
+        return json_response({"error": str(e)}, status=500)
+
+
+@async_api_view(["GET"])
+async def check_favorite(request):
+    """
+    GET /api/favorites/check?userId=user_123&restaurantId=rest_xyz
+    Returns: { "isFavorite": true }
+    """
+    try:
+        try:
+            key = favorite_check_key(request.GET)
+        except ValueError as e:
+            return json_response({"error": str(e)}, status=400)
+
+        favorites_table = await fast_table(TABLE_FAVORITES)
+        response = await favorites_table.get_item(Key=key, ProjectionExpression="restaurantId")
+
+        return json_response({"isFavorite": "Item" in response}, status=200)
+
+    except Exception as e:
+        return json_response({"error": str(e)}, status=500)
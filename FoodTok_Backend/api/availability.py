@@ -0,0 +1,366 @@
+# api/availability.py
+"""
+Slot availability engine.
+
+Free capacity is kept per (restaurant, date, time) in the SlotAvailability
+table instead of being recomputed per request:
+
+    slotKey   = "<restaurantId>#<date>"     (partition key)
+    time      = "19:00"                     (sort key)
+    capacity  = seats per slot (capacity.perTimeSlot of the restaurant)
+    remaining = seats still free
+    booked    = seats held by confirmed reservations
+    hold#<id> = {"partySize": n, "expiresAt": epoch} for each active hold
+
+Every change is a single conditional UpdateItem, so concurrent callers can
+never push `remaining` below zero. Slots with no item yet are at full
+capacity; the first write creates them. Holds that expire without being
+confirmed are swept back into `remaining` the next time the slot is read,
+so a day's availability is one keyed query over a handful of items no
+matter how many bookings exist.
+
+A hold's own record (Holds table) is written in the same transaction as the
+seats it takes, so there is never a hold without seats or seats without a
+hold.
+"""
+import os
+import random
+import time
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from .restaurants import TTLCache
+
+DEFAULT_SLOT_CAPACITY = int(os.getenv("DEFAULT_SLOT_CAPACITY", "10"))
+SLOT_TIMES = [f"{hour:02d}:{minute:02d}" for hour in range(18, 22) for minute in (0, 30)]
+HOLD_PREFIX = "hold#"
+TRANSACTION_ATTEMPTS = int(os.getenv("SLOT_TRANSACTION_ATTEMPTS", "8"))
+SLOT_BUSY_RETRY_AFTER = int(os.getenv("SLOT_BUSY_RETRY_AFTER", "1"))
+
+# capacity is a DynamoDB reserved word; alias every counter for consistency
+COUNTER_NAMES = {"#rem": "remaining", "#cap": "capacity", "#booked": "booked"}
+
+
+class SlotUnavailable(Exception):
+    """Not enough free capacity left in the requested slot."""
+
+
+class SlotBusy(SlotUnavailable):
+    """
+    The slot's transactions kept losing to concurrent ones; callers should
+    retry later (the views answer 503 + Retry-After).
+    """
+
+    def __init__(self, retry_after=SLOT_BUSY_RETRY_AFTER):
+        super().__init__("Slot is busy, retry later")
+        self.retry_after = retry_after
+
+
+def slot_key(restaurant_id, date):
+    return f"{restaurant_id}#{date}"
+
+
+def _error_code(error):
+    return error.response.get("Error", {}).get("Code")
+
+
+def cancellation_codes(error):
+    """Per-item reason codes of a cancelled TransactWriteItems, in request order."""
+    return [reason.get("Code") for reason in error.response.get("CancellationReasons", [])]
+
+
+def _is_conditional_failure(error):
+    """Slot condition failed, either on a plain update or as the first item of a transaction."""
+    code = _error_code(error)
+    if code == "TransactionCanceledException":
+        return cancellation_codes(error)[:1] == ["ConditionalCheckFailed"]
+    return code == "ConditionalCheckFailedException"
+
+
+def _is_transaction_conflict(error):
+    code = _error_code(error)
+    if code == "TransactionCanceledException":
+        return "TransactionConflict" in cancellation_codes(error)
+    return code == "TransactionConflictException"
+
+
+class AvailabilityEngine:
+    def __init__(self, slots_table, restaurants_table=None, default_capacity=DEFAULT_SLOT_CAPACITY):
+        self.slots_table = slots_table
+        self.restaurants_table = restaurants_table
+        self.default_capacity = default_capacity
+        self._capacity_cache = TTLCache(max_entries=4096, ttl=300)
+
+    # ---------------------------
+    # Capacity lookup
+    # ---------------------------
+    def slot_capacity(self, restaurant_id):
+        """Seats per time slot, from the restaurant's capacity.perTimeSlot."""
+        capacity = self._capacity_cache.get(restaurant_id)
+        if capacity is not None:
+            return capacity
+
+        capacity = self.default_capacity
+        if self.restaurants_table is not None:
+            try:
+                item = self.restaurants_table.get_item(Key={"id": restaurant_id}).get("Item") or {}
+                per_slot = (item.get("capacity") or {}).get("perTimeSlot")
+                if per_slot:
+                    capacity = int(per_slot)
+            except Exception as e:
+                print(f"Capacity lookup failed for {restaurant_id}: {e}")
+
+        self._capacity_cache.set(restaurant_id, capacity)
+        return capacity
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def get_slots(self, restaurant_id, date, party_size=1):
+        """Availability for every slot of a day (one query + sweep of expired holds)."""
+        capacity = self.slot_capacity(restaurant_id)
+        response = self.slots_table.query(
+            KeyConditionExpression=Key("slotKey").eq(slot_key(restaurant_id, date))
+        )
+        items = {item["time"]: item for item in response.get("Items", [])}
+
+        now = int(time.time())
+        for item in items.values():
+            remaining = int(item.get("remaining", capacity))
+            for attr, hold in list(item.items()):
+                if attr.startswith(HOLD_PREFIX) and int(hold.get("expiresAt", 0)) <= now:
+                    if self._release_hold_attr(item["slotKey"], item["time"], attr, int(hold["partySize"])):
+                        remaining += int(hold["partySize"])
+            item["remaining"] = remaining
+
+        slots = []
+        for slot_time in sorted(set(SLOT_TIMES) | set(items)):
+            item = items.get(slot_time)
+            slot_capacity = int(item.get("capacity", capacity)) if item else capacity
+            remaining = int(item["remaining"]) if item else capacity
+            slots.append({
+                "time": slot_time,
+                "available": remaining >= party_size,
+                "remainingCapacity": remaining,
+                "capacity": slot_capacity,
+            })
+        return slots
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    def reserve_update(self, restaurant_id, date, slot_time, party_size, hold_id=None, expires_at=None):
+        """
+        UpdateItem arguments that take `party_size` seats from a slot, or fail
+        its condition if the slot is full. Shared by reserve() and callers
+        that fold the update into a TransactWriteItems.
+        """
+        capacity = self.slot_capacity(restaurant_id)
+        if party_size > capacity:
+            raise SlotUnavailable(f"Party of {party_size} exceeds slot capacity {capacity}")
+
+        names = dict(COUNTER_NAMES)
+        values = {":n": party_size, ":cap": capacity, ":zero": 0}
+        update = "SET #rem = if_not_exists(#rem, :cap) - :n, #cap = if_not_exists(#cap, :cap)"
+        if hold_id:
+            names["#h"] = HOLD_PREFIX + hold_id
+            values[":hold"] = {"partySize": party_size, "expiresAt": int(expires_at)}
+            update += ", #booked = if_not_exists(#booked, :zero), #h = :hold"
+        else:
+            update += ", #booked = if_not_exists(#booked, :zero) + :n"
+
+        return {
+            "Key": {"slotKey": slot_key(restaurant_id, date), "time": slot_time},
+            "UpdateExpression": update,
+            "ConditionExpression": "attribute_not_exists(#rem) OR #rem >= :n",
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values,
+        }
+
+    def reserve(self, restaurant_id, date, slot_time, party_size, hold_id=None, expires_at=None, put=None):
+        """
+        Take seats from a slot, either as a hold (expires unless confirmed)
+        or directly as a booking. Raises SlotUnavailable when full.
+
+        `put` is an optional TransactWriteItems Put ({"TableName", "Item", ...})
+        written in the same transaction, so the item exists only if the seats
+        were actually taken.
+        """
+        kwargs = self.reserve_update(restaurant_id, date, slot_time, party_size, hold_id, expires_at)
+        for attempt in range(2):
+            try:
+                if put:
+                    self.transact([{"Update": dict(kwargs, TableName=self.slots_table.name)}, {"Put": put}])
+                else:
+                    self.slots_table.update_item(**kwargs)
+                return
+            except ClientError as e:
+                if not _is_conditional_failure(e):
+                    raise
+            if attempt == 0 and not self.sweep_expired(restaurant_id, date, slot_time):
+                break
+        raise SlotUnavailable(f"{slot_time} on {date} is fully booked")
+
+    def transact(self, items):
+        """
+        TransactWriteItems, retried with jittered backoff while it loses to
+        concurrent transactions on the same slot; raises SlotBusy once
+        TRANSACTION_ATTEMPTS are used up. Condition failures are not retried
+        here; they surface as TransactionCanceledException.
+        """
+        client = self.slots_table.meta.client
+        for attempt in range(TRANSACTION_ATTEMPTS):
+            try:
+                return client.transact_write_items(TransactItems=items)
+            except ClientError as e:
+                if "ConditionalCheckFailed" in cancellation_codes(e) or not _is_transaction_conflict(e):
+                    raise
+                if attempt == TRANSACTION_ATTEMPTS - 1:
+                    raise SlotBusy() from e
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+
+    def confirm_hold_update(self, restaurant_id, date, slot_time, hold_id, party_size):
+        return {
+            "Key": {"slotKey": slot_key(restaurant_id, date), "time": slot_time},
+            "UpdateExpression": "SET #booked = if_not_exists(#booked, :zero) + :n REMOVE #h",
+            "ConditionExpression": "attribute_exists(#h)",
+            "ExpressionAttributeNames": {"#booked": "booked", "#h": HOLD_PREFIX + hold_id},
+            "ExpressionAttributeValues": {":n": party_size, ":zero": 0},
+        }
+
+    def confirm_hold(self, restaurant_id, date, slot_time, hold_id, party_size):
+        """
+        Turn a hold into a booking (seats stay taken). If the hold already
+        lapsed and was swept, the seats are re-reserved as a booking.
+        """
+        try:
+            self.slots_table.update_item(**self.confirm_hold_update(restaurant_id, date, slot_time, hold_id, party_size))
+        except ClientError as e:
+            if not _is_conditional_failure(e):
+                raise
+            self.reserve(restaurant_id, date, slot_time, party_size)
+
+    def release_booking_update(self, restaurant_id, date, slot_time, party_size):
+        return {
+            "Key": {"slotKey": slot_key(restaurant_id, date), "time": slot_time},
+            "UpdateExpression": "SET #rem = #rem + :n, #booked = #booked - :n",
+            "ConditionExpression": "#booked >= :n",
+            "ExpressionAttributeNames": {"#rem": "remaining", "#booked": "booked"},
+            "ExpressionAttributeValues": {":n": party_size},
+        }
+
+    def release_booking(self, restaurant_id, date, slot_time, party_size, update=None):
+        """
+        Give a confirmed booking's seats back. Bookings made before the engine
+        tracked them were never counted, so they are ignored (booked < n).
+        Returns whether seats were given back.
+
+        With `update` (a TransactWriteItems Update, e.g. cancelling the
+        reservation) the seats go back in the same transaction, so they are
+        returned exactly when the update applies. If its condition fails the
+        TransactionCanceledException is raised, with the update's reason
+        code last in cancellation_codes().
+        """
+        release = self.release_booking_update(restaurant_id, date, slot_time, party_size)
+        if not update:
+            try:
+                self.slots_table.update_item(**release)
+                return True
+            except ClientError as e:
+                if not _is_conditional_failure(e):
+                    raise
+                return False
+
+        try:
+            self.transact([{"Update": dict(release, TableName=self.slots_table.name)}, {"Update": update}])
+            return True
+        except ClientError as e:
+            codes = cancellation_codes(e)
+            if codes[:1] != ["ConditionalCheckFailed"] or codes[-1:] == ["ConditionalCheckFailed"]:
+                raise
+        # Booked before the engine tracked it: nothing to give back
+        self.transact([{"Update": update}])
+        return False
+
+    def release_hold(self, restaurant_id, date, slot_time, hold_id, party_size):
+        return self._release_hold_attr(slot_key(restaurant_id, date), slot_time, HOLD_PREFIX + hold_id, party_size)
+
+    def move_booking(self, restaurant_id, old, new, update=None):
+        """
+        Move a booking between slots and/or party sizes. `old` and `new` are
+        (date, time, party_size). Raises SlotUnavailable if the new slot is full.
+
+        Seats are taken and given back in one transaction, together with
+        `update` (a TransactWriteItems Update, e.g. of the reservation
+        itself) if given, so the seats only move if the update applies. If
+        its condition fails the TransactionCanceledException is raised, with
+        the update's reason code last in cancellation_codes().
+        """
+        (old_date, old_time, old_size), (new_date, new_time, new_size) = old, new
+        if (old_date, old_time) == (new_date, new_time):
+            take = (new_date, new_time, new_size - old_size) if new_size > old_size else None
+            give = (old_date, old_time, old_size - new_size) if new_size < old_size else None
+        else:
+            take, give = (new_date, new_time, new_size), (old_date, old_time, old_size)
+
+        swept = False
+        while True:
+            items, roles = [], []
+            if take:
+                items.append({"Update": dict(self.reserve_update(restaurant_id, *take), TableName=self.slots_table.name)})
+                roles.append("take")
+            if give:
+                items.append({"Update": dict(self.release_booking_update(restaurant_id, *give),
+                                             TableName=self.slots_table.name)})
+                roles.append("give")
+            if update:
+                items.append({"Update": update})
+                roles.append("update")
+            if not items:
+                return
+            try:
+                self.transact(items)
+                return
+            except ClientError as e:
+                failed = {role for role, code in zip(roles, cancellation_codes(e)) if code == "ConditionalCheckFailed"}
+                if not failed or "update" in failed:
+                    raise
+                if "give" in failed:
+                    give = None  # booked before the engine tracked it: nothing to give back
+                if "take" in failed:
+                    if swept or not self.sweep_expired(restaurant_id, take[0], take[1]):
+                        raise SlotUnavailable(f"{take[1]} on {take[0]} is fully booked")
+                    swept = True
+
+    # ---------------------------
+    # Expired holds
+    # ---------------------------
+    def sweep_expired(self, restaurant_id, date, slot_time):
+        """Return lapsed holds in one slot to the pool; True if anything was freed."""
+        item = self.slots_table.get_item(
+            Key={"slotKey": slot_key(restaurant_id, date), "time": slot_time},
+            ConsistentRead=True,
+        ).get("Item") or {}
+        now = int(time.time())
+        freed = False
+        for attr, hold in item.items():
+            if attr.startswith(HOLD_PREFIX) and int(hold.get("expiresAt", 0)) <= now:
+                freed |= self._release_hold_attr(item["slotKey"], slot_time, attr, int(hold["partySize"]))
+        return freed
+
+    def _release_hold_attr(self, key, slot_time, attr, party_size):
+        # Conditional on the hold still being there, so a hold is only ever released once
+        try:
+            self.slots_table.update_item(
+                Key={"slotKey": key, "time": slot_time},
+                UpdateExpression="SET #rem = #rem + :n REMOVE #h",
+                ConditionExpression="attribute_exists(#h)",
+                ExpressionAttributeNames={"#rem": "remaining", "#h": attr},
+                ExpressionAttributeValues={":n": party_size},
+            )
+            return True
+        except ClientError as e:
+            if not _is_conditional_failure(e):
+                raise
+            return False
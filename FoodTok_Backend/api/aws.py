@@ -1,42 +1,315 @@
+# api/aws.py
+"""
+Process-wide AWS clients.
+
+Every boto3 client/resource the backend uses comes from one ClientRegistry,
+so the process holds a single connection pool per (service, timeout
+profile, resource or plain client) instead of one per call site:
+
+  - pools sized by AWS_MAX_POOL_CONNECTIONS (match it to worker threads /
+    greenlets, or requests queue for a free connection),
+  - adaptive retries (client-side rate limiting when DynamoDB throttles),
+  - TCP keepalive, so idle pooled connections survive NAT/ALB timeouts,
+  - timeout profiles: "default" for request-path calls, "bulk" for scans
+    and batch jobs that legitimately take longer.
+
+Clients are built lazily under a lock (creating them is not thread-safe,
+using them is), and rebuilt after a fork so pre-fork workers never share
+sockets. pool_metrics() reports requests, retries and in-flight requests
+against the pool size for each client; api/metrics.py hooks every client
+for per-request counts.
+
+AsyncClientRegistry is the same for the async views (api/async_views.py):
+aioboto3 clients with the same pool size, retries and timeouts, one per
+event loop since an aiohttp connection pool belongs to the loop that made
+it. aioboto3 is optional and only needed when those views are served.
+"""
+import asyncio
 import os
+import threading
+import weakref
+
 import boto3
-from botocore.client import Config
-from botocore.session import get_session
+from botocore.config import Config
+
+from .metrics import instrument
+
+try:
+    import aioboto3
+    from aiobotocore.config import AioConfig
+except ImportError:  # pragma: no cover - exercised when aioboto3 isn't installed
+    aioboto3 = AioConfig = None
 
 IS_LOCAL = os.getenv("IS_LOCAL", "false").lower() == "true"
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 DYNAMODB_ENDPOINT = os.getenv("LOCAL_DYNAMO_ENDPOINT")
 S3_ENDPOINT = os.getenv("LOCAL_S3_ENDPOINT")
 
-def get_dynamodb():
-    if IS_LOCAL:
-        session = get_session()
-        session.set_credentials(access_key="fake", secret_key="fake")
-        anon = Config(signature_version=None)
-
-        return boto3.resource(
-            "dynamodb",
-            region_name=AWS_REGION,
-            endpoint_url=DYNAMODB_ENDPOINT,
-            config=anon,
-            aws_access_key_id="fake",
-            aws_secret_access_key="fake",
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "64"))
+AWS_RETRY_MODE = os.getenv("AWS_RETRY_MODE", "adaptive")
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "5"))
+AWS_TCP_KEEPALIVE = os.getenv("AWS_TCP_KEEPALIVE", "true").lower() == "true"
+AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", "2"))
+AWS_ASYNC_KEEPALIVE_TIMEOUT = float(os.getenv("AWS_ASYNC_KEEPALIVE_TIMEOUT", "12"))
+
+# profile -> (connect timeout, read timeout) in seconds
+TIMEOUT_PROFILES = {
+    "default": (AWS_CONNECT_TIMEOUT, float(os.getenv("AWS_READ_TIMEOUT", "5"))),
+    "bulk": (AWS_CONNECT_TIMEOUT, float(os.getenv("AWS_BULK_READ_TIMEOUT", "30"))),
+}
+
+LOCAL_ENDPOINTS = {"dynamodb": DYNAMODB_ENDPOINT, "s3": S3_ENDPOINT}
+
+
+class PoolMetrics:
+    """Request counters for one client, fed by its botocore event hooks."""
+
+    def __init__(self, max_pool_connections):
+        self.max_pool_connections = max_pool_connections
+        self.calls = 0
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def attach(self, events):
+        events.register("before-call", self._on_call)
+        events.register("before-send", self._on_send)
+        events.register("response-received", self._on_response)
+
+    def _on_call(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+
+    def _on_send(self, **kwargs):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _on_response(self, response_dict=None, exception=None, **kwargs):
+        with self._lock:
+            self.in_flight -= 1
+            if exception is not None or (response_dict and response_dict.get("status_code", 200) >= 400):
+                self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "requests": self.requests,
+                "retries": self.requests - self.calls,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_pool_connections": self.max_pool_connections,
+                "utilization": self.in_flight / self.max_pool_connections,
+                "peak_utilization": self.peak_in_flight / self.max_pool_connections,
+            }
+
+
+class ClientRegistry:
+    """
+    Lazily built, shared boto3 clients and resources.
+
+        registry.resource("dynamodb")         # boto3 resource
+        registry.client("dynamodb", "bulk")   # low-level client, long read timeout
+    """
+
+    def __init__(
+        self,
+        region=AWS_REGION,
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        retry_mode=AWS_RETRY_MODE,
+        max_attempts=AWS_MAX_ATTEMPTS,
+        tcp_keepalive=AWS_TCP_KEEPALIVE,
+        timeout_profiles=None,
+        local_endpoints=None,
+    ):
+        self.region = region
+        self.max_pool_connections = max_pool_connections
+        self.retry_mode = retry_mode
+        self.max_attempts = max_attempts
+        self.tcp_keepalive = tcp_keepalive
+        self.timeout_profiles = timeout_profiles or TIMEOUT_PROFILES
+        self.local_endpoints = LOCAL_ENDPOINTS if local_endpoints is None and IS_LOCAL else (local_endpoints or {})
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._session = None
+        self._entries = {}  # (kind, service, profile) -> (resource or client, PoolMetrics)
+
+    def config(self, profile="default"):
+        connect_timeout, read_timeout = self.timeout_profiles[profile]
+        return Config(
+            max_pool_connections=self.max_pool_connections,
+            retries={"mode": self.retry_mode, "total_max_attempts": self.max_attempts},
+            tcp_keepalive=self.tcp_keepalive,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
         )
 
-    return boto3.resource("dynamodb", region_name=AWS_REGION)
+    def _entry(self, kind, service, profile):
+        key = (kind, service, profile)
+        entry = self._entries.get(key)
+        if entry is not None and self._pid == os.getpid():
+            return entry
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()  # forked: the parent's sockets aren't ours
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._build(kind, service, profile)
+                self._entries[key] = entry
+            return entry
+
+    def _build(self, kind, service, profile):
+        if self._session is None:
+            self._session = boto3.session.Session()
+        kwargs = {"region_name": self.region, "config": self.config(profile)}
+        endpoint = self.local_endpoints.get(service)
+        if endpoint:
+            kwargs.update(endpoint_url=endpoint, aws_access_key_id="fake", aws_secret_access_key="fake")
 
+        if kind == "resource":
+            obj = self._session.resource(service, **kwargs)
+            client = obj.meta.client
+        else:
+            obj = client = self._session.client(service, **kwargs)
 
-def get_s3():
-    if IS_LOCAL:
-        session = get_session()
-        session.set_credentials(access_key="fake", secret_key="fake")
-        anon = Config(signature_version=None)
+        metrics = PoolMetrics(self.max_pool_connections)
+        metrics.attach(client.meta.events)
+        instrument(client.meta.events)  # per-request call counts, see api/metrics.py
+        return obj, metrics
 
-        return boto3.client(
-            "s3",
-            region_name=AWS_REGION,
-            endpoint_url=S3_ENDPOINT,
-            config=anon,
+    def resource(self, service, profile="default"):
+        return self._entry("resource", service, profile)[0]
+
+    def client(self, service, profile="default"):
+        """
+        A plain low-level client. Unlike resource(...).meta.client it takes
+        and returns DynamoDB wire-format attribute values as-is.
+        """
+        return self._entry("client", service, profile)[0]
+
+    def metrics(self):
+        """{"kind.service:profile": PoolMetrics.snapshot()} for everything built so far."""
+        entries = dict(self._entries)
+        return {
+            f"{kind}.{service}:{profile}": metrics.snapshot()
+            for (kind, service, profile), (_, metrics) in entries.items()
+        }
+
+
+class AsyncClientRegistry:
+    """
+    Lazily built, shared aioboto3 clients, one per (service, profile) per
+    event loop:
+
+        client = await async_registry.client("dynamodb")
+        await client.get_item(TableName="Users", Key={"userId": {"S": "u1"}})
+
+    Takes ClientRegistry's pool, retry and timeout settings. aiohttp has no
+    TCP keepalive option; idle pooled connections are closed after
+    AWS_ASYNC_KEEPALIVE_TIMEOUT seconds instead.
+    """
+
+    def __init__(self, sync_registry, keepalive_timeout=AWS_ASYNC_KEEPALIVE_TIMEOUT):
+        if aioboto3 is None:
+            raise RuntimeError("aioboto3 is not installed; pip install aioboto3 to serve the async views")
+        self.sync_registry = sync_registry
+        self.keepalive_timeout = keepalive_timeout
+        self._session = aioboto3.Session()
+        self._loops = weakref.WeakKeyDictionary()  # loop -> (asyncio.Lock, {(service, profile): client})
+        self._metrics = {}  # (service, profile) -> PoolMetrics, shared by every loop's client
+        self._lock = threading.Lock()
+
+    def config(self, profile="default"):
+        sync = self.sync_registry
+        connect_timeout, read_timeout = sync.timeout_profiles[profile]
+        return AioConfig(
+            connector_args={"keepalive_timeout": self.keepalive_timeout},
+            max_pool_connections=sync.max_pool_connections,
+            retries={"mode": sync.retry_mode, "total_max_attempts": sync.max_attempts},
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
         )
 
-    return boto3.client("s3", region_name=AWS_REGION)
+    def _loop_state(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = (asyncio.Lock(), {})
+            return state
+
+    async def client(self, service, profile="default"):
+        """A plain low-level client for the running event loop."""
+        lock, clients = self._loop_state()
+        key = (service, profile)
+        client = clients.get(key)
+        if client is not None:
+            return client
+
+        async with lock:
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = await self._build(service, profile)
+            return client
+
+    async def _build(self, service, profile):
+        kwargs = {"region_name": self.sync_registry.region, "config": self.config(profile)}
+        endpoint = self.sync_registry.local_endpoints.get(service)
+        if endpoint:
+            kwargs.update(endpoint_url=endpoint, aws_access_key_id="fake", aws_secret_access_key="fake")
+        # The context manager only scopes the client's aiohttp session; this
+        # one lives as long as the loop, or until close()
+        client = await self._session.client(service, **kwargs).__aenter__()
+
+        with self._lock:
+            metrics = self._metrics.get((service, profile))
+            if metrics is None:
+                metrics = self._metrics[(service, profile)] = PoolMetrics(self.sync_registry.max_pool_connections)
+        metrics.attach(client.meta.events)
+        instrument(client.meta.events)
+        return client
+
+    async def close(self):
+        """Close the running loop's clients (tests and scripts; servers keep theirs)."""
+        lock, clients = self._loop_state()
+        async with lock:
+            while clients:
+                _, client = clients.popitem()
+                await client.__aexit__(None, None, None)
+
+    def metrics(self):
+        """{"async.service:profile": PoolMetrics.snapshot()}; every loop's client feeds the same counters."""
+        entries = dict(self._metrics)
+        return {f"async.{service}:{profile}": metrics.snapshot() for (service, profile), metrics in entries.items()}
+
+
+registry = ClientRegistry()
+async_registry = AsyncClientRegistry(registry) if aioboto3 is not None else None
+
+
+def get_dynamodb(profile="default"):
+    return registry.resource("dynamodb", profile)
+
+
+def get_dynamodb_client(profile="default"):
+    return registry.client("dynamodb", profile)
+
+
+def get_s3(profile="default"):
+    return registry.client("s3", profile)
+
+
+def pool_metrics():
+    pools = registry.metrics()
+    if async_registry is not None:
+        pools.update(async_registry.metrics())
+    return pools
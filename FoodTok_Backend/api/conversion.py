@@ -0,0 +1,86 @@
+# api/conversion.py
+"""
+float -> Decimal conversion for values headed to the boto3 DynamoDB resource
+(which rejects floats).
+
+convert_floats_to_decimal walks the value with an explicit stack instead of
+recursion and is copy-on-write: a dict or list is copied only when something
+inside it changed, so a document with no floats comes back as the very same
+object, and a document with one float deep down only copies the containers on
+the path to it.
+
+Pure Python, no Django. legacy/seed_data.py keeps its own recursive copy so
+the seed image doesn't need the backend tree.
+"""
+from decimal import Decimal
+
+
+# Seed data and preference documents repeat the same few values (ratings,
+# deposits, weights), so conversions are memoized up to a fixed size.
+# Decimals are immutable, so sharing one between items is safe.
+_DECIMAL_CACHE_SIZE = 4096
+_decimals = {}
+
+
+def _to_decimal(value):
+    decimal = _decimals.get(value)
+    if decimal is None:
+        # str() is the shortest round-tripping form, and also right for
+        # float subclasses such as numpy.float64 (whose repr() isn't)
+        decimal = Decimal(str(value))
+        if len(_decimals) < _DECIMAL_CACHE_SIZE:
+            _decimals[value] = decimal
+    return decimal
+
+
+_SCALARS = frozenset((str, int, bool, type(None), Decimal))
+
+
+def _copy(container):
+    return dict(container) if isinstance(container, dict) else list(container)
+
+
+def _convert(root):
+    # Each stack frame is [container, entries iterator, copy or None, key in
+    # parent]. Descending into a child breaks out of the parent's loop; the
+    # parent's iterator keeps its position and resumes once the child is done.
+    scalars = _SCALARS
+    entries = root.items() if isinstance(root, dict) else enumerate(root)
+    frame = [root, iter(entries), None, None]
+    stack = []
+    while True:
+        for key, value in frame[1]:
+            cls = value.__class__
+            if cls in scalars:
+                continue
+            if isinstance(value, float):
+                if frame[2] is None:
+                    frame[2] = _copy(frame[0])
+                frame[2][key] = _to_decimal(value)
+            elif isinstance(value, (dict, list)) and value:
+                stack.append(frame)
+                entries = value.items() if isinstance(value, dict) else enumerate(value)
+                frame = [value, iter(entries), None, key]
+                break
+        else:
+            copy, key = frame[2], frame[3]
+            if not stack:
+                return frame[0] if copy is None else copy
+            frame = stack.pop()
+            if copy is not None:
+                if frame[2] is None:
+                    frame[2] = _copy(frame[0])
+                frame[2][key] = copy
+
+
+def convert_floats_to_decimal(obj):
+    """
+    obj with every float (at any depth) replaced by a Decimal.
+
+    Returns obj itself when it contains no floats.
+    """
+    if isinstance(obj, float):
+        return _to_decimal(obj)
+    if not isinstance(obj, (dict, list)) or not obj:
+        return obj
+    return _convert(obj)
@@ -0,0 +1,202 @@
+# api/dynamo.py
+"""
+Low-level DynamoDB access for the hot read paths.
+
+A boto3 resource Table runs every response through TypeDeserializer, which
+turns each number into a Decimal, and views then round-trip the result
+through json.dumps(..., cls=DecimalEncoder) / json.loads to get floats
+back. FastTable skips both: it calls the plain low-level client and decodes
+the wire attribute values straight into JSON-ready Python:
+
+    {"S": "x"} -> "x"     {"N": "2"} -> 2     {"N": "4.5"} -> 4.5
+    {"SS": [...]} / {"NS": [...]} -> list     {"B": b"..."} -> bytes
+
+Binary values stay bytes so items round-trip through encode_item();
+api.renderers writes them out as base64.
+
+Requests take the same arguments as Table (plain Python keys/items,
+Key()/Attr() conditions), and responses come back in the same shape
+(Item, Items, Attributes, LastEvaluatedKey), so FastTable drops into code
+written for Table, including query_segments().
+
+AsyncFastTable is the same over an aioboto3 client, with awaitable methods.
+"""
+import math
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+
+_NUMBER_TYPES = (int, float, Decimal)
+
+
+# ---------------------------
+# Attribute value codec
+# ---------------------------
+def _number(text):
+    if "." in text or "e" in text or "E" in text:
+        return float(text)
+    return int(text)
+
+
+def _encode_number(value):
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"DynamoDB cannot store {value!r}")
+        return repr(value)
+    return str(value)
+
+
+def decode_value(av):
+    """One wire attribute value ({"N": "2"}) -> JSON-ready Python."""
+    (tag, value), = av.items()
+    if tag == "S":
+        return value
+    if tag == "N":
+        return _number(value)
+    if tag == "M":
+        return {k: decode_value(v) for k, v in value.items()}
+    if tag == "L":
+        return [decode_value(v) for v in value]
+    if tag == "BOOL":
+        return value
+    if tag == "NULL":
+        return None
+    if tag in ("SS", "BS", "B"):
+        return value
+    if tag == "NS":
+        return [_number(v) for v in value]
+    raise ValueError(f"Unknown attribute value type {tag}")
+
+
+def encode_value(value):
+    """Python -> wire attribute value; inverse of decode_value."""
+    if isinstance(value, str):
+        return {"S": value}
+    if isinstance(value, bool):
+        return {"BOOL": value}
+    if isinstance(value, _NUMBER_TYPES):
+        return {"N": _encode_number(value)}
+    if value is None:
+        return {"NULL": True}
+    if isinstance(value, dict):
+        return {"M": {k: encode_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {"L": [encode_value(v) for v in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {"B": bytes(value)}
+    if isinstance(value, (set, frozenset)):
+        if all(isinstance(v, str) for v in value):
+            return {"SS": list(value)}
+        if all(isinstance(v, _NUMBER_TYPES) and not isinstance(v, bool) for v in value):
+            return {"NS": [_encode_number(v) for v in value]}
+        if all(isinstance(v, (bytes, bytearray)) for v in value):
+            return {"BS": [bytes(v) for v in value]}
+    raise TypeError(f"Cannot encode {type(value).__name__} as a DynamoDB attribute value")
+
+
+def decode_item(item):
+    return {k: decode_value(v) for k, v in item.items()}
+
+
+def encode_item(item):
+    return {k: encode_value(v) for k, v in item.items()}
+
+
+# ---------------------------
+# Table
+# ---------------------------
+_ITEM_ARGS = ("Key", "Item", "ExclusiveStartKey")
+_CONDITION_ARGS = (
+    ("KeyConditionExpression", True),
+    ("FilterExpression", False),
+    ("ConditionExpression", False),
+)
+
+
+class FastTable:
+    """
+    Table-compatible wrapper over a plain low-level client:
+
+        table = FastTable(get_dynamodb_client(), "Reservations")
+        table.query(KeyConditionExpression=Key("userId").eq("user_001"))["Items"]
+    """
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+
+    def _request(self, kwargs):
+        request = dict(kwargs, TableName=self.name)
+        for arg in _ITEM_ARGS:
+            if arg in request:
+                request[arg] = encode_item(request[arg])
+
+        names = dict(request.pop("ExpressionAttributeNames", None) or {})
+        values = {k: encode_value(v) for k, v in (request.pop("ExpressionAttributeValues", None) or {}).items()}
+        builder = ConditionExpressionBuilder()
+        for arg, is_key_condition in _CONDITION_ARGS:
+            condition = request.get(arg)
+            if isinstance(condition, ConditionBase):
+                built = builder.build_expression(condition, is_key_condition=is_key_condition)
+                request[arg] = built.condition_expression
+                names.update(built.attribute_name_placeholders)
+                values.update((k, encode_value(v)) for k, v in built.attribute_value_placeholders.items())
+        if names:
+            request["ExpressionAttributeNames"] = names
+        if values:
+            request["ExpressionAttributeValues"] = values
+        return request
+
+    @staticmethod
+    def _response(response):
+        for arg in ("Item", "Attributes", "LastEvaluatedKey"):
+            if arg in response:
+                response[arg] = decode_item(response[arg])
+        if "Items" in response:
+            response["Items"] = [decode_item(item) for item in response["Items"]]
+        return response
+
+    def get_item(self, **kwargs):
+        return self._response(self.client.get_item(**self._request(kwargs)))
+
+    def query(self, **kwargs):
+        return self._response(self.client.query(**self._request(kwargs)))
+
+    def scan(self, **kwargs):
+        return self._response(self.client.scan(**self._request(kwargs)))
+
+    def put_item(self, **kwargs):
+        return self._response(self.client.put_item(**self._request(kwargs)))
+
+    def update_item(self, **kwargs):
+        return self._response(self.client.update_item(**self._request(kwargs)))
+
+    def delete_item(self, **kwargs):
+        return self._response(self.client.delete_item(**self._request(kwargs)))
+
+
+class AsyncFastTable(FastTable):
+    """
+    FastTable over an aioboto3 client (see api.aws.AsyncClientRegistry):
+
+        table = AsyncFastTable(await async_registry.client("dynamodb"), "Favorites")
+        (await table.get_item(Key={"userId": "u1", "restaurantId": "r1"})).get("Item")
+    """
+
+    async def get_item(self, **kwargs):
+        return self._response(await self.client.get_item(**self._request(kwargs)))
+
+    async def query(self, **kwargs):
+        return self._response(await self.client.query(**self._request(kwargs)))
+
+    async def scan(self, **kwargs):
+        return self._response(await self.client.scan(**self._request(kwargs)))
+
+    async def put_item(self, **kwargs):
+        return self._response(await self.client.put_item(**self._request(kwargs)))
+
+    async def update_item(self, **kwargs):
+        return self._response(await self.client.update_item(**self._request(kwargs)))
+
+    async def delete_item(self, **kwargs):
+        return self._response(await self.client.delete_item(**self._request(kwargs)))
@@ -0,0 +1,45 @@
+"""
+Crawl Yelp's business search into an NDJSON restaurant catalog.
+
+    python manage.py ingest_yelp_catalog --output seed_data/dynamo_seed/restaurants.ndjson
+    python manage.py ingest_yelp_catalog --cuisine thai --cuisine korean --location "Queens, NY"
+
+Re-running with the same --output resumes from its checkpoint
+(<output>.checkpoint.json); delete both files to start over. The output
+seeds the Restaurants table as-is (legacy/seed_data.py reads .ndjson).
+"""
+from django.core.management.base import BaseCommand
+
+from api.yelp_ingest import (
+    CUISINES,
+    LOCATIONS,
+    YELP_INGEST_BURST,
+    YELP_INGEST_CONCURRENCY,
+    YELP_INGEST_RATE,
+    CatalogIngester,
+)
+
+
+class Command(BaseCommand):
+    help = "Crawl Yelp business search into an NDJSON restaurant catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default="restaurants.ndjson", help="NDJSON file to append to")
+        parser.add_argument("--cuisine", action="append", default=[], help="cuisine to search (repeatable)")
+        parser.add_argument("--location", action="append", default=[], help="location to search (repeatable)")
+        parser.add_argument("--rate", type=float, default=YELP_INGEST_RATE, help="requests per second")
+        parser.add_argument("--burst", type=int, default=YELP_INGEST_BURST, help="token bucket size")
+        parser.add_argument("--concurrency", type=int, default=YELP_INGEST_CONCURRENCY)
+
+    def handle(self, *args, **options):
+        ingester = CatalogIngester(
+            options["output"],
+            rate=options["rate"],
+            burst=options["burst"],
+            concurrency=options["concurrency"],
+        )
+        stats = ingester.run(options["cuisine"] or CUISINES, options["location"] or LOCATIONS)
+        self.stdout.write(
+            f"Wrote {stats['written']} restaurants to {options['output']} "
+            f"({stats['requests']} requests, {stats['failed_searches']} failed searches)"
+        )
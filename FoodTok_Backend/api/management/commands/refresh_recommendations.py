@@ -0,0 +1,52 @@
+"""
+Patch stored discovery rankings after the restaurant catalog changes.
+
+    python manage.py refresh_recommendations --restaurant rest_abc --restaurant rest_def
+    python manage.py refresh_recommendations --removed rest_old
+    python manage.py refresh_recommendations --all
+
+--restaurant re-scores the given (added or updated) restaurants for every
+user that has a ranking; ids no longer in the Restaurants table are treated
+as removed. --all rebuilds every ranking from the users' current preferences.
+"""
+from django.core.management.base import BaseCommand
+
+from api.views import TABLE_RESTAURANTS, TABLE_USERS, dynamodb, recommender
+
+
+class Command(BaseCommand):
+    help = "Refresh precomputed discovery rankings after catalog changes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurant", action="append", default=[], help="added/updated restaurant id (repeatable)")
+        parser.add_argument("--removed", action="append", default=[], help="removed restaurant id (repeatable)")
+        parser.add_argument("--all", action="store_true", help="rebuild every stored ranking")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            recommender.invalidate_catalog()
+            users_table = dynamodb.Table(TABLE_USERS)
+            rebuilt = 0
+            for meta in recommender.ranked_users():
+                user = users_table.get_item(Key={"userId": meta["userId"]}).get("Item") or {}
+                recommender.refresh_user(meta["userId"], user.get("preferences"), force=True)
+                rebuilt += 1
+            self.stdout.write(f"Rebuilt {rebuilt} rankings")
+            return
+
+        ids = list(dict.fromkeys(options["restaurant"]))
+        if not ids and not options["removed"]:
+            self.stderr.write("Nothing to do: pass --restaurant, --removed or --all")
+            return
+
+        restaurants_table = dynamodb.Table(TABLE_RESTAURANTS)
+        changed, removed = [], list(options["removed"])
+        for rid in ids:
+            item = restaurants_table.get_item(Key={"id": rid}).get("Item")
+            if item:
+                changed.append(item)
+            else:
+                removed.append(rid)
+
+        touched = recommender.refresh_restaurants(changed, removed_ids=removed)
+        self.stdout.write(f"Updated {touched} rankings ({len(changed)} changed, {len(removed)} removed)")
@@ -0,0 +1,289 @@
+# api/matching.py
+"""
+Restaurant match scoring.
+
+calculate_match_score() scores one restaurant against a user's preferences.
+MatchScorer does the same for a whole catalog at once: restaurants are
+encoded once into NumPy arrays (cuisines and dietary options as vocabulary
+ids, price and rating as numbers), after which each user is scored with a
+handful of vectorized operations instead of a Python loop per restaurant.
+
+Scores and reasons are identical to calculate_match_score(). Rows whose data
+the arrays can't represent exactly (odd types, non-integral prices) are
+scored with calculate_match_score() itself, as are preferences of an
+unexpected shape.
+"""
+from decimal import Decimal
+import math
+
+import numpy as np
+
+PRICE_LABELS = {1: "Budget-friendly", 2: "Moderate", 3: "Upscale", 4: "Fine dining"}
+
+
+def calculate_match_score(restaurant, preferred_cuisines, preferred_price, dietary_restrictions):
+    """
+    Calculate match score (0-100) based on user preferences.
+
+    Scoring breakdown:
+    - Cuisine match: 40 points
+    - Price match: 30 points
+    - Dietary options: 20 points
+    - Base popularity (rating): 10 points
+    """
+    score = 0
+    reasons = []
+
+    # 1. Cuisine matching (40 points)
+    restaurant_cuisines = restaurant.get("cuisine", [])
+    if isinstance(restaurant_cuisines, str):
+        restaurant_cuisines = [restaurant_cuisines]
+
+    if preferred_cuisines:
+        cuisine_matches = [c for c in restaurant_cuisines if c in preferred_cuisines]
+        if cuisine_matches:
+            score += 40
+            reasons.append(f"Loves {cuisine_matches[0]}")
+        else:
+            score += 10  # Some points for trying new cuisines
+    else:
+        score += 20  # No preference = neutral
+
+    # 2. Price range matching (30 points)
+    restaurant_price = restaurant.get("priceRange", 2)
+
+    # Convert $$ format to numeric if needed
+    if isinstance(restaurant_price, str):
+        restaurant_price = len(restaurant_price)
+
+    if restaurant_price in preferred_price:
+        score += 30
+        reasons.append(PRICE_LABELS.get(restaurant_price, "Good value"))
+    else:
+        # Partial points if close
+        if any(abs(restaurant_price - p) == 1 for p in preferred_price):
+            score += 15
+
+    # 3. Dietary options (20 points)
+    restaurant_dietary = restaurant.get("dietaryOptions", [])
+    if dietary_restrictions:
+        matches = [d for d in dietary_restrictions if d in restaurant_dietary]
+        if matches:
+            score += 20
+            reasons.append(f"Has {matches[0]} options")
+        elif not restaurant_dietary:
+            score += 5  # Some points if no restrictions
+    else:
+        score += 10  # No dietary restrictions = partial points
+
+    # 4. Base popularity from rating (10 points)
+    rating = float(restaurant.get("rating", 0))
+    score += min(10, int(rating * 2))  # 5.0 rating = 10 points
+
+    # Add high rating to reasons if 4.5+
+    if rating >= 4.5:
+        reasons.append(f"Highly rated ({rating}★)")
+
+    return {
+        "score": min(100, score),  # Cap at 100
+        "reasons": reasons[:3]  # Top 3 reasons
+    }
+
+
+def _exact_int(value):
+    """value as an int if it is an integer-valued int/Decimal, else None"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value if abs(value) < 2 ** 62 else None
+    if isinstance(value, Decimal) and value.is_finite() and value == value.to_integral_value():
+        return _exact_int(int(value))
+    return None
+
+
+def _string_list(value):
+    """value as a list of strings if it is a list/tuple of strings, else None"""
+    if isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value):
+        return list(value)
+    return None
+
+
+class MatchScorer:
+    """
+    A restaurant catalog encoded for batch scoring.
+
+        scorer = MatchScorer(restaurants)
+        scores = scorer.scores(cuisines, prices, dietary)     # int64 array, one per restaurant
+        top = scorer.top_k(20, cuisines, prices, dietary)     # [(restaurant, {"score", "reasons"})]
+    """
+
+    def __init__(self, restaurants):
+        self.restaurants = list(restaurants)
+        n = len(self.restaurants)
+
+        self.cuisine_vocab, cuisine_rows = {}, []
+        self.dietary_vocab, dietary_rows = {}, []
+        self.prices = np.zeros(n, dtype=np.int64)
+        self.ratings = np.zeros(n, dtype=np.float64)
+        self.irregular = np.zeros(n, dtype=bool)
+
+        for i, restaurant in enumerate(self.restaurants):
+            cuisines = restaurant.get("cuisine", [])
+            cuisines = _string_list([cuisines] if isinstance(cuisines, str) else cuisines)
+            dietary = _string_list(restaurant.get("dietaryOptions", []))
+            price = restaurant.get("priceRange", 2)
+            price = len(price) if isinstance(price, str) else _exact_int(price)
+            try:
+                rating = float(restaurant.get("rating", 0))
+            except (TypeError, ValueError):
+                rating = math.nan
+
+            if cuisines is None or dietary is None or price is None or not abs(rating) < 1e15:
+                self.irregular[i] = True
+                cuisines, dietary, price, rating = [], [], 0, 0.0
+
+            cuisine_rows.append([self.cuisine_vocab.setdefault(c, len(self.cuisine_vocab)) for c in cuisines])
+            dietary_rows.append([self.dietary_vocab.setdefault(d, len(self.dietary_vocab)) for d in dietary])
+            self.prices[i] = price
+            self.ratings[i] = rating
+
+        self.cuisine_names = list(self.cuisine_vocab)
+
+        # Cuisines keep their order (the first match is the reason): one id per
+        # column, padded with a sentinel id that never matches
+        width = max((len(row) for row in cuisine_rows), default=0)
+        self.cuisine_ids = np.full((n, width), len(self.cuisine_vocab), dtype=np.int32)
+        for i, row in enumerate(cuisine_rows):
+            self.cuisine_ids[i, :len(row)] = row
+
+        # Dietary options are only tested for membership: a bitmap, plus an
+        # all-False sentinel column for restrictions no restaurant offers
+        self.dietary = np.zeros((n, len(self.dietary_vocab) + 1), dtype=bool)
+        for i, row in enumerate(dietary_rows):
+            self.dietary[i, row] = True
+        self.has_dietary = self.dietary.any(axis=1)
+
+        self.rating_points = np.minimum(10, np.trunc(self.ratings * 2)).astype(np.int64)
+        self.irregular_rows = np.flatnonzero(self.irregular)
+
+    def __len__(self):
+        return len(self.restaurants)
+
+    # ---------------------------
+    # Scoring
+    # ---------------------------
+    def _vectorizable(self, preferred_cuisines, preferred_price, dietary_restrictions):
+        if preferred_cuisines and (isinstance(preferred_cuisines, str) or not isinstance(preferred_cuisines, (list, tuple, set))):
+            return False
+        if not isinstance(preferred_price, (list, tuple)) or any(_exact_int(p) is None for p in preferred_price):
+            return False
+        if dietary_restrictions and _string_list(dietary_restrictions) is None:
+            return False
+        return True
+
+    def _evaluate(self, preferred_cuisines, preferred_price, dietary_restrictions):
+        """Scores plus the per-row intermediates that reasons are built from."""
+        n = len(self.restaurants)
+        score = np.zeros(n, dtype=np.int64)
+
+        # 1. Cuisine (40 / 10 / 20 neutral)
+        cuisine_hit = np.zeros(n, dtype=bool)
+        cuisine_first = np.zeros(n, dtype=np.int64)
+        if preferred_cuisines:
+            wanted = np.zeros(len(self.cuisine_vocab) + 1, dtype=bool)
+            for cuisine in preferred_cuisines:
+                if isinstance(cuisine, str) and cuisine in self.cuisine_vocab:
+                    wanted[self.cuisine_vocab[cuisine]] = True
+            hits = wanted[self.cuisine_ids]
+            if hits.shape[1]:
+                cuisine_hit = hits.any(axis=1)
+                cuisine_first = self.cuisine_ids[np.arange(n), hits.argmax(axis=1)]
+            score += np.where(cuisine_hit, 40, 10)
+        else:
+            score += 20
+
+        # 2. Price (30 exact / 15 within one level)
+        wanted_prices = np.array([_exact_int(p) for p in preferred_price], dtype=np.int64)
+        diff = self.prices[:, None] - wanted_prices[None, :]
+        price_hit = (diff == 0).any(axis=1)
+        price_close = (np.abs(diff) == 1).any(axis=1)
+        score += np.where(price_hit, 30, np.where(price_close, 15, 0))
+
+        # 3. Dietary (20 match / 5 if the restaurant lists nothing / 10 no restrictions)
+        dietary_hit = np.zeros(n, dtype=bool)
+        dietary_first = np.zeros(n, dtype=np.int64)
+        if dietary_restrictions:
+            sentinel = len(self.dietary_vocab)
+            columns = [self.dietary_vocab.get(d, sentinel) for d in dietary_restrictions]
+            hits = self.dietary[:, columns]
+            dietary_hit = hits.any(axis=1)
+            dietary_first = hits.argmax(axis=1)
+            score += np.where(dietary_hit, 20, np.where(self.has_dietary, 0, 5))
+        else:
+            score += 10
+
+        # 4. Rating (up to 10)
+        score += self.rating_points
+        np.minimum(score, 100, out=score)
+
+        return score, cuisine_hit, cuisine_first, price_hit, dietary_hit, dietary_first
+
+    def scores(self, preferred_cuisines, preferred_price, dietary_restrictions):
+        """Match score of every restaurant, in catalog order (int64 array)."""
+        return self._score_all(preferred_cuisines, preferred_price, dietary_restrictions)[0]
+
+    def _score_all(self, preferred_cuisines, preferred_price, dietary_restrictions):
+        prefs = (preferred_cuisines, preferred_price, dietary_restrictions)
+        if not self._vectorizable(*prefs):
+            results = [calculate_match_score(r, *prefs) for r in self.restaurants]
+            return np.array([r["score"] for r in results], dtype=np.int64), results
+
+        evaluated = self._evaluate(*prefs)
+        score = evaluated[0]
+        fallback = {}
+        for i in self.irregular_rows:
+            fallback[i] = calculate_match_score(self.restaurants[i], *prefs)
+            score[i] = fallback[i]["score"]
+        return score, (evaluated, fallback)
+
+    def _result(self, i, state, dietary_restrictions):
+        if isinstance(state, list):
+            return state[i]
+        (score, cuisine_hit, cuisine_first, price_hit, dietary_hit, dietary_first), fallback = state
+        if i in fallback:
+            return fallback[i]
+
+        reasons = []
+        if cuisine_hit[i]:
+            reasons.append(f"Loves {self.cuisine_names[cuisine_first[i]]}")
+        if price_hit[i]:
+            reasons.append(PRICE_LABELS.get(int(self.prices[i]), "Good value"))
+        if dietary_hit[i]:
+            reasons.append(f"Has {dietary_restrictions[dietary_first[i]]} options")
+        rating = float(self.ratings[i])
+        if rating >= 4.5:
+            reasons.append(f"Highly rated ({rating}★)")
+        return {"score": int(score[i]), "reasons": reasons[:3]}
+
+    def score_all(self, preferred_cuisines, preferred_price, dietary_restrictions):
+        """calculate_match_score() for every restaurant, in catalog order."""
+        score, state = self._score_all(preferred_cuisines, preferred_price, dietary_restrictions)
+        return [self._result(i, state, dietary_restrictions) for i in range(len(score))]
+
+    def top_k(self, k, preferred_cuisines, preferred_price, dietary_restrictions):
+        """
+        The k best matches as (restaurant, {"score", "reasons"}), highest score
+        first; ties keep catalog order (same as a stable sort of score_all()).
+        """
+        score, state = self._score_all(preferred_cuisines, preferred_price, dietary_restrictions)
+        n = len(score)
+        if k <= 0 or not n:
+            return []
+        if k < n:
+            # Everything scoring at least the k-th best, still in catalog order
+            kth = np.partition(score, n - k)[n - k]
+            candidates = np.flatnonzero(score >= kth)
+        else:
+            candidates = np.arange(n)
+        order = candidates[np.argsort(-score[candidates], kind="stable")][:k]
+        return [(self.restaurants[i], self._result(i, state, dietary_restrictions)) for i in order]
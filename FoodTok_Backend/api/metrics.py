@@ -0,0 +1,400 @@
+# api/metrics.py
+"""
+Per-request latency and outbound call instrumentation.
+
+MetricsMiddleware opens a RequestMetrics for each request (held in a
+contextvar) and, once the response is ready, folds it into process-wide
+counters and histograms labelled by URL route:
+
+  - instrument() hooks botocore events on every client api/aws.py builds:
+    DynamoDB/S3 call counts, time, request/response bytes, and for
+    DynamoDB operations that support it the ConsumedCapacity returned by
+    asking for ReturnConsumedCapacity=TOTAL,
+  - instrument_session() does the same for outbound requests.Session
+    calls (the Yelp enrichment), and aiohttp_trace_config() for the
+    aiohttp sessions the async views use,
+  - bind() carries the request's metrics into thread pool workers (asyncio
+    tasks inherit them on their own).
+
+Every response gets a Server-Timing header (total time, time and call
+count per service), and GET /metrics serves everything in Prometheus text
+format to scrapers allowed by scrape_allowed(). outbound_calls_per_request is the histogram that shows N+1
+patterns: a route whose calls per request grow with the data instead of
+staying flat.
+Caches (api/profiles.py) count their hits and misses with
+registry.record_cache().
+
+Metrics are per process; with several gunicorn workers a scrape sees the
+worker that answered it. The middleware runs sync under WSGI and async
+under ASGI.
+"""
+import contextvars
+import ipaddress
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised when aiohttp isn't installed
+    aiohttp = None
+
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "true").lower() == "true"
+METRICS_CONSUMED_CAPACITY = os.getenv("METRICS_CONSUMED_CAPACITY", "true").lower() == "true"
+# Who may scrape /metrics: loopback and private ranges (compose network, VPC)
+# by default; an empty value turns the endpoint off
+METRICS_ALLOWED_NETWORKS = tuple(
+    ipaddress.ip_network(network.strip())
+    for network in os.getenv(
+        "METRICS_ALLOWED_NETWORKS", "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"
+    ).split(",")
+    if network.strip()
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+SERVICES = ("dynamodb", "s3", "http")  # always observed, so a route's zero-call requests count too
+# Anything else is recorded as "other", so made-up methods can't add label values
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Outbound work done for one request. Pool threads add to it too, hence the lock."""
+
+    def __init__(self):
+        self.calls = defaultdict(int)  # service -> calls
+        self.seconds = defaultdict(float)  # service -> seconds waiting on it
+        self.bytes_sent = defaultdict(int)
+        self.bytes_received = defaultdict(int)
+        self.capacity = defaultdict(float)  # DynamoDB table -> capacity units
+        self._lock = threading.Lock()
+
+    def record_call(self, service, seconds, received=0):
+        with self._lock:
+            self.calls[service] += 1
+            self.seconds[service] += seconds
+            self.bytes_received[service] += received
+
+    def record_sent(self, service, sent):
+        with self._lock:
+            self.bytes_sent[service] += sent
+
+    def record_capacity(self, table, units):
+        with self._lock:
+            self.capacity[table] += units
+
+
+def current():
+    """The RequestMetrics of the request being handled, or None outside one."""
+    return _current.get()
+
+
+@contextmanager
+def request_scope():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def bind(fn):
+    """fn wrapped so calls it makes from another thread count toward the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _current.set(metrics)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+# ---------------------------
+# botocore / requests hooks
+# ---------------------------
+def _service(event_name):
+    return event_name.split(".")[1]  # "before-call.dynamodb.GetItem"
+
+
+def _body_length(body):
+    return len(body) if isinstance(body, (bytes, bytearray, str)) else 0  # streamed uploads aren't counted
+
+
+def _on_provide_params(params, model, **kwargs):
+    if _current.get() is None or "ReturnConsumedCapacity" in params:
+        return
+    if model.input_shape is not None and "ReturnConsumedCapacity" in model.input_shape.members:
+        params["ReturnConsumedCapacity"] = "TOTAL"
+
+
+def _on_before_call(context, **kwargs):
+    context["metrics_started"] = time.perf_counter()
+
+
+def _on_before_send(request, event_name, **kwargs):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.record_sent(_service(event_name), _body_length(request.body))
+
+
+def _on_after_call(context, event_name, http_response=None, parsed=None, **kwargs):
+    metrics = _current.get()
+    started = context.pop("metrics_started", None)
+    if metrics is None or started is None:
+        return
+    received = int(http_response.headers.get("content-length", 0)) if http_response is not None else 0
+    metrics.record_call(_service(event_name), time.perf_counter() - started, received)
+
+    # One entry for single-table operations, a list for batch/transact ones
+    consumed = (parsed or {}).get("ConsumedCapacity") or []
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    for entry in consumed:
+        metrics.record_capacity(entry.get("TableName", "unknown"), float(entry.get("CapacityUnits", 0)))
+
+
+def instrument(events):
+    """Register the request metrics hooks on a botocore client's event emitter."""
+    if METRICS_CONSUMED_CAPACITY:
+        events.register("provide-client-params.dynamodb", _on_provide_params)
+    events.register("before-call", _on_before_call)
+    events.register("before-send", _on_before_send)
+    events.register("after-call", _on_after_call)
+    events.register("after-call-error", _on_after_call)
+
+
+def _on_http_response(response, *args, **kwargs):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    metrics.record_sent("http", _body_length(response.request.body))
+    metrics.record_call("http", response.elapsed.total_seconds(), int(response.headers.get("content-length", 0)))
+
+
+def instrument_session(session):
+    """Count a requests.Session's calls toward the current request."""
+    session.hooks["response"].append(_on_http_response)
+    return session
+
+
+async def _on_aiohttp_request_start(session, context, params):
+    context.metrics_started = time.perf_counter()
+
+
+async def _on_aiohttp_request_end(session, context, params):
+    metrics = _current.get()
+    if metrics is not None:
+        received = int(params.response.headers.get("Content-Length", 0))
+        metrics.record_call("http", time.perf_counter() - context.metrics_started, received)
+
+
+def aiohttp_trace_config():
+    """A TraceConfig for aiohttp.ClientSession(trace_configs=[...]); the aiohttp twin of instrument_session."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_aiohttp_request_start)
+    trace_config.on_request_end.append(_on_aiohttp_request_end)
+    return trace_config
+
+
+# ---------------------------
+# Process-wide metrics
+# ---------------------------
+def _format_labels(names, values):
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = defaultdict(float)
+
+    def inc(self, labels, amount=1):
+        self.values[labels] += amount
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        names = (*self.labelnames, "le")
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(names, (*labels, bound))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Everything MetricsMiddleware records, rendered for Prometheus by render()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "foodtok_http_requests_total", "Requests handled.", ("route", "method", "status"))
+        self.duration = Histogram(
+            "foodtok_http_request_duration_seconds", "Wall time per request.", ("route", "method"),
+            DURATION_BUCKETS)
+        self.calls_per_request = Histogram(
+            "foodtok_outbound_calls_per_request", "Outbound calls made by one request.", ("route", "service"),
+            CALL_COUNT_BUCKETS)
+        self.calls = Counter(
+            "foodtok_outbound_calls_total", "Outbound calls.", ("route", "service"))
+        self.call_seconds = Counter(
+            "foodtok_outbound_call_seconds_total", "Time spent waiting on outbound calls.", ("route", "service"))
+        self.call_bytes = Counter(
+            "foodtok_outbound_bytes_total", "Outbound call payload bytes.", ("route", "service", "direction"))
+        self.capacity = Counter(
+            "foodtok_dynamodb_consumed_capacity_units_total", "DynamoDB capacity units consumed.", ("route", "table"))
+        self.cache = Counter(
+            "foodtok_cache_requests_total", "Cache lookups by result (hit, miss, error).", ("cache", "result"))
+
+    def record(self, route, method, status, seconds, outbound):
+        with self._lock:
+            self.requests.inc((route, method, str(status)))
+            self.duration.observe((route, method), seconds)
+            for service in {*SERVICES, *outbound.calls}:
+                self.calls_per_request.observe((route, service), outbound.calls.get(service, 0))
+            for service, count in outbound.calls.items():
+                self.calls.inc((route, service), count)
+                self.call_seconds.inc((route, service), outbound.seconds[service])
+            for service, sent in outbound.bytes_sent.items():
+                self.call_bytes.inc((route, service, "sent"), sent)
+            for service, received in outbound.bytes_received.items():
+                self.call_bytes.inc((route, service, "received"), received)
+            for table, units in outbound.capacity.items():
+                self.capacity.inc((route, table), units)
+
+    def record_cache(self, cache, result):
+        with self._lock:
+            self.cache.inc((cache, result))
+
+    def render(self, pools=None):
+        """
+        Prometheus text exposition. pools is api.aws.pool_metrics(), shown as
+        per-client gauges next to the request metrics.
+        """
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.duration, self.calls_per_request, self.calls,
+                           self.call_seconds, self.call_bytes, self.capacity, self.cache):
+                lines.extend(metric.lines())
+        for field in ("in_flight", "peak_in_flight", "max_pool_connections", "requests", "retries", "errors"):
+            name = f"foodtok_aws_pool_{field}"
+            lines.append(f"# TYPE {name} gauge")
+            for client, stats in sorted((pools or {}).items()):
+                lines.append(f"{name}{_format_labels(('client',), (client,))} {stats[field]}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def server_timing(seconds, outbound):
+    """Server-Timing header value: total, then time and calls per service."""
+    parts = [f"app;dur={seconds * 1000:.1f}"]
+    for service, count in sorted(outbound.calls.items()):
+        parts.append(f'{service};desc="{count} calls";dur={outbound.seconds[service] * 1000:.1f}')
+    return ", ".join(parts)
+
+
+def scrape_allowed(request):
+    """
+    True if request may read /metrics: a direct connection from
+    METRICS_ALLOWED_NETWORKS. Anything that came through the load balancer
+    (which adds X-Forwarded-For) is refused, since the balancer's own
+    address is inside the VPC.
+    """
+    if "HTTP_X_FORWARDED_FOR" in request.META:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    address = getattr(address, "ipv4_mapped", None) or address  # "::ffff:10.0.0.5" from dual-stack servers
+    return any(address in network for network in METRICS_ALLOWED_NETWORKS)
+
+
+class MetricsMiddleware:
+    """Outermost middleware: times each request and records its outbound calls."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with request_scope() as outbound:
+            response = self.get_response(request)
+        return self._finish(request, response, time.perf_counter() - started, outbound)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with request_scope() as outbound:
+            response = await self.get_response(request)
+        return self._finish(request, response, time.perf_counter() - started, outbound)
+
+    def _finish(self, request, response, seconds, outbound):
+        # The route pattern, not the path, so ids don't become labels
+        match = getattr(request, "resolver_match", None)
+        route = f"/{match.route}" if match is not None and match.route else "unmatched"
+        method = request.method if request.method in HTTP_METHODS else "other"
+        registry.record(route, method, response.status_code, seconds, outbound)
+
+        if METRICS_SERVER_TIMING:
+            response["Server-Timing"] = server_timing(seconds, outbound)
+            response["Timing-Allow-Origin"] = "*"
+        return response
@@ -0,0 +1,122 @@
+# api/passwords.py
+"""
+Bounded bcrypt worker pool.
+
+bcrypt is deliberately slow (~250 ms at cost 12), so running it on the
+request thread lets a burst of logins starve every other endpoint. All
+hashing/verification is sent to a dedicated process pool instead, and
+admission is capped: once PASSWORD_HASH_QUEUE_LIMIT jobs are in flight,
+new callers get PasswordHasherBusy immediately (the views turn that into
+503 + Retry-After) rather than queueing behind the storm.
+
+A worker that dies (OOM kill, signal) breaks the whole ProcessPoolExecutor;
+the broken pool is dropped and the job retried once on a fresh one, so a
+single crash doesn't fail every later login until the process restarts.
+
+This module must not import Django - pool workers are spawned processes
+that import it on their own.
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+def _available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(_available_cores())))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", str(PASSWORD_HASH_WORKERS * 4)))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", "1"))
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated; callers should retry later."""
+
+    def __init__(self, retry_after=PASSWORD_HASH_RETRY_AFTER):
+        super().__init__("Password service busy, retry later")
+        self.retry_after = retry_after
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_QUEUE_LIMIT)
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn, not fork: the parent is a threaded web worker
+                _executor = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def _reset_executor(broken):
+    """Drop a broken pool so the next _get_executor() starts a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(executor, fn, args):
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        raise PasswordHasherBusy()
+
+
+def _submit(fn, *args):
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            return _run(executor, fn, args)
+        except BrokenProcessPool as e:
+            print(f"Password hashing pool broke ({e}), starting a new one")
+            _reset_executor(executor)
+            if attempt:
+                raise
+
+
+# Pool workers (module-level so they pickle)
+def _hash_worker(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _check_worker(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def hash_password(password):
+    """Hash a plain-text password with the configured cost factor."""
+    return _submit(_hash_worker, password.encode("utf-8"), BCRYPT_ROUNDS)
+
+
+def check_password(password, hashed):
+    """Verify a plain-text password against a stored bcrypt hash."""
+    return _submit(_check_worker, password.encode("utf-8"), hashed.encode("utf-8"))
@@ -0,0 +1,221 @@
+# api/profiles.py
+"""
+Read-through cache for user profiles.
+
+The frontend fetches GET /api/auth/profile/:userId on most page loads, and
+a profile only changes through update_preferences and change_password:
+
+  - get_profile (sync and async views) reads through ProfileCache: a hit
+    skips DynamoDB, a miss loads the item and fills the cache,
+  - those writes ask DynamoDB for ReturnValues="ALL_NEW" and put the
+    returned item straight into the cache, so the next read is a hit that
+    already has the new values.
+
+Only the public profile (the response's "user" object) is cached; the
+password hash never leaves DynamoDB. Entries are stored as JSON, so the
+backends are interchangeable:
+
+  PROFILE_CACHE=memory              in-process LRU with a TTL (default)
+  PROFILE_CACHE=redis://host:6379/0 a Redis-compatible server shared by all workers
+  PROFILE_CACHE=off
+
+A memory cache is per process: after a write, other workers and tasks can
+serve the old profile for up to PROFILE_CACHE_TTL seconds. Redis closes
+that gap. Fills only store a profile when the key is absent and writes
+always overwrite, so a read that loaded the item just before a write can't
+put the old version back over the new one.
+
+Lookups are counted in /metrics as foodtok_cache_requests_total.
+"""
+import json
+import os
+import time
+
+from asgiref.sync import sync_to_async
+
+from . import metrics
+from .renderers import dumps
+from .restaurants import TTLCache
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - exercised when redis isn't installed
+    redis = None
+
+PROFILE_CACHE = os.getenv("PROFILE_CACHE", "memory")
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", "30"))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_REDIS_TIMEOUT = float(os.getenv("PROFILE_CACHE_REDIS_TIMEOUT", "0.1"))
+
+
+def public_profile(user, user_id=None):
+    """A Users item as the profile endpoints return it: no password, userId as id."""
+    profile = {k: v for k, v in user.items() if k != "password"}
+    profile["id"] = profile.pop("userId", user_id)
+    return profile
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+class MemoryBackend:
+    """Per-process LRU with a TTL. Holds the same JSON bytes Redis would."""
+
+    blocking = False
+
+    def __init__(self, max_entries=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL, clock=time.monotonic):
+        self.cache = TTLCache(max_entries=max_entries, ttl=ttl, clock=clock)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value)
+
+    def add(self, key, value):
+        return self.cache.add(key, value)
+
+
+class RedisBackend:
+    """
+    Any client with redis-py's get/set (redis.Redis, or the fake in
+    tests/api/fake_redis.py). Calls block, so the async views run them in
+    a thread.
+    """
+
+    blocking = True
+
+    def __init__(self, client, ttl=PROFILE_CACHE_TTL, prefix="foodtok:profile:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, ttl=PROFILE_CACHE_TTL, timeout=PROFILE_CACHE_REDIS_TIMEOUT):
+        if redis is None:
+            raise RuntimeError("PROFILE_CACHE points at Redis but the redis package is not installed")
+        return cls(redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout), ttl=ttl)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def add(self, key, value):
+        return bool(self.client.set(self.prefix + key, value, ex=self.ttl, nx=True))
+
+
+# ---------------------------
+# Cache
+# ---------------------------
+class ProfileCache:
+    """
+    Read-through, write-through profile cache over a backend (None: off).
+
+        profile = profile_cache.get_or_load(user_id, lambda: table.get_item(...).get("Item"))
+        profile = profile_cache.put(user_id, response["Attributes"])  # after a ReturnValues="ALL_NEW" write
+
+    A failing backend (Redis down) is logged and counted as an error, and
+    the request goes on to DynamoDB as if the cache were off.
+    """
+
+    def __init__(self, backend, name="profile"):
+        self.backend = backend
+        self.name = name
+
+    @classmethod
+    def from_env(cls, setting=PROFILE_CACHE, ttl=PROFILE_CACHE_TTL, max_entries=PROFILE_CACHE_SIZE):
+        if setting == "off":
+            return cls(None)
+        if setting == "memory":
+            return cls(MemoryBackend(max_entries=max_entries, ttl=ttl))
+        if setting.startswith(("redis://", "rediss://", "unix://")):
+            return cls(RedisBackend.from_url(setting, ttl=ttl))
+        raise ValueError(f"Unknown PROFILE_CACHE {setting!r} (expected memory, off or a redis:// URL)")
+
+    def _record(self, result):
+        metrics.registry.record_cache(self.name, result)
+
+    def _decode(self, raw):
+        self._record("miss" if raw is None else "hit")
+        return None if raw is None else json.loads(raw)
+
+    def _failed(self, action, error):
+        print(f"Profile cache {action} failed: {error}")
+        self._record("error")
+
+    # ---------------------------
+    # Sync views
+    # ---------------------------
+    def get(self, user_id):
+        """The cached profile, or None."""
+        if self.backend is None:
+            return None
+        try:
+            raw = self.backend.get(user_id)
+        except Exception as e:
+            self._failed("read", e)
+            return None
+        return self._decode(raw)
+
+    def get_or_load(self, user_id, load):
+        """
+        The profile for user_id: from the cache, or from load() (returning
+        the Users item, or None if there is none) and then cached.
+        """
+        profile = self.get(user_id)
+        if profile is not None:
+            return profile
+        user = load()
+        if user is None:
+            return None
+        profile = public_profile(user)
+        self._store("add", user_id, profile)
+        return profile
+
+    def put(self, user_id, user):
+        """Write-through of the item a write returned; the profile to respond with."""
+        profile = public_profile(user, user_id)
+        self._store("set", user_id, profile)
+        return profile
+
+    def _store(self, method, user_id, profile):
+        if self.backend is None:
+            return
+        try:
+            getattr(self.backend, method)(user_id, dumps(profile))
+        except Exception as e:
+            self._failed("write", e)
+
+    # ---------------------------
+    # Async views
+    # ---------------------------
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await sync_to_async(method, thread_sensitive=False)(*args)
+        return method(*args)
+
+    async def aget_or_load(self, user_id, load):
+        """get_or_load for async views; load is a coroutine function."""
+        if self.backend is None:
+            user = await load()
+            return public_profile(user) if user is not None else None
+        try:
+            raw = await self._call(self.backend.get, user_id)
+        except Exception as e:
+            self._failed("read", e)
+        else:
+            profile = self._decode(raw)
+            if profile is not None:
+                return profile
+
+        user = await load()
+        if user is None:
+            return None
+        profile = public_profile(user)
+        try:
+            await self._call(self.backend.add, user_id, dumps(profile))
+        except Exception as e:
+            self._failed("write", e)
+        return profile
@@ -0,0 +1,293 @@
+# api/recommendations.py
+"""
+Precomputed discovery rankings.
+
+Each user's best RECOMMENDATION_DEPTH restaurants are stored in the
+RecommendationScores table, so serving the feed is one query on the
+UserRanking LSI instead of scoring the whole catalog per request:
+
+    userId        = "user_001"                  (partition key)
+    restaurantId  = "rest_abc"                  (sort key)
+    rankKey       = "<100 - score>#<restaurantId>"   (LSI sort key, best first)
+    overallScore  = match score (0-100)
+    reasons       = match reasons
+    restaurant    = card summary (name, image, cuisine, price, rating)
+
+A per-user "#meta" row (no rankKey, so it stays out of the LSI) records a
+fingerprint of the preferences the ranking was built from. Meta rows also
+carry a rankedShard, the partition key of the sparse RankedUsers GSI, so
+finding every ranked user is RANKED_USER_SHARDS queries rather than a scan
+of every stored score. Rankings are rebuilt only when that fingerprint
+changes (update_preferences, or a user's first feed request, on a
+background thread), and patched
+restaurant by restaurant when the catalog changes (refresh_restaurants,
+run by `manage.py refresh_recommendations`).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.dynamodb.conditions import Key
+
+from .matching import MatchScorer, calculate_match_score
+
+RECOMMENDATION_DEPTH = int(os.getenv("RECOMMENDATION_DEPTH", "200"))
+CATALOG_TTL = float(os.getenv("RECOMMENDATION_CATALOG_TTL", "300"))
+RANKING_INDEX = os.getenv("DDB_RECOMMENDATION_RANKING_INDEX", "UserRanking")
+RANKED_USERS_INDEX = os.getenv("DDB_RECOMMENDATION_RANKED_USERS_INDEX", "RankedUsers")
+RANKED_USER_SHARDS = int(os.getenv("RECOMMENDATION_RANKED_USER_SHARDS", "8"))
+META_KEY = "#meta"
+CARD_FIELDS = ("name", "imageUrl", "cuisine", "priceRange", "rating", "address")
+
+
+def scoring_preferences(preferences):
+    """
+    (cuisines, prices, dietary) in the shape calculate_match_score expects,
+    from a stored preferences map ("cuisineTypes" or "cuisines", priceRange
+    as "$$", a number or a list of either).
+    """
+    preferences = preferences or {}
+    cuisines = preferences.get("cuisineTypes") or preferences.get("cuisines") or []
+    price = preferences.get("priceRange") or []
+    prices = []
+    for p in price if isinstance(price, (list, tuple)) else [price]:
+        prices.append(len(p) if isinstance(p, str) else int(p))
+    dietary = preferences.get("dietaryRestrictions") or []
+    return list(cuisines), prices, list(dietary)
+
+
+def preferences_fingerprint(preferences):
+    raw = json.dumps(scoring_preferences(preferences), sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def rank_key(score, restaurant_id):
+    return f"{100 - int(score):03d}#{restaurant_id}"
+
+
+def ranked_shard(user_id):
+    """RankedUsers partition for a user's meta row; spreads meta writes over RANKED_USER_SHARDS keys."""
+    return str(int(hashlib.sha1(user_id.encode("utf-8")).hexdigest(), 16) % RANKED_USER_SHARDS)
+
+
+class Recommender:
+    def __init__(self, scores_table, restaurants_table, users_table, depth=RECOMMENDATION_DEPTH, catalog_ttl=CATALOG_TTL):
+        self.scores_table = scores_table
+        self.restaurants_table = restaurants_table
+        self.users_table = users_table
+        self.depth = depth
+        self.catalog_ttl = catalog_ttl
+        self._scorer = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._background = None
+
+    # ---------------------------
+    # Catalog
+    # ---------------------------
+    def scorer(self):
+        """MatchScorer over the whole Restaurants table, reloaded every catalog_ttl seconds."""
+        with self._lock:
+            if self._scorer is None or time.monotonic() - self._loaded_at > self.catalog_ttl:
+                restaurants, kwargs = [], {}
+                while True:
+                    response = self.restaurants_table.scan(**kwargs)
+                    restaurants.extend(response.get("Items", []))
+                    if "LastEvaluatedKey" not in response:
+                        break
+                    kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+                self._scorer = MatchScorer(restaurants)
+                self._loaded_at = time.monotonic()
+            return self._scorer
+
+    def loaded_scorer(self):
+        """The loaded MatchScorer if it is still fresh, else None. Never scans or waits on a load."""
+        scorer, loaded_at = self._scorer, self._loaded_at
+        if scorer is None or time.monotonic() - loaded_at > self.catalog_ttl:
+            return None
+        return scorer
+
+    def invalidate_catalog(self):
+        """Make the next rebuild rescan the Restaurants table."""
+        with self._lock:
+            self._scorer = None
+
+    def _row(self, user_id, restaurant, result):
+        return {
+            "userId": user_id,
+            "restaurantId": restaurant["id"],
+            "rankKey": rank_key(result["score"], restaurant["id"]),
+            "overallScore": result["score"],
+            "reasons": result["reasons"],
+            "restaurant": {f: restaurant[f] for f in CARD_FIELDS if restaurant.get(f) not in (None, "")},
+        }
+
+    # ---------------------------
+    # Reads
+    # ---------------------------
+    def feed(self, user_id, limit=20, start_key=None):
+        """One page of a user's ranking, best first. Returns (rows, last_evaluated_key)."""
+        kwargs = {
+            "IndexName": RANKING_INDEX,
+            "KeyConditionExpression": Key("userId").eq(user_id),
+            "Limit": limit,
+        }
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = self.scores_table.query(**kwargs)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
+    def preview(self, user_id, preferences, limit=20):
+        """
+        A first page scored on the spot, in feed()'s row shape, for a user
+        whose ranking is still being built. Empty while the catalog isn't
+        loaded, so a request never pays for the Restaurants scan.
+        """
+        scorer = self.loaded_scorer()
+        if scorer is None:
+            return []
+        return [self._row(user_id, restaurant, result)
+                for restaurant, result in scorer.top_k(limit, *scoring_preferences(preferences))]
+
+    def meta(self, user_id):
+        return self.scores_table.get_item(Key={"userId": user_id, "restaurantId": META_KEY}).get("Item")
+
+    # ---------------------------
+    # Rebuilding a user's ranking
+    # ---------------------------
+    def refresh_user(self, user_id, preferences, force=False, only_if_ranked=False):
+        """
+        Rebuild a user's ranking if the scoring-relevant preferences changed
+        since it was last built. With only_if_ranked, users who have no
+        ranking yet are left for the feed to build on first visit. Returns
+        True if anything was rewritten.
+        """
+        fingerprint = preferences_fingerprint(preferences)
+        meta = self.meta(user_id)
+        if meta is None and only_if_ranked:
+            return False
+        if meta and meta.get("fingerprint") == fingerprint and not force:
+            return False
+
+        top = self.scorer().top_k(self.depth, *scoring_preferences(preferences))
+        rows = [self._row(user_id, restaurant, result) for restaurant, result in top]
+        keep = {row["restaurantId"] for row in rows}
+        stale = [rid for rid in self._stored_ids(user_id) if rid not in keep]
+
+        with self.scores_table.batch_writer(overwrite_by_pkeys=["userId", "restaurantId"]) as batch:
+            for row in rows:
+                batch.put_item(Item=row)
+            for rid in stale:
+                batch.delete_item(Key={"userId": user_id, "restaurantId": rid})
+            batch.put_item(Item={
+                "userId": user_id,
+                "restaurantId": META_KEY,
+                "fingerprint": fingerprint,
+                "preferences": [list(p) for p in scoring_preferences(preferences)],
+                "rankedShard": ranked_shard(user_id),
+                "updatedAt": int(time.time()),
+            })
+        return True
+
+    def refresh_user_later(self, user_id, preferences, **kwargs):
+        """
+        refresh_user on a background thread, so a preferences update doesn't
+        wait for the rebuild. One worker runs the rebuilds in submission
+        order, so a user's latest preferences are the ones that stick.
+        Returns the Future.
+        """
+        def run():
+            try:
+                return self.refresh_user(user_id, preferences, **kwargs)
+            except Exception as e:
+                print(f"Recommendation refresh failed for {user_id}: {e}")
+                return False
+
+        with self._lock:
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recommendations")
+            return self._background.submit(run)
+
+    def _stored_ids(self, user_id):
+        ids, kwargs = [], {
+            "KeyConditionExpression": Key("userId").eq(user_id),
+            "ProjectionExpression": "restaurantId",
+        }
+        while True:
+            response = self.scores_table.query(**kwargs)
+            ids.extend(item["restaurantId"] for item in response.get("Items", []) if item["restaurantId"] != META_KEY)
+            if "LastEvaluatedKey" not in response:
+                return ids
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    # ---------------------------
+    # Catalog changes
+    # ---------------------------
+    def refresh_restaurants(self, restaurants, removed_ids=()):
+        """
+        Patch every stored ranking for changed/added restaurants and removed
+        restaurant ids, scoring only those restaurants. Returns the number
+        of rankings touched.
+        """
+        changed = list(restaurants)
+        touched = 0
+        # Backfills score against the updated catalog
+        self.invalidate_catalog()
+        for user in self.ranked_users():
+            user_id, prefs = user["userId"], user.get("preferences") or [[], [], []]
+            results = [(r, calculate_match_score(r, *prefs)) for r in changed]
+            if self._patch_user(user_id, prefs, results, removed_ids):
+                touched += 1
+        return touched
+
+    def ranked_users(self):
+        """Meta rows (userId, preferences) of every user that has a stored ranking."""
+        for shard in range(RANKED_USER_SHARDS):
+            kwargs = {
+                "IndexName": RANKED_USERS_INDEX,
+                "KeyConditionExpression": Key("rankedShard").eq(str(shard)),
+                "ProjectionExpression": "userId, preferences",
+            }
+            while True:
+                response = self.scores_table.query(**kwargs)
+                yield from response.get("Items", [])
+                if "LastEvaluatedKey" not in response:
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def _patch_user(self, user_id, prefs, results, removed_ids):
+        # Lowest score still in the ranking; below it a restaurant doesn't make the cut
+        tail, _ = self.feed(user_id, limit=self.depth)
+        cutoff = tail[-1]["overallScore"] if len(tail) >= self.depth else -1
+        stored = {row["restaurantId"] for row in tail}
+
+        puts = [self._row(user_id, r, res) for r, res in results if res["score"] >= cutoff]
+        deletes = {r["id"] for r, res in results if res["score"] < cutoff and r["id"] in stored}
+        deletes |= {rid for rid in removed_ids if rid in stored}
+        if not puts and not deletes:
+            return False
+
+        with self.scores_table.batch_writer(overwrite_by_pkeys=["userId", "restaurantId"]) as batch:
+            for row in puts:
+                batch.put_item(Item=row)
+            for rid in deletes:
+                batch.delete_item(Key={"userId": user_id, "restaurantId": rid})
+
+        # Trim anything pushed past the configured depth
+        ranked, _ = self.feed(user_id, limit=self.depth + len(puts))
+        with self.scores_table.batch_writer() as batch:
+            for row in ranked[self.depth:]:
+                batch.delete_item(Key={"userId": user_id, "restaurantId": row["restaurantId"]})
+
+        # Deletes can leave the ranking short; refill it with the next best restaurants
+        if len(ranked) < self.depth:
+            kept = {row["restaurantId"] for row in ranked} | set(removed_ids)
+            top = self.scorer().top_k(self.depth + len(removed_ids), *prefs)
+            fill = [(r, res) for r, res in top if r["id"] not in kept][:self.depth - len(ranked)]
+            with self.scores_table.batch_writer(overwrite_by_pkeys=["userId", "restaurantId"]) as batch:
+                for restaurant, result in fill:
+                    batch.put_item(Item=self._row(user_id, restaurant, result))
+        return True
@@ -0,0 +1,68 @@
+# api/renderers.py
+"""
+JSON rendering for API responses.
+
+Views return DynamoDB items as they come back from boto3 (Decimal numbers,
+sets), and FoodTokJSONRenderer serializes them in one pass: Decimal becomes
+an int when integral and a float otherwise, sets become lists, binary
+attributes become base64 strings, and datetimes are ISO 8601 (UTC as
+"Z"). orjson is used when installed, the
+standard library json module otherwise.
+"""
+import base64
+import datetime
+import json
+from decimal import Decimal
+
+from boto3.dynamodb.types import Binary
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson isn't installed
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson else 0
+
+
+def json_default(obj):
+    """Fallback for types json/orjson don't serialize natively."""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        value = obj.isoformat()
+        return value[:-6] + "Z" if value.endswith("+00:00") else value
+    if isinstance(obj, Binary):
+        obj = obj.value
+    if isinstance(obj, (bytes, bytearray)):
+        # Arbitrary bytes aren't text; base64 like boto3 and DRF clients expect
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_stdlib(data):
+    return json.dumps(
+        data, default=json_default, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+    ).encode("utf-8")
+
+
+def dumps(data, use_orjson=True):
+    """data as compact UTF-8 JSON bytes."""
+    if orjson is not None and use_orjson:
+        return orjson.dumps(data, default=json_default, option=ORJSON_OPTIONS)
+    return _dumps_stdlib(data)
+
+
+class FoodTokJSONRenderer(BaseRenderer):
+    """DRF renderer that serializes DynamoDB items directly (see module docstring)."""
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return dumps(data)
@@ -0,0 +1,430 @@
+# api/restaurants.py
+"""
+Restaurant details enrichment.
+
+Reservations only store a restaurantId; the UI needs name, image, cuisine,
+address and rating. Those come from Yelp's business endpoint, which is slow
+and rate limited, so lookups go through:
+
+  1. an in-process LRU with a TTL,
+  2. optionally a DynamoDB cache table (DDB_RESTAURANT_CACHE_TABLE, whose
+     rows DynamoDB TTL deletes once expiresAt passes; reads also skip
+     expired rows, as TTL deletion can lag by hours),
+  3. concurrent fetches over one pooled HTTP session for whatever is left.
+
+Restaurant IDs are deduped first, so N reservations at the same place cost
+at most one fetch. Batch calls to the cache table re-send unprocessed keys
+and items with jittered backoff, RESTAURANT_CACHE_BATCH_ATTEMPTS times at
+most; whatever is still unprocessed counts as a cache miss (reads) or is
+left uncached (writes).
+
+AsyncRestaurantEnricher does the same lookups for the async views, sharing
+a RestaurantEnricher's cache: the DynamoDB cache through an aioboto3
+client, and upstream fetches as concurrent aiohttp requests instead of
+thread pool jobs. The lookup order and merging (lookup_details) and the
+reservation decorating (enrichable_ids / attach_details) are shared, so
+only the I/O differs.
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+from .dynamo import decode_item, encode_item
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised when aiohttp isn't installed
+    aiohttp = None
+
+YELP_API_BASE = os.getenv("YELP_API_BASE", "https://api.yelp.com/v3")
+YELP_API_KEY = os.getenv(
+    "YELP_API_KEY",
+    "XGjtnGCXkhEW5wggLQvG18IR1bDTz6eP-Wb6cc2W9ACdxEDmNhon2vQm6SEcb1jUJAdD8Mh048Zpfp-G4DjrFBCiX4AJaQZxPqCEJWVwXok4CKwp4d-PO43sH_MkaXYx"
+)
+RESTAURANT_CACHE_TTL = int(os.getenv("RESTAURANT_CACHE_TTL", "3600"))
+RESTAURANT_CACHE_SIZE = int(os.getenv("RESTAURANT_CACHE_SIZE", "2048"))
+RESTAURANT_FETCH_WORKERS = int(os.getenv("RESTAURANT_FETCH_WORKERS", "8"))
+RESTAURANT_FETCH_TIMEOUT = float(os.getenv("RESTAURANT_FETCH_TIMEOUT", "3"))
+RESTAURANT_CACHE_BATCH_ATTEMPTS = int(os.getenv("RESTAURANT_CACHE_BATCH_ATTEMPTS", "5"))
+RESTAURANT_CACHE_BATCH_BACKOFF = float(os.getenv("RESTAURANT_CACHE_BATCH_BACKOFF", "0.05"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, max_entries=RESTAURANT_CACHE_SIZE, ttl=RESTAURANT_CACHE_TTL, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key, value):
+        """set() unless the key holds an unexpired entry; True if it stored value."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > self._clock():
+                return False
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def summarize_business(business):
+    """Reduce a Yelp business payload to the fields we attach to reservations."""
+    address_parts = business.get("location", {}).get("display_address", [])
+    return {
+        "restaurantName": business.get("name", business.get("id", "")),
+        "restaurantImage": business.get("image_url", ""),
+        "restaurantCuisine": [cat["title"] for cat in business.get("categories", [])],
+        "restaurantAddress": ", ".join(address_parts) if address_parts else "",
+        "restaurantRating": business.get("rating", 0),
+    }
+
+
+def batch_backoff(attempt):
+    """Seconds to wait before re-sending a batch's unprocessed keys/items"""
+    return random.uniform(0, RESTAURANT_CACHE_BATCH_BACKOFF * 2 ** attempt)
+
+
+def lookup_details(cache, restaurant_ids):
+    """
+    get_many without the I/O, shared by both enrichers: a generator that
+    yields ("ddb_get", ids), ("fetch", ids) and ("ddb_put", details_by_id)
+    steps, takes each step's result back via send(), and returns
+    {restaurantId: details}. ddb_get and fetch answer {restaurantId:
+    details}; fetch maps IDs it could not resolve to None.
+    """
+    results = {}
+    misses = []
+    for rid in dict.fromkeys(rid for rid in restaurant_ids if rid):
+        details = cache.get(rid)
+        if details is None:
+            misses.append(rid)
+        else:
+            results[rid] = details
+
+    if misses:
+        from_ddb = yield "ddb_get", misses
+        for rid, details in from_ddb.items():
+            cache.set(rid, details)
+        results.update(from_ddb)
+        misses = [rid for rid in misses if rid not in from_ddb]
+
+    if misses:
+        fetched = yield "fetch", misses
+        fetched = {rid: d for rid, d in fetched.items() if d is not None}
+        for rid, details in fetched.items():
+            cache.set(rid, details)
+        if fetched:
+            yield "ddb_put", fetched
+        results.update(fetched)
+
+    return results
+
+
+def enrichable_ids(reservations):
+    """Restaurant IDs worth looking up for these reservations (test_ IDs are skipped)"""
+    return {
+        r.get("restaurantId") for r in reservations
+        if r.get("restaurantId") and not r.get("restaurantId").startswith("test_")
+    }
+
+
+def attach_details(reservations, ids, details_by_id):
+    """Decorate reservations in place; unresolved restaurants fall back to their ID."""
+    for reservation in reservations:
+        rid = reservation.get("restaurantId")
+        if rid not in ids:
+            continue
+        details = details_by_id.get(rid)
+        if details is not None:
+            reservation.update(details)
+        else:
+            reservation["restaurantName"] = rid
+            reservation["restaurantCuisine"] = []
+    return reservations
+
+
+class RestaurantEnricher:
+    """Batch restaurant-details lookup with memory/DynamoDB caching."""
+
+    def __init__(
+        self,
+        base_url=YELP_API_BASE,
+        api_key=YELP_API_KEY,
+        cache=None,
+        ddb_table=None,
+        max_workers=RESTAURANT_FETCH_WORKERS,
+        timeout=RESTAURANT_FETCH_TIMEOUT,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else TTLCache()
+        self.ddb_table = ddb_table
+
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {api_key}", "accept": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        metrics.instrument_session(self.session)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="restaurant-fetch")
+
+    # ---------------------------
+    # DynamoDB cache (optional)
+    # ---------------------------
+    def _ddb_get_many(self, restaurant_ids):
+        if self.ddb_table is None or not restaurant_ids:
+            return {}
+        found = {}
+        now = int(time.time())
+        ids = list(restaurant_ids)
+        try:
+            for start in range(0, len(ids), 100):  # BatchGetItem limit
+                request = {self.ddb_table.name: {"Keys": [{"id": rid} for rid in ids[start:start + 100]]}}
+                for attempt in range(RESTAURANT_CACHE_BATCH_ATTEMPTS):
+                    if attempt:
+                        time.sleep(batch_backoff(attempt))
+                    # the resource's client (de)serializes, so items come back as plain Python
+                    response = self.ddb_table.meta.client.batch_get_item(RequestItems=request)
+                    for item in response.get("Responses", {}).get(self.ddb_table.name, []):
+                        if int(item.get("expiresAt", 0)) > now:
+                            found[item["id"]] = json.loads(item["details"])
+                    request = response.get("UnprocessedKeys")
+                    if not request:
+                        break
+        except Exception as e:
+            print(f"Restaurant cache read failed: {e}")
+        return found
+
+    def _ddb_put_many(self, details_by_id):
+        if self.ddb_table is None or not details_by_id:
+            return
+        expires_at = int(time.time()) + self.cache.ttl
+        puts = [
+            {"PutRequest": {"Item": {"id": rid, "details": json.dumps(details), "expiresAt": expires_at}}}
+            for rid, details in details_by_id.items()
+        ]
+        try:
+            for start in range(0, len(puts), 25):  # BatchWriteItem limit
+                request = {self.ddb_table.name: puts[start:start + 25]}
+                for attempt in range(RESTAURANT_CACHE_BATCH_ATTEMPTS):
+                    if attempt:
+                        time.sleep(batch_backoff(attempt))
+                    request = self.ddb_table.meta.client.batch_write_item(RequestItems=request).get("UnprocessedItems")
+                    if not request:
+                        break
+                else:
+                    print(f"Restaurant cache write left {len(request[self.ddb_table.name])} items unprocessed")
+        except Exception as e:
+            print(f"Restaurant cache write failed: {e}")
+
+    # ---------------------------
+    # Upstream fetch
+    # ---------------------------
+    def fetch_one(self, restaurant_id):
+        """Fetch a single business from Yelp; None if it could not be fetched."""
+        try:
+            response = self.session.get(f"{self.base_url}/businesses/{restaurant_id}", timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"Could not fetch restaurant {restaurant_id}: {e}")
+            return None
+        if response.status_code != 200:
+            print(f"Yelp API returned {response.status_code} for {restaurant_id}")
+            return None
+        return summarize_business(response.json())
+
+    def _fetch_many(self, restaurant_ids):
+        return dict(zip(restaurant_ids, self._pool.map(metrics.bind(self.fetch_one), restaurant_ids)))
+
+    def get_many(self, restaurant_ids):
+        """
+        Return {restaurantId: details} for every ID that could be resolved.
+        IDs that fail upstream are simply absent from the result.
+        """
+        io = {"ddb_get": self._ddb_get_many, "fetch": self._fetch_many, "ddb_put": self._ddb_put_many}
+        steps = lookup_details(self.cache, restaurant_ids)
+        try:
+            step, arg = next(steps)
+            while True:
+                step, arg = steps.send(io[step](arg))
+        except StopIteration as done:
+            return done.value
+
+    def enrich(self, reservations):
+        """Attach restaurant details to each reservation in place."""
+        ids = enrichable_ids(reservations)
+        return attach_details(reservations, ids, self.get_many(ids))
+
+
+class AsyncRestaurantEnricher:
+    """
+    RestaurantEnricher for coroutines. Wraps a RestaurantEnricher and uses its
+    base URL, API key, timeout and in-process cache, so sync and async views
+    warm the same cache:
+
+        enricher = AsyncRestaurantEnricher(restaurant_enricher)
+        await enricher.enrich(reservations)
+
+    For the optional DynamoDB cache pass get_ddb_client, a coroutine
+    function returning the running loop's aioboto3 DynamoDB client (e.g.
+    lambda: async_registry.client("dynamodb")), and the table name. Each
+    event loop gets its own aiohttp session, holding at most max_workers
+    connections.
+    """
+
+    def __init__(self, enricher, get_ddb_client=None, ddb_table_name=None):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is not installed; pip install aiohttp to serve the async views")
+        self.enricher = enricher
+        self.cache = enricher.cache
+        self.get_ddb_client = get_ddb_client
+        self.ddb_table_name = ddb_table_name
+        self._sessions = weakref.WeakKeyDictionary()  # loop -> aiohttp.ClientSession
+
+    def _session(self):
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._sessions[loop] = aiohttp.ClientSession(
+                headers=dict(self.enricher.session.headers),
+                connector=aiohttp.TCPConnector(limit=self.enricher.max_workers),
+                timeout=aiohttp.ClientTimeout(total=self.enricher.timeout),
+                trace_configs=[metrics.aiohttp_trace_config()],
+            )
+        return session
+
+    async def close(self):
+        """Close the running loop's session (tests and scripts; servers keep theirs)."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    # ---------------------------
+    # DynamoDB cache (optional)
+    # ---------------------------
+    async def _ddb_get_many(self, restaurant_ids):
+        if self.get_ddb_client is None or not restaurant_ids:
+            return {}
+        found = {}
+        now = int(time.time())
+        ids = list(restaurant_ids)
+        try:
+            client = await self.get_ddb_client()
+            for start in range(0, len(ids), 100):  # BatchGetItem limit
+                request = {self.ddb_table_name: {"Keys": [encode_item({"id": rid}) for rid in ids[start:start + 100]]}}
+                for attempt in range(RESTAURANT_CACHE_BATCH_ATTEMPTS):
+                    if attempt:
+                        await asyncio.sleep(batch_backoff(attempt))
+                    response = await client.batch_get_item(RequestItems=request)
+                    for item in response.get("Responses", {}).get(self.ddb_table_name, []):
+                        item = decode_item(item)
+                        if int(item.get("expiresAt", 0)) > now:
+                            found[item["id"]] = json.loads(item["details"])
+                    request = response.get("UnprocessedKeys")
+                    if not request:
+                        break
+        except Exception as e:
+            print(f"Restaurant cache read failed: {e}")
+        return found
+
+    async def _ddb_put_many(self, details_by_id):
+        if self.get_ddb_client is None or not details_by_id:
+            return
+        expires_at = int(time.time()) + self.cache.ttl
+        puts = [
+            {"PutRequest": {"Item": encode_item({"id": rid, "details": json.dumps(details), "expiresAt": expires_at})}}
+            for rid, details in details_by_id.items()
+        ]
+        try:
+            client = await self.get_ddb_client()
+            for start in range(0, len(puts), 25):  # BatchWriteItem limit
+                request = {self.ddb_table_name: puts[start:start + 25]}
+                for attempt in range(RESTAURANT_CACHE_BATCH_ATTEMPTS):
+                    if attempt:
+                        await asyncio.sleep(batch_backoff(attempt))
+                    request = (await client.batch_write_item(RequestItems=request)).get("UnprocessedItems")
+                    if not request:
+                        break
+                else:
+                    print(f"Restaurant cache write left {len(request[self.ddb_table_name])} items unprocessed")
+        except Exception as e:
+            print(f"Restaurant cache write failed: {e}")
+
+    # ---------------------------
+    # Upstream fetch
+    # ---------------------------
+    async def fetch_one(self, restaurant_id):
+        """Fetch a single business from Yelp; None if it could not be fetched."""
+        try:
+            async with self._session().get(f"{self.enricher.base_url}/businesses/{restaurant_id}") as response:
+                if response.status != 200:
+                    print(f"Yelp API returned {response.status} for {restaurant_id}")
+                    return None
+                return summarize_business(await response.json())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Could not fetch restaurant {restaurant_id}: {e}")
+            return None
+
+    async def _fetch_many(self, restaurant_ids):
+        return dict(zip(restaurant_ids, await asyncio.gather(*(self.fetch_one(rid) for rid in restaurant_ids))))
+
+    async def get_many(self, restaurant_ids):
+        """Same contract as RestaurantEnricher.get_many."""
+        io = {"ddb_get": self._ddb_get_many, "fetch": self._fetch_many, "ddb_put": self._ddb_put_many}
+        steps = lookup_details(self.cache, restaurant_ids)
+        try:
+            step, arg = next(steps)
+            while True:
+                step, arg = steps.send(await io[step](arg))
+        except StopIteration as done:
+            return done.value
+
+    async def enrich(self, reservations):
+        """Attach restaurant details to each reservation in place."""
+        ids = enrichable_ids(reservations)
+        return attach_details(reservations, ids, await self.get_many(ids))
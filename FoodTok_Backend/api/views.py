@@ -1,20 +1,32 @@
 # api/views.py
 import os
 import uuid
+import base64
 import random
+import time
 import json
-import bcrypt
-import requests
 import traceback
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from io import BytesIO
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-from .aws import get_dynamodb, get_s3
+from .availability import AvailabilityEngine, SlotBusy, SlotUnavailable, cancellation_codes
+from . import metrics
+from .aws import get_dynamodb, get_dynamodb_client, get_s3, pool_metrics
+from .conversion import convert_floats_to_decimal
+from .dynamo import FastTable
+from .matching import calculate_match_score  # noqa: F401 - re-exported for existing imports
+from .passwords import PasswordHasherBusy, check_password, hash_password
+from .profiles import ProfileCache
+from .recommendations import Recommender
+from .renderers import json_default
+from .restaurants import RestaurantEnricher
 
 # ===============================
 # Load environment variables
@@ -27,32 +39,53 @@ TABLE_USERS = os.getenv("DDB_USERS_TABLE", "Users")
 TABLE_FAVORITES = os.getenv("DDB_FAVORITES_TABLE", "Favorites")
 TABLE_RESERVATIONS = os.getenv("DDB_RESERVATIONS_TABLE", "Reservations")
 TABLE_HOLDS = os.getenv("DDB_HOLDS_TABLE", "Holds")
+TABLE_RESTAURANTS = os.getenv("DDB_RESTAURANTS_TABLE", "Restaurants")
+TABLE_SLOT_AVAILABILITY = os.getenv("DDB_SLOT_AVAILABILITY_TABLE", "SlotAvailability")
+TABLE_RECOMMENDATION_SCORES = os.getenv("DDB_RECOMMENDATION_SCORES_TABLE", "RecommendationScores")
+TABLE_RESTAURANT_CACHE = os.getenv("DDB_RESTAURANT_CACHE_TABLE", "RestaurantCache")
+TABLE_CONFIRMATION_CODES = os.getenv("DDB_CONFIRMATION_CODES_TABLE", "ConfirmationCodes")
+RESTAURANT_DDB_CACHE = os.getenv("RESTAURANT_DDB_CACHE", "false").lower() == "true"
+
+INDEX_USERS_BY_EMAIL = os.getenv("DDB_USERS_EMAIL_INDEX", "UsersByEmail")
+INDEX_USER_RESERVATIONS = os.getenv("DDB_USER_RESERVATIONS_INDEX", "UserReservations")
+INDEX_USER_HOLDS = os.getenv("DDB_USER_HOLDS_INDEX", "UserHolds")
+INDEX_FAVORITES_BY_LIKED_AT = os.getenv("DDB_FAVORITES_LIKED_AT_INDEX", "UserFavoritesByLikedAt")
+
+# Attributes a pagination cursor's start key may hold (table + index keys)
+RESERVATION_CURSOR_KEYS = ("reservationId", "userId", "date")
+FAVORITE_CURSOR_KEYS = ("userId", "restaurantId", "likedAt")
+RANKING_CURSOR_KEYS = ("userId", "restaurantId", "rankKey")
 
 dynamodb = get_dynamodb()
+dynamodb_client = get_dynamodb_client()  # plain client for FastTable read paths
 s3 = get_s3()
 
+restaurant_enricher = RestaurantEnricher(
+    ddb_table=dynamodb.Table(TABLE_RESTAURANT_CACHE) if RESTAURANT_DDB_CACHE else None
+)
+profile_cache = ProfileCache.from_env()
+availability = AvailabilityEngine(
+    dynamodb.Table(TABLE_SLOT_AVAILABILITY),
+    restaurants_table=dynamodb.Table(TABLE_RESTAURANTS)
+)
+recommender = Recommender(
+    dynamodb.Table(TABLE_RECOMMENDATION_SCORES),
+    restaurants_table=get_dynamodb("bulk").Table(TABLE_RESTAURANTS),  # full catalog scans
+    users_table=dynamodb.Table(TABLE_USERS)
+)
+
+HOLD_DURATION = timedelta(minutes=10)
+IDEMPOTENCY_WINDOW = timedelta(hours=24)  # how long a consumed hold can replay its confirmation
+CONFIRMATION_CODE_ATTEMPTS = 5
+FAVORITE_FIELDS = {"userId", "restaurantId", "restaurantName", "restaurantImage", "matchScore", "likedAt"}
+FAVORITES_BATCH_LIMIT = 100  # BatchGetItem's per-request key limit
+BATCH_MAX_ATTEMPTS = 5
+BATCH_BACKOFF = 0.05  # seconds, doubled per retry of unprocessed items
+
 
 # ----------------------------------------------------
 # Helper Class & functions
 # ----------------------------------------------------
-class DecimalEncoder(json.JSONEncoder):
-    """Helper class to convert Decimal to float for JSON serialization"""
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        return super(DecimalEncoder, self).default(obj)
-    
-def convert_floats_to_decimal(obj):
-    """Recursively convert all float values to Decimal for DynamoDB"""
-    if isinstance(obj, list):
-        return [convert_floats_to_decimal(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_floats_to_decimal(v) for k, v in obj.items()}
-    elif isinstance(obj, float):
-        return Decimal(str(obj))
-    else:
-        return obj
-
 def convert_price_to_int(price_value):
     """Convert price format ($$, 2, etc.) to integer 1-4"""
     if isinstance(price_value, int):
@@ -66,6 +99,143 @@ def convert_price_to_int(price_value):
             return 2  # Default to moderate
     return 2
 
+def password_busy_response(error):
+    """503 for when the password hashing pool is saturated"""
+    return Response(
+        {"error": str(error)},
+        status=503,
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+def slot_busy_response(error):
+    """503 for when a slot's transactions keep losing to concurrent ones"""
+    return Response(
+        {"error": str(error)},
+        status=503,
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+def is_missing_index_error(error):
+    """True if a ClientError was raised because a GSI/LSI is not defined on the table"""
+    err = error.response.get("Error", {})
+    return err.get("Code") == "ValidationException" and "index" in err.get("Message", "").lower()
+
+def encode_cursor(state):
+    """Opaque, URL-safe pagination cursor for a query position"""
+    if state is None:
+        return None
+    raw = json.dumps(state, separators=(",", ":"), default=json_default)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor, key_names=(), **fixed):
+    """
+    Inverse of encode_cursor; raises ValueError on anything malformed.
+
+    The start key may only hold key_names (the table's and index's key
+    attributes) with string or number values, and must agree with fixed
+    (e.g. userId=user_id), so a crafted cursor is a 400 rather than a
+    DynamoDB ValidationException.
+    """
+    if not cursor:
+        return None
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor")
+    segment, key = state.get("s", 0), state.get("k")
+    if type(segment) is not int or segment < 0:
+        raise ValueError("Invalid cursor")
+    if key is not None:
+        if not isinstance(key, dict) or not key or not set(key) <= set(key_names):
+            raise ValueError("Invalid cursor")
+        if any(isinstance(v, bool) or not isinstance(v, (str, int, float)) for v in key.values()):
+            raise ValueError("Invalid cursor")
+        if any(key.get(name, value) != value for name, value in fixed.items()):
+            raise ValueError("Invalid cursor")
+    return state
+
+def segment_queries(index_name, segments, limit=None, cursor=None):
+    """
+    query_segments without the I/O, so the async views share it: a generator
+    that yields each query's kwargs, takes the response back via send(), and
+    returns (items, next_state).
+    """
+    segment, start_key = 0, None
+    if cursor:
+        segment, start_key = cursor.get("s", 0), cursor.get("k")
+
+    items = []
+    while segment < len(segments):
+        kwargs = dict(segments[segment])
+        if index_name:
+            kwargs["IndexName"] = index_name
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        if limit:
+            kwargs["Limit"] = limit - len(items)
+
+        response = yield kwargs
+        items.extend(response.get("Items", []))
+        start_key = response.get("LastEvaluatedKey")
+        if not start_key:
+            segment += 1
+        if limit and len(items) >= limit:
+            break
+
+    next_state = {"s": segment, "k": start_key} if segment < len(segments) else None
+    return items, next_state
+
+
+def query_segments(table, index_name, segments, limit=None, cursor=None):
+    """
+    Run a sequence of query segments (kwargs dicts) as one paginated listing.
+
+    Segments are consumed in order, so a listing made of several key ranges
+    (e.g. "cancelled upcoming" followed by "past") still pages correctly.
+    Returns (items, next_state); next_state is None when everything was read.
+    """
+    queries = segment_queries(index_name, segments, limit=limit, cursor=cursor)
+    try:
+        kwargs = next(queries)
+        while True:
+            kwargs = queries.send(table.query(**kwargs))
+    except StopIteration as done:
+        return done.value
+
+
+def scan_all(table, filter_expression):
+    """Every item matching filter_expression via a paginated scan (no-index fallbacks)"""
+    items = []
+    scan_kwargs = {"FilterExpression": filter_expression}
+    while True:
+        response = table.scan(**scan_kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+def find_users_by_email(table, email):
+    """
+    Return every user item whose email matches.
+
+    Queries the UsersByEmail GSI so the cost is independent of table size.
+    Tables created before the index existed fall back to a fully paginated
+    scan (the old single-page scan silently missed users past the first 1 MB).
+    """
+    try:
+        response = table.query(
+            IndexName=INDEX_USERS_BY_EMAIL,
+            KeyConditionExpression=Key("email").eq(email)
+        )
+        return response.get("Items", [])
+    except ClientError as e:
+        if not is_missing_index_error(e):
+            raise
+        print(f"Index {INDEX_USERS_BY_EMAIL} missing on {table.name}, falling back to scan")
+    return scan_all(table, Attr("email").eq(email))
+
 
 # ----------------------------------------------------
 # api/helloECS - Health Check
@@ -75,6 +245,17 @@ def hello_ecs(request):
     return Response({"status": "healthy"}, status=200)
 
 
+def prometheus_metrics(request):
+    """
+    GET /metrics
+    Request latency, outbound call and AWS pool metrics in Prometheus text format.
+    Only for scrapers inside METRICS_ALLOWED_NETWORKS (see metrics.scrape_allowed).
+    """
+    if not metrics.scrape_allowed(request):
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+    return HttpResponse(metrics.registry.render(pool_metrics()), content_type=metrics.CONTENT_TYPE)
+
+
 # ============================================================
 # AUTHENTICATION ENDPOINTS
 # ============================================================
@@ -95,12 +276,7 @@ def login(request):
         
         # Get user from DynamoDB
         table = dynamodb.Table(TABLE_USERS)
-        response = table.scan(
-            FilterExpression="email = :email",
-            ExpressionAttributeValues={":email": email}
-        )
-        
-        users = response.get("Items", [])
+        users = find_users_by_email(table, email)
         
         if not users:
             return Response({"error": "Invalid credentials"}, status=401)
@@ -111,14 +287,14 @@ def login(request):
         stored_password = user.get("password", "")
         if isinstance(stored_password, str) and stored_password.startswith("$2b$"):
             # Hashed password
-            if not bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
+            if not check_password(password, stored_password):
                 return Response({"error": "Invalid credentials"}, status=401)
         else:
             # Legacy plain text (migrate on login)
             if stored_password != password:
                 return Response({"error": "Invalid credentials"}, status=401)
             # Hash and update password
-            hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            hashed = hash_password(password)
             table.update_item(
                 Key={"userId": user.get("userId")},
                 UpdateExpression="SET password = :pwd",
@@ -144,6 +320,8 @@ def login(request):
         
         return Response({"user": user_data}, status=200)
         
+    except PasswordHasherBusy as e:
+        return password_busy_response(e)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -165,12 +343,7 @@ def signup(request):
         
         # Check if user already exists
         table = dynamodb.Table(TABLE_USERS)
-        response = table.scan(
-            FilterExpression="email = :email",
-            ExpressionAttributeValues={":email": email}
-        )
-        
-        if response.get("Items"):
+        if find_users_by_email(table, email):
             return Response({"error": "User already exists"}, status=400)
         
         # Create new user
@@ -179,7 +352,7 @@ def signup(request):
         new_user = {
             "userId": user_id,
             "email": email,
-            "password": bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8'),
+            "password": hash_password(password),
             "firstName": first_name,
             "lastName": last_name,
             "preferences": {
@@ -201,6 +374,8 @@ def signup(request):
         
         return Response({"user": user_data}, status=201)
         
+    except PasswordHasherBusy as e:
+        return password_busy_response(e)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -238,29 +413,10 @@ def update_preferences(request):
             
             # Check if email is already taken by another user
             table = dynamodb.Table(TABLE_USERS)
-            scan_response = table.scan(
-                FilterExpression="email = :email AND userId <> :userId",
-                ExpressionAttributeValues={
-                    ":email": email,
-                    ":userId": user_id
-                }
-            )
-            if scan_response.get("Items"):
+            existing = find_users_by_email(table, email)
+            if any(u.get("userId") != user_id for u in existing):
                 return Response({"error": "Email already in use"}, status=400)
         
-        """
-        # Convert floats to Decimal for DynamoDB
-        from decimal import Decimal
-        def to_decimal(obj):
-            if isinstance(obj, list):
-                return [to_decimal(i) for i in obj]
-            elif isinstance(obj, dict):
-                return {k: to_decimal(v) for k, v in obj.items()}
-            elif isinstance(obj, float):
-                return Decimal(str(obj))
-            return obj
-        """
-        
         preferences = convert_floats_to_decimal(preferences)
         
         # Build update expression dynamically
@@ -297,9 +453,13 @@ def update_preferences(request):
             ReturnValues="ALL_NEW"
         )
         
+        # Refresh the cached profile from the updated item
         user = response.get("Attributes", {})
-        user_data = {k: v for k, v in user.items() if k != "password"}
-        user_data["id"] = user_data.pop("userId", user_id)
+        user_data = profile_cache.put(user_id, user)
+        
+        # Re-rank the discovery feed in the background, only if cuisines/price/dietary actually changed
+        if preferences:
+            recommender.refresh_user_later(user_id, user.get("preferences"), only_if_ranked=True)
         
         return Response({"user": user_data}, status=200)
         
@@ -314,18 +474,15 @@ def get_profile(request, user_id):
     GET /api/auth/profile/:userId
     """
     try:
-        table = dynamodb.Table(TABLE_USERS)
-        response = table.get_item(Key={"userId": user_id})
-        
-        user = response.get("Item")
+        # Cached without the password; see api/profiles.py. The Table is only
+        # built on a miss: building one costs more than a hit.
+        user_data = profile_cache.get_or_load(
+            user_id, lambda: dynamodb.Table(TABLE_USERS).get_item(Key={"userId": user_id}).get("Item")
+        )
         
-        if not user:
+        if not user_data:
             return Response({"error": "User not found"}, status=404)
         
-        # Remove password
-        user_data = {k: v for k, v in user.items() if k != "password"}
-        user_data["id"] = user_data.pop("userId")
-        
         return Response({"user": user_data}, status=200)
         
     except Exception as e:
@@ -365,7 +522,7 @@ def change_password(request):
         stored_password = user.get("password", "")
         if isinstance(stored_password, str) and stored_password.startswith("$2b$"):
             # Hashed password
-            if not bcrypt.checkpw(current_password.encode('utf-8'), stored_password.encode('utf-8')):
+            if not check_password(current_password, stored_password):
                 return Response({"error": "Current password is incorrect"}, status=401)
         else:
             # Legacy plain text
@@ -374,19 +531,23 @@ def change_password(request):
         
         # Hash and update to new password
         from datetime import datetime, timezone
-        hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = hash_password(new_password)
         
-        table.update_item(
+        response = table.update_item(
             Key={"userId": user_id},
             UpdateExpression="SET password = :pwd, updatedAt = :updated",
             ExpressionAttributeValues={
                 ":pwd": hashed_password,
                 ":updated": datetime.now(timezone.utc).isoformat()
-            }
+            },
+            ReturnValues="ALL_NEW"
         )
+        profile_cache.put(user_id, response["Attributes"])  # new updatedAt
         
         return Response({"message": "Password changed successfully"}, status=200)
         
+    except PasswordHasherBusy as e:
+        return password_busy_response(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -407,18 +568,17 @@ def check_availability(request):
     try:
         restaurant_id = request.data.get("restaurantId")
         date = request.data.get("date")
-        party_size = request.data.get("partySize", 2)
-        
-        # Mock availability - in production, check actual bookings
-        available_slots = []
-        for hour in range(18, 22):
-            for minute in [0, 30]:
-                time_str = f"{hour:02d}:{minute:02d}"
-                available_slots.append({
-                    "time": time_str,
-                    "available": True,
-                    "tablesAvailable": random.randint(1, 5)
-                })
+        
+        if not restaurant_id or not date:
+            return Response({"error": "restaurantId and date required"}, status=400)
+        
+        try:
+            party_size = int(request.data.get("partySize", 2))
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid partySize"}, status=400)
+        
+        # Free capacity per slot, kept up to date by holds/reservations
+        available_slots = availability.get_slots(restaurant_id, date, party_size)
         
         return Response({
             "restaurantId": restaurant_id,
@@ -441,11 +601,21 @@ def create_hold(request):
         restaurant_id = request.data.get("restaurantId")
         date = request.data.get("date")
         time = request.data.get("time")
-        party_size = request.data.get("partySize", 2)
+        
+        if not user_id or not restaurant_id or not date or not time:
+            return Response({"error": "userId, restaurantId, date and time required"}, status=400)
+        
+        try:
+            party_size = int(request.data.get("partySize", 2))
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid partySize"}, status=400)
+        if party_size < 1:
+            return Response({"error": "Invalid partySize"}, status=400)
         
         # Create hold
         hold_id = f"hold_{uuid.uuid4().hex[:8]}"
-        expires_at = (datetime.utcnow() + timedelta(minutes=10)).isoformat()
+        expires = datetime.now(timezone.utc) + HOLD_DURATION
+        expires_at = expires.replace(tzinfo=None).isoformat()
         
         hold = {
             "holdId": hold_id,
@@ -455,17 +625,26 @@ def create_hold(request):
             "time": time,
             "partySize": party_size,
             "expiresAt": expires_at,
+            "ttl": int(expires.timestamp()),  # DynamoDB TTL drops the row once expired
             "status": "active",
             "createdAt": datetime.utcnow().isoformat()
         }
         
-        # Store in DynamoDB (create table if needed)
+        # Seats and hold are written in one transaction; a full slot never produces a hold
         try:
-            table = dynamodb.Table(TABLE_HOLDS)
-            table.put_item(Item=hold)
-        except:
-            # Table might not exist, that's ok for now
-            pass
+            availability.reserve(
+                restaurant_id, date, time, party_size,
+                hold_id=hold_id, expires_at=expires.timestamp(),
+                put={
+                    "TableName": TABLE_HOLDS,
+                    "Item": hold,
+                    "ConditionExpression": "attribute_not_exists(holdId)",
+                }
+            )
+        except SlotBusy as e:
+            return slot_busy_response(e)
+        except SlotUnavailable as e:
+            return Response({"error": str(e)}, status=409)
         
         return Response({
             "success": True,
@@ -476,6 +655,60 @@ def create_hold(request):
         return Response({"error": str(e)}, status=500)
 
 
+def active_hold_query(user_id):
+    """
+    UserHolds GSI query kwargs for a user's unexpired holds, newest first.
+    Every hold lasts HOLD_DURATION, so the newest hold is the one with the
+    highest ttl; rows past their ttl but not yet deleted by DynamoDB are
+    excluded by the key condition.
+    """
+    return {
+        "IndexName": INDEX_USER_HOLDS,
+        "KeyConditionExpression": Key("userId").eq(user_id) & Key("ttl").gt(int(datetime.now(timezone.utc).timestamp())),
+        "FilterExpression": Attr("status").eq("active"),
+        "ScanIndexForward": False,
+    }
+
+
+def active_hold_filter(user_id):
+    """Scan filter for active_hold_query's no-index fallback"""
+    return Attr("userId").eq(user_id) & Attr("status").eq("active")
+
+
+def latest_active_hold(holds):
+    """The most recent unexpired hold among scanned holds, or None"""
+    now = datetime.utcnow()
+    active_holds = []
+    for hold in holds:
+        try:
+            if datetime.fromisoformat(hold.get("expiresAt", "").replace('Z', '+00:00')) > now:
+                active_holds.append(hold)
+        except ValueError:
+            pass
+
+    # Return the most recent active hold
+    active_holds.sort(key=lambda x: x.get("createdAt", ""), reverse=True)
+    return active_holds[0] if active_holds else None
+
+
+def query_active_hold(table, user_id):
+    """Latest unexpired hold for a user via the UserHolds GSI"""
+    query_kwargs = active_hold_query(user_id)
+    while True:
+        response = table.query(**query_kwargs)
+        items = response.get("Items", [])
+        if items:
+            return items[0]
+        if "LastEvaluatedKey" not in response:
+            return None
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def scan_active_hold(table, user_id):
+    """Latest unexpired hold for a user via a paginated scan (no-index fallback)"""
+    return latest_active_hold(scan_all(table, active_hold_filter(user_id)))
+
+
 @api_view(["GET"])
 def get_active_hold(request):
     """
@@ -487,52 +720,84 @@ def get_active_hold(request):
         if not user_id:
             return Response({"error": "userId required"}, status=400)
         
-        # Query active holds from DynamoDB
+        table = dynamodb.Table(TABLE_HOLDS)
         try:
-            table = dynamodb.Table(TABLE_HOLDS)
-            response = table.scan(
-                FilterExpression="userId = :uid AND #st = :status",
-                ExpressionAttributeNames={"#st": "status"},
-                ExpressionAttributeValues={
-                    ":uid": user_id,
-                    ":status": "active"
-                }
-            )
-            
-            holds = response.get("Items", [])
-            
-            # Filter out expired holds
-            now = datetime.utcnow()
-            active_holds = []
-            for hold in holds:
-                expires_at_str = hold.get("expiresAt", "")
-                try:
-                    expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-                    if expires_at > now:
-                        active_holds.append(hold)
-                except:
-                    pass
-            
-            if active_holds:
-                # Return the most recent active hold
-                active_holds.sort(key=lambda x: x.get("createdAt", ""), reverse=True)
-                return Response({"hold": active_holds[0]}, status=200)
-            else:
-                return Response({"hold": None}, status=200)
-                
-        except Exception as e:
-            print(f"DynamoDB error: {e}")
-            return Response({"hold": None}, status=200)
+            hold = query_active_hold(table, user_id)
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                raise
+            print(f"Index {INDEX_USER_HOLDS} missing, falling back to scan")
+            hold = scan_active_hold(table, user_id)
+        return Response({"hold": hold}, status=200)
         
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
 
+def new_confirmation_code():
+    return f"{random.randint(100, 999)}{chr(random.randint(65, 90))}{chr(random.randint(65, 90))}{chr(random.randint(65, 90))}"
+
+
+def confirm_transaction_items(hold, reservation, idempotency_key, slot_update=None):
+    """
+    TransactWriteItems that turn a hold into a reservation, in this order:
+    consume the hold (recording the response for replays), insert the
+    reservation, claim its confirmation code, and move the seats from the
+    hold to the booking.
+    """
+    items = [
+        {"Update": {
+            "TableName": TABLE_HOLDS,
+            "Key": {"holdId": hold["holdId"]},
+            "UpdateExpression": "SET #st = :confirmed, reservationId = :rid, idempotencyKey = :key, confirmation = :res, #ttl = :ttl",
+            "ConditionExpression": "#st = :active",
+            "ExpressionAttributeNames": {"#st": "status", "#ttl": "ttl"},
+            "ExpressionAttributeValues": {
+                ":confirmed": "confirmed",
+                ":active": "active",
+                ":rid": reservation["reservationId"],
+                ":key": idempotency_key,
+                ":res": reservation,
+                ":ttl": int((datetime.now(timezone.utc) + IDEMPOTENCY_WINDOW).timestamp()),
+            },
+        }},
+        {"Put": {
+            "TableName": TABLE_RESERVATIONS,
+            "Item": reservation,
+            "ConditionExpression": "attribute_not_exists(reservationId)",
+        }},
+        # Codes are claimed in their own table, so two reservations can never share one
+        {"Put": {
+            "TableName": TABLE_CONFIRMATION_CODES,
+            "Item": {"code": reservation["confirmationCode"], "reservationId": reservation["reservationId"]},
+            "ConditionExpression": "attribute_not_exists(code)",
+        }},
+    ]
+    if slot_update:
+        items.append({"Update": dict(slot_update, TableName=TABLE_SLOT_AVAILABILITY)})
+    return items
+
+
+def replay_confirmation(hold, idempotency_key):
+    """Response for a confirm on an already-consumed hold"""
+    if hold.get("idempotencyKey") == idempotency_key and hold.get("confirmation"):
+        return Response(
+            {"success": True, "reservation": hold["confirmation"]},
+            status=201,
+            headers={"Idempotent-Replayed": "true"}
+        )
+    return Response({"error": "Hold already confirmed"}, status=409)
+
+
 @api_view(["POST"])
 def confirm_reservation(request):
     """
     POST /api/reservations/confirm
+    Headers: Idempotency-Key: <client key> (optional, defaults to the holdId)
     Body: { "holdId": "hold_123", "userId": "user_001", "paymentMethod": "card_..." }
+
+    Retrying with the same key returns the original reservation instead of
+    booking again.
     """
     try:     
         hold_id = request.data.get("holdId")
@@ -540,17 +805,19 @@ def confirm_reservation(request):
         payment_method = request.data.get("paymentMethod")
         special_requests = request.data.get("specialRequests", "")
         
+        if not hold_id:
+            return Response({"error": "holdId required"}, status=400)
+        idempotency_key = request.headers.get("Idempotency-Key") or hold_id
+        
         # Fetch the hold to get date, time, partySize, restaurantId
-        try:
-            table = dynamodb.Table(TABLE_HOLDS)
-            response = table.get_item(Key={"holdId": hold_id})
-            hold = response.get("Item", {})
-        except:
-            hold = {}
+        holds_table = dynamodb.Table(TABLE_HOLDS)
+        hold = holds_table.get_item(Key={"holdId": hold_id}, ConsistentRead=True).get("Item")
+        if not hold:
+            return Response({"error": "Hold not found"}, status=404)
+        if hold.get("status") != "active":
+            return replay_confirmation(hold, idempotency_key)
         
-        # Create reservation
         reservation_id = f"res_{uuid.uuid4().hex[:8]}"
-        confirmation_code = f"{random.randint(100, 999)}{chr(random.randint(65, 90))}{chr(random.randint(65, 90))}{chr(random.randint(65, 90))}"
         reservation = {
             "reservationId": reservation_id,
             "userId": user_id or hold.get("userId"),
@@ -560,115 +827,187 @@ def confirm_reservation(request):
             "time": hold.get("time", ""),
             "partySize": hold.get("partySize", 2),
             "status": "confirmed",
-            "confirmationCode": confirmation_code,
             "depositAmount": 100,
             "paymentMethod": payment_method,
             "specialRequests": special_requests,
             "createdAt": datetime.utcnow().isoformat()
         }
-
-        try:
-            table = dynamodb.Table(TABLE_RESERVATIONS)
-            table.put_item(Item=reservation)
-            print(f"Created reservation: {reservation_id} for user: {user_id}")
-        except Exception as e:
-            print(f"Error saving reservation to DynamoDB: {e}")
         
+        # Seats move from the hold to the booking
+        slot_update = None
+        hold_lapsed = False
+        if hold.get("restaurantId") and hold.get("date") and hold.get("time"):
+            slot_update = availability.confirm_hold_update(
+                hold["restaurantId"], hold["date"], hold["time"], hold_id, int(hold.get("partySize", 2))
+            )
+        
+        for _ in range(CONFIRMATION_CODE_ATTEMPTS):
+            reservation["confirmationCode"] = new_confirmation_code()
+            try:
+                availability.transact(confirm_transaction_items(hold, reservation, idempotency_key, slot_update))
+                break
+            except ClientError as e:
+                reasons = cancellation_codes(e)
+                if not reasons:
+                    raise
+                failed = [i for i, code in enumerate(reasons) if code == "ConditionalCheckFailed"]
+                if 0 in failed:
+                    # A concurrent retry consumed the hold first
+                    hold = holds_table.get_item(Key={"holdId": hold_id}, ConsistentRead=True).get("Item") or {}
+                    return replay_confirmation(hold, idempotency_key)
+                if 3 in failed:
+                    # Hold lapsed and was swept; take the seats directly if still free
+                    if hold_lapsed:
+                        return Response({"error": f"Hold expired and {hold['time']} on {hold['date']} is fully booked"}, status=409)
+                    hold_lapsed = True
+                    try:
+                        slot_update = availability.reserve_update(
+                            hold["restaurantId"], hold["date"], hold["time"], int(hold.get("partySize", 2))
+                        )
+                    except SlotUnavailable as su:
+                        return Response({"error": f"Hold expired and {su}"}, status=409)
+                elif failed != [2]:
+                    raise
+                # otherwise the confirmation code was taken; retry with a new one
+        else:
+            return Response({"error": "Could not allocate a confirmation code"}, status=503)
+        
+        print(f"Created reservation: {reservation_id} for user: {user_id}")
         return Response({
             "success": True,
             "reservation": reservation
         }, status=201)
         
+    except SlotBusy as e:
+        return slot_busy_response(e)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
 
+def user_reservation_segments(user_id, filter_type, today):
+    """
+    UserReservations GSI query segments for a listing filter.
+
+    "past" also covers cancelled reservations that are still in the future;
+    newest-first those come before anything dated before today, so they are
+    read as a first segment and the listing stays in index order.
+    """
+    user_key = Key("userId").eq(user_id)
+    if filter_type == "upcoming":
+        return [{
+            "KeyConditionExpression": user_key & Key("date").gte(today),
+            "FilterExpression": Attr("status").ne("cancelled"),
+            "ScanIndexForward": True,
+        }]
+    if filter_type == "past":
+        return [
+            {
+                "KeyConditionExpression": user_key & Key("date").gte(today),
+                "FilterExpression": Attr("status").eq("cancelled"),
+                "ScanIndexForward": False,
+            },
+            {
+                "KeyConditionExpression": user_key & Key("date").lt(today),
+                "ScanIndexForward": False,
+            },
+        ]
+    return [{"KeyConditionExpression": user_key, "ScanIndexForward": False}]
+
+
+def scan_user_reservations(table, user_id):
+    """Every reservation for a user via a paginated scan (no-index fallback)"""
+    return scan_all(table, Attr("userId").eq(user_id))
+
+
+def filter_reservations(reservations, filter_type, today):
+    """In-memory equivalent of user_reservation_segments"""
+    if filter_type == 'upcoming':
+        return [
+            r for r in reservations 
+            if r.get('date', '') >= today and r.get('status') != 'cancelled'
+        ]
+    if filter_type == 'past':
+        return [
+            r for r in reservations 
+            if r.get('date', '') < today or r.get('status') == 'cancelled'
+        ]
+    return reservations
+
+
+def parse_reservation_listing(query, user_id):
+    """
+    (filter_type, limit, cursor) from a reservation listing's query string.
+    Raises ValueError with the 400 message.
+    """
+    filter_type = query.get('filter', 'upcoming')
+    try:
+        limit = int(query["limit"]) if query.get("limit") else None
+        cursor = decode_cursor(query.get("cursor"), RESERVATION_CURSOR_KEYS, userId=user_id)
+    except ValueError:
+        raise ValueError("Invalid limit or cursor")
+    if limit is not None and not 1 <= limit <= 100:
+        raise ValueError("limit must be between 1 and 100")
+    return filter_type, limit, cursor
+
+
+def reservation_listing(reservations, filter_type, next_state):
+    """Response body for a page of (enriched) reservations, sorted by date"""
+    if filter_type == 'upcoming':
+        reservations.sort(key=lambda x: x.get('date', '') + x.get('time', ''))
+    else:
+        # Past reservations: most recent first
+        reservations.sort(key=lambda x: x.get('date', '') + x.get('time', ''), reverse=True)
+    return {
+        "reservations": reservations,
+        "count": len(reservations),
+        "filter": filter_type,
+        "nextCursor": encode_cursor(next_state)
+    }
+
+
 @api_view(["GET"])
 def get_user_reservations(request, user_id):
     """
-    GET /api/reservations/user/:userId?filter=upcoming|past|all
+    GET /api/reservations/user/:userId?filter=upcoming|past|all&limit=20&cursor=...
+    Without limit every matching reservation is returned. With limit, pass
+    the returned nextCursor back as cursor to fetch the next page.
     """
     try:       
-        filter_type = request.GET.get('filter', 'upcoming')
-        
         if not user_id:
             return Response({"error": "userId required"}, status=400)
         
-        reservations_table = dynamodb.Table(TABLE_RESERVATIONS)
+        try:
+            filter_type, limit, cursor = parse_reservation_listing(request.GET, user_id)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         
-        # Query using GSI
+        reservations_table = FastTable(dynamodb_client, TABLE_RESERVATIONS)
         today = date.today().isoformat()
+        next_state = None
         
         try:
-            # Use scan instead of query since GSI may not exist in local DynamoDB
-            response = reservations_table.scan(
-                FilterExpression='userId = :uid',
-                ExpressionAttributeValues={':uid': user_id}
+            reservations, next_state = query_segments(
+                reservations_table,
+                INDEX_USER_RESERVATIONS,
+                user_reservation_segments(user_id, filter_type, today),
+                limit=limit,
+                cursor=cursor
+            )
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                raise
+            # Index genuinely absent (old local table): scan everything, no paging
+            print(f"Index {INDEX_USER_RESERVATIONS} missing, falling back to scan")
+            reservations = filter_reservations(
+                scan_user_reservations(reservations_table, user_id), filter_type, today
             )
-            reservations = response.get('Items', [])
-            print(f"Found {len(reservations)} reservations for user {user_id}")
-            
-            # Enrich with restaurant details from Yelp
-            YELP_API_KEY = "XGjtnGCXkhEW5wggLQvG18IR1bDTz6eP-Wb6cc2W9ACdxEDmNhon2vQm6SEcb1jUJAdD8Mh048Zpfp-G4DjrFBCiX4AJaQZxPqCEJWVwXok4CKwp4d-PO43sH_MkaXYx"
-            
-            for reservation in reservations:
-                restaurant_id = reservation.get('restaurantId')
-                if restaurant_id and not restaurant_id.startswith('test_'):
-                    try:
-                        # Fetch from Yelp API
-                        headers = {'Authorization': f'Bearer {YELP_API_KEY}'}
-                        response = requests.get(
-                            f'https://api.yelp.com/v3/businesses/{restaurant_id}',
-                            headers=headers,
-                            timeout=3
-                        )
-                        if response.status_code == 200:
-                            restaurant = response.json()
-                            reservation['restaurantName'] = restaurant.get('name', restaurant_id)
-                            reservation['restaurantImage'] = restaurant.get('image_url', '')
-                            reservation['restaurantCuisine'] = [cat['title'] for cat in restaurant.get('categories', [])]
-                            location = restaurant.get('location', {})
-                            address_parts = location.get('display_address', [])
-                            reservation['restaurantAddress'] = ', '.join(address_parts) if address_parts else ''
-                            reservation['restaurantRating'] = restaurant.get('rating', 0)
-                            print(f"Enriched reservation with restaurant: {restaurant.get('name')}")
-                        else:
-                            print(f"Yelp API returned {response.status_code} for {restaurant_id}")
-                    except Exception as e:
-                        print(f"Could not fetch restaurant {restaurant_id}: {e}")
-                        reservation['restaurantName'] = restaurant_id
-                        reservation['restaurantCuisine'] = []
-        except Exception as e:
-            print(f"DynamoDB scan error: {e}")
-            reservations = []
-        
-        if filter_type == 'upcoming':
-            reservations = [
-                r for r in reservations 
-                if r.get('date', '') >= today and r.get('status') != 'cancelled'
-            ]
-        elif filter_type == 'past':
-            reservations = [
-                r for r in reservations 
-                if r.get('date', '') < today or r.get('status') == 'cancelled'
-            ]
-        # filter_type == 'all' falls through here with no filtering
-        
-        # Sort by date
-        if filter_type == 'upcoming':
-            reservations.sort(key=lambda x: x.get('date', '') + x.get('time', ''))
-        else:
-            # Past reservations: most recent first
-            reservations.sort(key=lambda x: x.get('date', '') + x.get('time', ''), reverse=True)
         
-        # Convert Decimals to JSON-safe format
-        reservations_json = json.loads(json.dumps(reservations, cls=DecimalEncoder))
+        print(f"Found {len(reservations)} reservations for user {user_id}")
         
-        return Response({
-            "reservations": reservations_json,
-            "count": len(reservations_json),
-            "filter": filter_type
-        }, status=200)
+        # Enrich with restaurant details (deduped, cached, fetched concurrently)
+        restaurant_enricher.enrich(reservations)
+        
+        return Response(reservation_listing(reservations, filter_type, next_state), status=200)
         
     except Exception as e:
         traceback.print_exc()
@@ -686,7 +1025,7 @@ def get_reservation(request, reservation_id):
         if not reservation_id:
             return Response({"error": "reservationId required"}, status=400)
         
-        reservations_table = dynamodb.Table(TABLE_RESERVATIONS)
+        reservations_table = FastTable(dynamodb_client, TABLE_RESERVATIONS)
         
         try:
             response = reservations_table.get_item(
@@ -702,10 +1041,7 @@ def get_reservation(request, reservation_id):
             if user_id and reservation.get("userId") != user_id:
                 return Response({"error": "Unauthorized"}, status=403)
             
-            # Convert Decimals to JSON-safe format
-            reservation_json = json.loads(json.dumps(reservation, cls=DecimalEncoder))
-            
-            return Response(reservation_json, status=200)
+            return Response(reservation, status=200)
             
         except Exception as e:
             print(f"DynamoDB get_item error: {e}")
@@ -820,30 +1156,54 @@ def modify_reservation(request, reservation_id):
                 "error": "No fields to update"
             }, status=400)
         
-        # Update reservation in DynamoDB
+        # Only a still-confirmed reservation of this user may change, so a
+        # concurrent cancel or modify can't be overwritten
+        expr_names["#status"] = "status"
+        expr_values[":confirmed"] = "confirmed"
+        expr_values[":userId"] = user_id
+        reservation_update = {
+            "Key": {"reservationId": reservation_id},
+            "UpdateExpression": update_expr,
+            "ConditionExpression": "#status = :confirmed AND userId = :userId",
+            "ExpressionAttributeNames": expr_names,
+            "ExpressionAttributeValues": expr_values,
+        }
+        
+        # Move the booked seats if the slot or party size changes, in the same
+        # transaction as the reservation update
+        old_slot = (reservation.get("date"), reservation.get("time"), int(reservation.get("partySize", 2)))
+        new_slot = (
+            new_date if new_date is not None else old_slot[0],
+            new_time if new_time is not None else old_slot[1],
+            expr_values.get(":partySize", old_slot[2])
+        )
         try:
-            update_response = reservations_table.update_item(
-                Key={"reservationId": reservation_id},
-                UpdateExpression=update_expr,
-                ExpressionAttributeValues=expr_values,
-                ExpressionAttributeNames=expr_names if expr_names else None,
-                ReturnValues="ALL_NEW"
-            )
-            
-            updated_reservation = update_response.get("Attributes", {})
-            
-            # Convert Decimals to JSON-safe format
-            reservation_json = json.loads(json.dumps(updated_reservation, cls=DecimalEncoder))
-            
-            return Response({
-                "success": True,
-                "reservation": reservation_json
-            }, status=200)
-            
-        except Exception as e:
-            print(f"DynamoDB update_item error: {e}")
+            if new_slot != old_slot and reservation.get("restaurantId"):
+                availability.move_booking(
+                    reservation["restaurantId"], old_slot, new_slot,
+                    update=dict(reservation_update, TableName=reservations_table.name)
+                )
+                updated = reservations_table.get_item(
+                    Key={"reservationId": reservation_id}, ConsistentRead=True
+                ).get("Item", {})
+            else:
+                updated = reservations_table.update_item(**reservation_update, ReturnValues="ALL_NEW")["Attributes"]
+        except SlotBusy as e:
+            return slot_busy_response(e)
+        except SlotUnavailable as e:
+            return Response({"error": str(e)}, status=409)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code == "ConditionalCheckFailedException" or cancellation_codes(e)[-1:] == ["ConditionalCheckFailed"]:
+                return Response({"error": "Can only modify confirmed reservations"}, status=400)
+            print(f"DynamoDB update error: {e}")
             return Response({"error": f"Failed to update reservation: {str(e)}"}, status=500)
         
+        return Response({
+            "success": True,
+            "reservation": updated
+        }, status=200)
+        
     except Exception as e:
         traceback.print_exc()
         return Response({"error": str(e)}, status=500)
@@ -917,22 +1277,44 @@ def cancel_reservation(request, reservation_id):
             refund_amount = 0
             hours_until = 0
         
-        # Update DynamoDB
-        update_response = reservations_table.update_item(
-            Key={"reservationId": reservation_id},
-            UpdateExpression="SET #status = :status, cancelledAt = :cancelledAt, refundAmount = :refundAmount, refundPercentage = :refundPercentage, updatedAt = :updatedAt",
-            ExpressionAttributeNames={"#status": "status"},
-            ExpressionAttributeValues={
+        # Conditional, so of two concurrent cancels only one applies; the
+        # seats go back in the same transaction, so they are returned once
+        # and never left taken by a cancelled reservation
+        now = datetime.utcnow().isoformat() + "Z"  # Metadata can stay UTC
+        cancel_update = {
+            "Key": {"reservationId": reservation_id},
+            "UpdateExpression": "SET #status = :status, cancelledAt = :cancelledAt, refundAmount = :refundAmount, refundPercentage = :refundPercentage, updatedAt = :updatedAt",
+            "ConditionExpression": "#status <> :status",
+            "ExpressionAttributeNames": {"#status": "status"},
+            "ExpressionAttributeValues": {
                 ":status": "cancelled",
-                ":cancelledAt": datetime.utcnow().isoformat() + "Z", # Metadata can stay UTC
+                ":cancelledAt": now,
                 ":refundAmount": Decimal(str(refund_amount)),
                 ":refundPercentage": Decimal(str(refund_percentage)),
-                ":updatedAt": datetime.utcnow().isoformat() + "Z"
+                ":updatedAt": now
             },
-            ReturnValues="ALL_NEW"
-        )
-        
-        updated_reservation = json.loads(json.dumps(update_response.get("Attributes", {}), cls=DecimalEncoder))
+        }
+        try:
+            if reservation.get("restaurantId") and reservation_date_str:
+                availability.release_booking(
+                    reservation["restaurantId"], reservation_date_str,
+                    reservation_time_str, int(reservation.get("partySize", 2)),
+                    update=dict(cancel_update, TableName=reservations_table.name)
+                )
+                updated_reservation = reservations_table.get_item(
+                    Key={"reservationId": reservation_id}, ConsistentRead=True
+                ).get("Item", {})
+            else:
+                updated_reservation = reservations_table.update_item(
+                    **cancel_update, ReturnValues="ALL_NEW"
+                )["Attributes"]
+        except SlotBusy as e:
+            return slot_busy_response(e)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code == "ConditionalCheckFailedException" or cancellation_codes(e)[-1:] == ["ConditionalCheckFailed"]:
+                return Response({"error": "Reservation already cancelled"}, status=400)
+            raise
         
         return Response({
             "success": True,
@@ -978,7 +1360,7 @@ def favorites_handler(request):
             # Check if already favorited
             table = dynamodb.Table(TABLE_FAVORITES)
             try:
-                existing = table.get_item(
+                existing = FastTable(dynamodb_client, TABLE_FAVORITES).get_item(
                     Key={
                         "userId": user_id,
                         "restaurantId": restaurant_id
@@ -987,7 +1369,7 @@ def favorites_handler(request):
                 if "Item" in existing:
                     return Response({
                         "message": "Already favorited",
-                        "favorite": json.loads(json.dumps(existing["Item"], cls=DecimalEncoder))
+                        "favorite": existing["Item"]
                     }, status=200)
             except Exception as e:
                 print(f"Check existing favorite error: {e}")
@@ -1010,12 +1392,9 @@ def favorites_handler(request):
             
             print(f"Added favorite: {user_id} -> {restaurant_name}")
             
-            # Convert Decimal back to float for JSON response
-            favorite_response = json.loads(json.dumps(favorite, cls=DecimalEncoder))
-            
             return Response({
                 "success": True,
-                "favorite": favorite_response
+                "favorite": favorite
             }, status=201)
             
         except Exception as e:
@@ -1121,30 +1500,93 @@ def add_favorite(request):
         return Response({"error": str(e)}, status=500)
 
 
+def favorites_projection(fields):
+    """
+    ProjectionExpression kwargs for a comma-separated `fields=` parameter.
+    Raises ValueError on fields a favorite does not have.
+    """
+    if not fields:
+        return {}
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in FAVORITE_FIELDS]
+    if unknown or not names:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    placeholders = {f"#f{i}": name for i, name in enumerate(dict.fromkeys(names))}
+    return {
+        "ProjectionExpression": ", ".join(placeholders),
+        "ExpressionAttributeNames": placeholders,
+    }
+
+
+def parse_favorites_listing(query, user_id):
+    """
+    (limit, cursor, segments) for a favorites listing's query string.
+    Raises ValueError with the 400 message.
+    """
+    try:
+        limit = int(query.get("limit", 50))
+        cursor = decode_cursor(query.get("cursor"), FAVORITE_CURSOR_KEYS, userId=user_id)
+        projection = favorites_projection(query.get("fields"))
+    except ValueError as e:
+        raise ValueError(f"Invalid limit, cursor or fields ({e})")
+    if not 1 <= limit <= 100:
+        raise ValueError("limit must be between 1 and 100")
+    segments = [{
+        "KeyConditionExpression": Key("userId").eq(user_id),
+        "ScanIndexForward": False,  # Most recent first
+        **projection
+    }]
+    return limit, cursor, segments
+
+
+def order_by_liked_at(favorites):
+    """Most recently liked first, for pages read without the likedAt GSI"""
+    favorites.sort(key=lambda fav: fav.get("likedAt", ""), reverse=True)
+    return favorites
+
+
+def favorite_check_key(query):
+    """Favorites key from ?userId=&restaurantId=; ValueError if either is missing"""
+    user_id = query.get("userId")
+    restaurant_id = query.get("restaurantId")
+    if not user_id or not restaurant_id:
+        raise ValueError("userId and restaurantId required")
+    return {"userId": user_id, "restaurantId": restaurant_id}
+
+
 @api_view(["GET"])
 def get_favorites(request, user_id):
     """
-    GET /api/favorites/:userId?limit=20
-    Returns list of user's favorited restaurants
+    GET /api/favorites/:userId?limit=20&cursor=...&fields=restaurantId,restaurantName
+    Returns list of user's favorited restaurants, most recently liked first.
+    When more remain, the X-Next-Cursor header holds the cursor for the next page.
     """
     try:
-        limit = int(request.GET.get("limit", 50))
+        try:
+            limit, cursor, segments = parse_favorites_listing(request.GET, user_id)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         
-        table = dynamodb.Table(TABLE_FAVORITES)
+        table = FastTable(dynamodb_client, TABLE_FAVORITES)
         
-        # Query all favorites for this user
-        response = table.query(
-            KeyConditionExpression="userId = :uid",
-            ExpressionAttributeValues={":uid": user_id},
-            ScanIndexForward=False,  # Most recent first
-            Limit=limit
-        )
-        
-        favorites = response.get("Items", [])
+        try:
+            favorites, next_state = query_segments(
+                table, INDEX_FAVORITES_BY_LIKED_AT, segments, limit=limit, cursor=cursor
+            )
+        except ClientError as e:
+            if not is_missing_index_error(e):
+                raise
+            # Table predates the GSI: page the base table and order each page by likedAt
+            print(f"Index {INDEX_FAVORITES_BY_LIKED_AT} missing, falling back to base table order")
+            favorites, next_state = query_segments(table, None, segments, limit=limit, cursor=cursor)
+            order_by_liked_at(favorites)
         
         print(f"Retrieved {len(favorites)} favorites for user {user_id}")
         
-        return Response(favorites, status=200)
+        response = Response(favorites, status=200)
+        if next_state:
+            response["X-Next-Cursor"] = encode_cursor(next_state)
+        return response
         
     except Exception as e:
         traceback.print_exc()
@@ -1192,20 +1634,14 @@ def check_favorite(request):
     Returns: { "isFavorite": true }
     """
     try:
-        user_id = request.GET.get("userId")
-        restaurant_id = request.GET.get("restaurantId")
-        
-        if not user_id or not restaurant_id:
-            return Response({"error": "userId and restaurantId required"}, status=400)
+        try:
+            key = favorite_check_key(request.GET)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
         
-        table = dynamodb.Table(TABLE_FAVORITES)
+        table = FastTable(dynamodb_client, TABLE_FAVORITES)
         
-        response = table.get_item(
-            Key={
-                "userId": user_id,
-                "restaurantId": restaurant_id
-            }
-        )
+        response = table.get_item(Key=key, ProjectionExpression="restaurantId")
         
         is_favorite = "Item" in response
         
@@ -1215,76 +1651,199 @@ def check_favorite(request):
         return Response({"error": str(e)}, status=500)
 
 
-# ----------------------------------------------------
-# DISCOVERY / MATCH SCORE LOGIC
-# ----------------------------------------------------
+def batch_get_all(request_items):
+    """
+    BatchGetItem that keeps re-requesting UnprocessedKeys (with backoff)
+    until everything is read. Returns {table_name: [items]}.
+    """
+    results = {}
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        for table_name, items in response.get("Responses", {}).items():
+            results.setdefault(table_name, []).extend(items)
+        request_items = response.get("UnprocessedKeys") or {}
+        if not request_items:
+            return results
+        time.sleep(random.uniform(0, BATCH_BACKOFF * 2 ** attempt))
+    raise RuntimeError("BatchGetItem left keys unprocessed after retries")
 
 
-def calculate_match_score(restaurant, preferred_cuisines, preferred_price, dietary_restrictions):
+def batch_write_all(table_name, write_requests):
     """
-    Calculate match score (0-100) based on user preferences.
-    
-    Scoring breakdown:
-    - Cuisine match: 40 points
-    - Price match: 30 points
-    - Dietary options: 20 points
-    - Base popularity (rating): 10 points
-    """
-    score = 0
-    reasons = []
-    
-    # 1. Cuisine matching (40 points)
-    restaurant_cuisines = restaurant.get("cuisine", [])
-    if isinstance(restaurant_cuisines, str):
-        restaurant_cuisines = [restaurant_cuisines]
-    
-    if preferred_cuisines:
-        cuisine_matches = [c for c in restaurant_cuisines if c in preferred_cuisines]
-        if cuisine_matches:
-            score += 40
-            reasons.append(f"Loves {cuisine_matches[0]}")
-        else:
-            score += 10  # Some points for trying new cuisines
-    else:
-        score += 20  # No preference = neutral
-    
-    # 2. Price range matching (30 points)
-    restaurant_price = restaurant.get("priceRange", 2)
-    
-    # Convert $$ format to numeric if needed
-    if isinstance(restaurant_price, str):
-        restaurant_price = len(restaurant_price)
-    
-    if restaurant_price in preferred_price:
-        score += 30
-        price_labels = {1: "Budget-friendly", 2: "Moderate", 3: "Upscale", 4: "Fine dining"}
-        reasons.append(price_labels.get(restaurant_price, "Good value"))
-    else:
-        # Partial points if close
-        if any(abs(restaurant_price - p) == 1 for p in preferred_price):
-            score += 15
-    
-    # 3. Dietary options (20 points)
-    restaurant_dietary = restaurant.get("dietaryOptions", [])
-    if dietary_restrictions:
-        matches = [d for d in dietary_restrictions if d in restaurant_dietary]
-        if matches:
-            score += 20
-            reasons.append(f"Has {matches[0]} options")
-        elif not restaurant_dietary:
-            score += 5  # Some points if no restrictions
-    else:
-        score += 10  # No dietary restrictions = partial points
-    
-    # 4. Base popularity from rating (10 points)
-    rating = float(restaurant.get("rating", 0))
-    score += min(10, int(rating * 2))  # 5.0 rating = 10 points
-    
-    # Add high rating to reasons if 4.5+
-    if rating >= 4.5:
-        reasons.append(f"Highly rated ({rating}★)")
-    
-    return {
-        "score": min(100, score),  # Cap at 100
-        "reasons": reasons[:3]  # Top 3 reasons
-    }
\ No newline at end of file
+    BatchWriteItem in chunks of 25, re-sending UnprocessedItems with backoff.
+    Returns the write requests that were still unprocessed after all retries.
+    """
+    unprocessed = []
+    for start in range(0, len(write_requests), 25):
+        pending = {table_name: write_requests[start:start + 25]}
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            response = dynamodb.batch_write_item(RequestItems=pending)
+            pending = response.get("UnprocessedItems") or {}
+            if not pending:
+                break
+            time.sleep(random.uniform(0, BATCH_BACKOFF * 2 ** attempt))
+        unprocessed.extend(pending.get(table_name, []))
+    return unprocessed
+
+
+@api_view(["POST"])
+def check_favorites_batch(request):
+    """
+    POST /api/favorites/check:batch
+    Body: { "userId": "user_123", "restaurantIds": ["rest_1", "rest_2", ...] }  (up to 100)
+    Returns: { "favorites": { "rest_1": true, "rest_2": false, ... } }
+    """
+    try:
+        user_id = request.data.get("userId")
+        restaurant_ids = request.data.get("restaurantIds")
+        
+        if not user_id or not isinstance(restaurant_ids, list):
+            return Response({"error": "userId and restaurantIds required"}, status=400)
+        
+        restaurant_ids = list(dict.fromkeys(str(rid) for rid in restaurant_ids if rid))
+        if len(restaurant_ids) > FAVORITES_BATCH_LIMIT:
+            return Response({"error": f"At most {FAVORITES_BATCH_LIMIT} restaurantIds per request"}, status=400)
+        
+        favorites = dict.fromkeys(restaurant_ids, False)
+        if restaurant_ids:
+            found = batch_get_all({
+                TABLE_FAVORITES: {
+                    "Keys": [{"userId": user_id, "restaurantId": rid} for rid in restaurant_ids],
+                    "ProjectionExpression": "restaurantId",
+                }
+            })
+            for item in found.get(TABLE_FAVORITES, []):
+                favorites[item["restaurantId"]] = True
+        
+        return Response({"favorites": favorites}, status=200)
+        
+    except Exception as e:
+        traceback.print_exc()
+        return Response({"error": str(e)}, status=500)
+
+
+@api_view(["POST"])
+def favorites_batch(request):
+    """
+    POST /api/favorites:batch
+    Body: {
+      "userId": "user_123",
+      "add": [{ "restaurantId": "rest_xyz", "restaurantName": "...", "restaurantImage": "...", "matchScore": 85 }, ...],
+      "remove": ["rest_abc", ...]
+    }
+    Up to 100 add + remove operations. Adds overwrite an existing favorite.
+    Returns: { "success": true, "added": [...ids], "removed": [...ids], "unprocessed": [...ids] }
+    """
+    try:
+        user_id = request.data.get("userId")
+        adds = request.data.get("add") or []
+        removes = request.data.get("remove") or []
+        
+        if not user_id or not isinstance(adds, list) or not isinstance(removes, list):
+            return Response({"error": "userId and add/remove lists required"}, status=400)
+        if any(not isinstance(fav, dict) or not fav.get("restaurantId") for fav in adds):
+            return Response({"error": "Every add entry needs a restaurantId"}, status=400)
+        
+        # Last entry wins for duplicates; BatchWriteItem rejects repeated keys
+        adds = {str(fav["restaurantId"]): fav for fav in adds}
+        removes = list(dict.fromkeys(str(rid) for rid in removes if rid))
+        if set(adds) & set(removes):
+            return Response({"error": "A restaurantId cannot be both added and removed"}, status=400)
+        if len(adds) + len(removes) > FAVORITES_BATCH_LIMIT:
+            return Response({"error": f"At most {FAVORITES_BATCH_LIMIT} operations per request"}, status=400)
+        
+        liked_at = datetime.utcnow().isoformat() + "Z"
+        write_requests = [
+            {"PutRequest": {"Item": convert_floats_to_decimal({
+                "userId": user_id,
+                "restaurantId": rid,
+                "restaurantName": fav.get("restaurantName"),
+                "restaurantImage": fav.get("restaurantImage", ""),
+                "matchScore": fav.get("matchScore", 0),
+                "likedAt": liked_at
+            })}}
+            for rid, fav in adds.items()
+        ]
+        write_requests += [
+            {"DeleteRequest": {"Key": {"userId": user_id, "restaurantId": rid}}}
+            for rid in removes
+        ]
+        
+        unprocessed = set()
+        for req in batch_write_all(TABLE_FAVORITES, write_requests):
+            if "PutRequest" in req:
+                unprocessed.add(req["PutRequest"]["Item"]["restaurantId"])
+            else:
+                unprocessed.add(req["DeleteRequest"]["Key"]["restaurantId"])
+        
+        print(f"Batch favorites for {user_id}: +{len(adds)} -{len(removes)} ({len(unprocessed)} unprocessed)")
+        
+        return Response({
+            "success": not unprocessed,
+            "added": [rid for rid in adds if rid not in unprocessed],
+            "removed": [rid for rid in removes if rid not in unprocessed],
+            "unprocessed": sorted(unprocessed)
+        }, status=200)
+        
+    except Exception as e:
+        traceback.print_exc()
+        return Response({"error": str(e)}, status=500)
+
+
+# ============================================================
+# DISCOVERY ENDPOINTS
+# ============================================================
+
+
+@api_view(["GET"])
+def discover(request, user_id):
+    """
+    GET /api/discover/:userId?limit=20&cursor=...
+    Ranked restaurant feed for a user, best match first, served from the
+    precomputed RecommendationScores ranking. A first visit queues the
+    ranking build and answers with a page scored from the loaded catalog
+    (empty if it isn't loaded), flagged rankingPending and without a cursor.
+    """
+    try:
+        try:
+            limit = int(request.GET.get("limit", 20))
+            cursor = decode_cursor(request.GET.get("cursor"), RANKING_CURSOR_KEYS, userId=user_id)
+        except ValueError:
+            return Response({"error": "Invalid limit or cursor"}, status=400)
+        if not 1 <= limit <= 100:
+            return Response({"error": "limit must be between 1 and 100"}, status=400)
+        
+        start_key = cursor.get("k") if cursor else None
+        rows, last_key = recommender.feed(user_id, limit=limit, start_key=start_key)
+        pending = False
+        
+        if not rows and not cursor:
+            user = dynamodb.Table(TABLE_USERS).get_item(Key={"userId": user_id}).get("Item")
+            if not user:
+                return Response({"error": "User not found"}, status=404)
+            # Building the ranking can mean a catalog scan plus DEPTH writes;
+            # keep it off the request thread
+            if recommender.meta(user_id) is None:
+                recommender.refresh_user_later(user_id, user.get("preferences"))
+                rows, last_key, pending = recommender.preview(user_id, user.get("preferences"), limit), None, True
+        
+        restaurants = [
+            {
+                "id": row["restaurantId"],
+                **row.get("restaurant", {}),
+                "matchScore": row["overallScore"],
+                "reasons": row.get("reasons", [])
+            }
+            for row in rows
+        ]
+        
+        return Response({
+            "restaurants": restaurants,
+            "count": len(restaurants),
+            "nextCursor": encode_cursor({"k": last_key} if last_key else None),
+            "rankingPending": pending
+        }, status=200)
+        
+    except Exception as e:
+        traceback.print_exc()
+        return Response({"error": str(e)}, status=500)
@@ -0,0 +1,340 @@
+# api/yelp_ingest.py
+"""
+Restaurant catalog ingestion from Yelp's business search.
+
+CatalogIngester crawls every (cuisine, location) search concurrently under
+asyncio and writes FoodTok restaurant items as NDJSON, one per line, which
+legacy/seed_data.py loads directly:
+
+  * every request takes a token from a TokenBucket sized to Yelp's
+    per-second limit; 429s are retried after Retry-After (or a backoff),
+  * each search is paged by offset (50 per page) up to Yelp's 240-result
+    window,
+  * restaurants are deduped by Yelp id across all searches,
+  * progress is checkpointed after every page, so an interrupted crawl
+    resumes where it stopped and never writes a restaurant twice.
+
+HTTP goes through one pooled requests.Session on a small thread pool (the
+event loop never blocks on a socket). Throughput is capped by Yelp's rate
+limit, not by threads, so the crawl stays on requests like the sync
+restaurant fetches rather than the aiohttp session the async views use.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .restaurants import YELP_API_BASE, YELP_API_KEY
+
+YELP_SEARCH_PAGE = 50  # most results Yelp returns per search request
+YELP_SEARCH_WINDOW = 240  # Yelp rejects offset + limit beyond this
+YELP_INGEST_RATE = float(os.getenv("YELP_INGEST_RATE", "5"))  # requests per second
+YELP_INGEST_BURST = int(os.getenv("YELP_INGEST_BURST", "10"))
+YELP_INGEST_CONCURRENCY = int(os.getenv("YELP_INGEST_CONCURRENCY", "8"))
+YELP_INGEST_TIMEOUT = float(os.getenv("YELP_INGEST_TIMEOUT", "10"))
+YELP_INGEST_MAX_ATTEMPTS = 5
+YELP_INGEST_BACKOFF = 1.0  # seconds, doubled per retry when there's no Retry-After
+
+
+
+def retry_after_seconds(value):
+    """
+    Seconds to wait for a Retry-After header, given either as delta-seconds
+    or as an HTTP-date. None if it's missing or can't be parsed.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return max(0.0, seconds) if math.isfinite(seconds) else None
+
+
+CUISINES = [
+    "italian", "japanese", "mexican", "chinese", "indian",
+    "thai", "american", "french", "mediterranean", "korean",
+]
+LOCATIONS = [
+    "Manhattan, NY",
+    "Brooklyn, NY",
+    "Williamsburg, Brooklyn, NY",
+    "East Village, Manhattan, NY",
+    "West Village, Manhattan, NY",
+]
+
+PRICE_LEVELS = {"$": 1, "$$": 2, "$$$": 3, "$$$$": 4}
+DEFAULT_HOURS = {
+    "Monday": "11:00 AM - 10:00 PM",
+    "Tuesday": "11:00 AM - 10:00 PM",
+    "Wednesday": "11:00 AM - 10:00 PM",
+    "Thursday": "11:00 AM - 10:00 PM",
+    "Friday": "11:00 AM - 11:00 PM",
+    "Saturday": "10:00 AM - 11:00 PM",
+    "Sunday": "10:00 AM - 10:00 PM",
+}
+
+
+def transform_to_foodtok_format(business):
+    """Map a Yelp search result to a Restaurants table item."""
+    coords = business.get("coordinates") or {}
+    location = business.get("location") or {}
+    price_range = PRICE_LEVELS.get(business.get("price", "$$"), 2)
+    categories = business.get("categories") or []
+    cuisine = categories[0]["title"] if categories else "American"
+
+    features = []
+    transactions = business.get("transactions") or []
+    if "delivery" in transactions:
+        features.append("Delivery")
+    if "pickup" in transactions:
+        features.append("Takeout")
+    name_lower = business.get("name", "").lower()
+    if "bar" in name_lower or "wine" in name_lower:
+        features.append("Bar")
+    if price_range >= 3:
+        features.append("Fine Dining")
+    if "outdoor" in name_lower or "garden" in name_lower:
+        features.append("Outdoor Seating")
+
+    address_parts = location.get("display_address") or []
+    return {
+        "id": f"rest_{business['id']}",
+        "name": business.get("name", "Unknown Restaurant"),
+        "cuisine": cuisine,
+        "priceRange": price_range,
+        "rating": float(business.get("rating", 4.0)),
+        "reviewCount": int(business.get("review_count", 0)),
+        "imageUrl": business.get("image_url", ""),
+        "description": f"Highly rated {cuisine.lower()} restaurant in {location.get('city', 'NYC')}",
+        "address": ", ".join(address_parts) if address_parts else "New York, NY",
+        "location": {
+            "lat": coords.get("latitude", 40.7589),
+            "lng": coords.get("longitude", -73.9851),
+            "city": location.get("city", "New York"),
+            "state": location.get("state", "NY"),
+            "zipCode": location.get("zip_code", "10001"),
+        },
+        "phone": business.get("display_phone", ""),
+        "yelpUrl": business.get("url", ""),
+        "hours": dict(DEFAULT_HOURS),
+        "features": features or ["Dine-in", "Reservations"],
+        "dietaryOptions": ["Vegetarian Options"],
+        "capacity": {"total": 50, "perTimeSlot": 10},
+        "depositPerPerson": 25,
+        "isActive": True,
+    }
+
+
+class TokenBucket:
+    """asyncio token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate=YELP_INGEST_RATE, capacity=YELP_INGEST_BURST, clock=time.monotonic, sleep=asyncio.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await self._sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def drain(self):
+        """Empty the bucket (after a 429, so every worker slows down, not just one)."""
+        self._refill()
+        self._tokens = 0.0
+
+
+class Checkpoint:
+    """
+    Crawl progress on disk: {"searches": {"<cuisine>|<location>": next offset
+    or null once finished}}. Written atomically after every page.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.searches = {}
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.searches = json.load(f).get("searches", {})
+
+    def next_offset(self, key):
+        return self.searches.get(key, 0)
+
+    def save(self, key, next_offset):
+        self.searches[key] = next_offset
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"searches": self.searches}, f)
+        os.replace(tmp_path, self.path)
+
+
+class CatalogIngester:
+    """Concurrent, rate-limited Yelp search crawl to NDJSON (see module docstring)."""
+
+    def __init__(
+        self,
+        output_path,
+        checkpoint_path=None,
+        base_url=YELP_API_BASE,
+        api_key=YELP_API_KEY,
+        rate=YELP_INGEST_RATE,
+        burst=YELP_INGEST_BURST,
+        concurrency=YELP_INGEST_CONCURRENCY,
+        timeout=YELP_INGEST_TIMEOUT,
+        page_size=YELP_SEARCH_PAGE,
+    ):
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+        self.base_url = base_url.rstrip("/")
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.page_size = min(page_size, YELP_SEARCH_PAGE)
+        self.stats = {"requests": 0, "retries": 0, "written": 0, "duplicates": 0, "failed_searches": 0}
+
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {api_key}", "accept": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _seen_ids(self):
+        """
+        Ids already in the output file, so a resumed crawl doesn't repeat
+        them. A partial last line (the previous run died mid-write) is cut off.
+        """
+        seen = set()
+        if not os.path.exists(self.output_path):
+            return seen
+        with open(self.output_path, "rb+") as f:
+            complete = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    f.truncate(complete)
+                    break
+                complete += len(line)
+                if line.strip():
+                    seen.add(json.loads(line)["id"])
+        return seen
+
+    def _get(self, params):
+        return self.session.get(f"{self.base_url}/businesses/search", params=params, timeout=self.timeout)
+
+    async def _search_page(self, loop, pool, bucket, params):
+        """One search page (with 429 retries); None if it couldn't be fetched."""
+        for attempt in range(YELP_INGEST_MAX_ATTEMPTS):
+            await bucket.acquire()
+            self.stats["requests"] += 1
+            try:
+                response = await loop.run_in_executor(pool, self._get, params)
+            except requests.RequestException as e:
+                print(f"Yelp search failed for {params['term']} in {params['location']}: {e}")
+                return None
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code != 429 and response.status_code < 500:
+                print(f"Yelp API returned {response.status_code} for {params['term']} in {params['location']}")
+                return None
+            self.stats["retries"] += 1
+            bucket.drain()
+            delay = retry_after_seconds(response.headers.get("Retry-After"))
+            await asyncio.sleep(delay if delay is not None else YELP_INGEST_BACKOFF * 2 ** attempt)
+        print(f"Giving up on {params['term']} in {params['location']} after {YELP_INGEST_MAX_ATTEMPTS} attempts")
+        return None
+
+    async def _crawl(self, searches):
+        loop = asyncio.get_running_loop()
+        bucket = TokenBucket(self.rate, self.burst)
+        checkpoint = Checkpoint(self.checkpoint_path)
+        seen = self._seen_ids()
+        queue = asyncio.Queue()
+        for cuisine, location in searches:
+            key = f"{cuisine}|{location}"
+            if checkpoint.next_offset(key) is not None:
+                queue.put_nowait((key, cuisine, location))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="yelp-ingest") as pool, \
+                open(self.output_path, "a") as output:
+
+            async def worker():
+                while True:
+                    try:
+                        key, cuisine, location = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    offset = checkpoint.next_offset(key)
+                    while offset is not None:
+                        limit = min(self.page_size, YELP_SEARCH_WINDOW - offset)
+                        params = {
+                            "term": f"{cuisine} restaurants",
+                            "location": location,
+                            "categories": "restaurants",
+                            "sort_by": "rating",
+                            "limit": limit,
+                            "offset": offset,
+                        }
+                        page = await self._search_page(loop, pool, bucket, params)
+                        if page is None:
+                            self.stats["failed_searches"] += 1
+                            break  # left in the checkpoint at this offset for the next run
+                        businesses = page.get("businesses", [])
+                        for business in businesses:
+                            if business.get("id") is None or f"rest_{business['id']}" in seen:
+                                self.stats["duplicates"] += 1
+                                continue
+                            item = transform_to_foodtok_format(business)
+                            seen.add(item["id"])
+                            output.write(json.dumps(item) + "\n")
+                            self.stats["written"] += 1
+                        output.flush()
+
+                        offset += len(businesses)
+                        end = min(page.get("total", 0), YELP_SEARCH_WINDOW)
+                        if len(businesses) < limit or offset >= end:
+                            offset = None
+                        checkpoint.save(key, offset)
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    def run(self, cuisines=CUISINES, locations=LOCATIONS):
+        """Crawl every cuisine x location search; returns the stats dict."""
+        searches = [(cuisine, location) for cuisine in cuisines for location in locations]
+        start = time.perf_counter()
+        asyncio.run(self._crawl(searches))
+        elapsed = time.perf_counter() - start
+        self.stats["seconds"] = round(elapsed, 3)
+        print(
+            f"Yelp ingest: {self.stats['written']} restaurants ({self.stats['duplicates']} duplicates skipped) "
+            f"from {self.stats['requests']} requests in {elapsed:.2f}s -> {self.output_path}"
+        )
+        return self.stats
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark: requests one worker process can keep in flight, sync vs. async views.
+
+Serves the I/O-bound reads (profile, favorites list and check, active hold,
+user reservations) from a single worker process through serve.sh, in
+three modes:
+
+  gthread     SERVER_MODE=gunicorn, sync views, GUNICORN_THREADS threads
+  asgi-sync   SERVER_MODE=uvicorn with ASYNC_VIEWS=false (sync views under ASGI)
+  asgi-async  SERVER_MODE=uvicorn, the api/async_views.py variants
+
+DynamoDB and Yelp are in-process stubs (tests/api/dynamo_stub.py and
+tests/api/yelp_stub.py) that answer after a fixed latency, so the server
+spends its time waiting, as it does against the real services. For each
+mode an aiohttp client keeps N connections busy for --seconds at each
+concurrency level and reports throughput, p50/p99 latency and errors.
+"capacity" is the highest level whose p99 stays within --slo-ms.
+
+Usage (from FoodTok_Backend/, needs aioboto3 + aiohttp, no services):
+    python benchmarks/bench_async_views.py --concurrency 8 64 256 --seconds 15
+
+The load generator and stubs share the machine with the server; on a small
+box compare modes with each other, not with production numbers.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from api.dynamo import encode_item  # noqa: E402
+from tests.api.dynamo_stub import DynamoStubServer  # noqa: E402
+from tests.api.yelp_stub import YelpStubServer, make_business  # noqa: E402
+
+MODES = {
+    "gthread": {"SERVER_MODE": "gunicorn", "ASYNC_VIEWS": "false"},
+    "asgi-sync": {"SERVER_MODE": "uvicorn", "ASYNC_VIEWS": "false"},
+    "asgi-async": {"SERVER_MODE": "uvicorn", "ASYNC_VIEWS": "true"},
+}
+RESTAURANT_IDS = [f"rest-{i}" for i in range(5)]
+USER = {"userId": "u1", "email": "u1@example.com", "firstName": "Bench", "lastName": "User",
+        "preferences": {"cuisines": ["thai"], "priceRange": 2}}
+RESERVATIONS = [
+    {"reservationId": f"res-{i}", "userId": "u1", "restaurantId": RESTAURANT_IDS[i % 5], "date": f"2030-01-{i + 1:02d}",
+     "time": "19:00", "partySize": 2, "status": "confirmed", "depositAmount": 25}
+    for i in range(10)
+]
+FAVORITES = [
+    {"userId": "u1", "restaurantId": f"rest-{i}", "restaurantName": f"Restaurant {i}", "matchScore": 80,
+     "likedAt": f"2030-01-01T00:00:{i:02d}Z"}
+    for i in range(20)
+]
+HOLD = {"holdId": "hold-1", "userId": "u1", "restaurantId": "rest-1", "status": "active", "ttl": 4102444800,
+        "expiresAt": "2100-01-01T00:00:00Z"}
+PATHS = [
+    "/api/auth/profile/u1",
+    "/api/favorites/u1?limit=20",
+    "/api/favorites/check?userId=u1&restaurantId=rest-1",
+    "/api/reservations/hold/active?userId=u1",
+    "/api/reservations/user/u1?filter=all",
+]
+
+
+def dynamo_handler(operation, request):
+    table = request["TableName"]
+    if operation == "GetItem":
+        return {"Item": encode_item(USER if table == "Users" else FAVORITES[1])}
+    items = {"Reservations": RESERVATIONS, "Favorites": FAVORITES, "Holds": [HOLD]}[table]
+    return {"Items": [encode_item(item) for item in items[:request.get("Limit", len(items))]]}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, dynamo, yelp, threads):
+    env = dict(
+        os.environ,
+        **MODES[mode],
+        PORT=str(port),
+        GUNICORN_WORKERS="1",
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_MAX_REQUESTS="0",
+        DJANGO_SETTINGS_MODULE="ecs_project.settings_api",
+        IS_LOCAL="true",
+        LOCAL_DYNAMO_ENDPOINT=dynamo.endpoint,
+        YELP_API_BASE=yelp.base_url,
+        AWS_ACCESS_KEY_ID="fake",
+        AWS_SECRET_ACCESS_KEY="fake",
+        METRICS_CONSUMED_CAPACITY="false",
+    )
+    process = subprocess.Popen(["sh", "serve.sh"], cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+def stop_server(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait(timeout=30)
+
+
+async def drive(base_url, concurrency, seconds):
+    latencies, errors = [], 0
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30)
+    async with aiohttp.ClientSession(base_url, connector=connector, timeout=timeout) as session:
+        for path in PATHS:  # warm clients, connections and the restaurant cache
+            async with session.get(path) as response:
+                await response.read()
+
+        deadline = time.perf_counter() + seconds
+
+        async def connection(offset):
+            nonlocal errors
+            i = offset
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    async with session.get(PATHS[i % len(PATHS)]) as response:
+                        await response.read()
+                        ok = response.status == 200
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(connection(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan"),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64, 256])
+    parser.add_argument("--seconds", type=float, default=15, help="load per concurrency level")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--dynamo-latency", type=float, default=0.02, help="seconds per DynamoDB call")
+    parser.add_argument("--yelp-latency", type=float, default=0.1, help="seconds per Yelp call")
+    parser.add_argument("--threads", type=int, default=8, help="GUNICORN_THREADS for gthread")
+    parser.add_argument("--slo-ms", type=float, default=500, help="p99 bound for capacity")
+    args = parser.parse_args()
+
+    dynamo = DynamoStubServer(dynamo_handler, delay=args.dynamo_latency).start()
+    yelp = YelpStubServer({rid: make_business(rid, rid) for rid in RESTAURANT_IDS}, delay=args.yelp_latency).start()
+    results = {}
+    try:
+        for mode in args.modes:
+            port = free_port()
+            process = start_server(mode, port, dynamo, yelp, args.threads)
+            try:
+                for concurrency in args.concurrency:
+                    results[(mode, concurrency)] = asyncio.run(
+                        drive(f"http://127.0.0.1:{port}", concurrency, args.seconds))
+                    print(mode, concurrency, results[(mode, concurrency)], file=sys.stderr)
+            finally:
+                stop_server(process)
+    finally:
+        dynamo.stop()
+        yelp.stop()
+
+    print(f"\none worker process; DynamoDB {args.dynamo_latency * 1000:.0f} ms, Yelp {args.yelp_latency * 1000:.0f} ms "
+          f"per call; gthread with {args.threads} threads\n")
+    print(f"{'mode':<11} | {'conns':>5} | {'req/s':>7} | {'p50 ms':>7} | {'p99 ms':>7} | {'errors':>6}")
+    print("-" * 58)
+    for (mode, concurrency), r in results.items():
+        print(f"{mode:<11} | {concurrency:>5} | {r['rps']:>7.0f} | {r['p50_ms']:>7.1f} | {r['p99_ms']:>7.1f} | "
+              f"{r['errors']:>6}")
+
+    print(f"\ncapacity: most connections served with p99 <= {args.slo_ms:.0f} ms and no errors")
+    for mode in args.modes:
+        within = [c for c in args.concurrency
+                  if results[(mode, c)]["p99_ms"] <= args.slo_ms and not results[(mode, c)]["errors"]]
+        print(f"  {mode:<11} {max(within) if within else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: turning a DynamoDB Query response into the JSON a view returns,
+boto3 resource path vs. the api.dynamo fast path.
+
+  resource   TypeDeserializer on every attribute (numbers become Decimal),
+             then json.loads(json.dumps(items, cls=DecimalEncoder)) as the
+             views did
+  fast       api.dynamo.decode_item straight to ints/floats
+
+Usage (from FoodTok_Backend/, no services needed):
+    python benchmarks/bench_attribute_codec.py --items 1000 --rounds 200
+
+Both paths start from the same wire-format response (what the low-level
+client hands back) of --items reservation-shaped items and end with the
+json.dumps that produces the HTTP body. Reports median milliseconds per
+response and checks both produce the same JSON.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+from boto3.dynamodb.types import TypeDeserializer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from api.dynamo import decode_item  # noqa: E402
+
+
+class DecimalEncoder(json.JSONEncoder):
+    """Same as api.views.DecimalEncoder (imported standalone to avoid loading Django)."""
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super().default(obj)
+
+
+def wire_item(i, rng):
+    return {
+        "reservationId": {"S": f"res_{i:06d}"},
+        "userId": {"S": "user_001"},
+        "restaurantId": {"S": f"rest_{rng.randint(1, 500)}"},
+        "date": {"S": "2030-01-%02d" % rng.randint(1, 28)},
+        "time": {"S": rng.choice(["18:00", "18:30", "19:00", "19:30"])},
+        "partySize": {"N": str(rng.randint(1, 8))},
+        "status": {"S": "confirmed"},
+        "confirmationCode": {"S": "ABC123"},
+        "depositAmount": {"N": str(rng.choice([25, 50, 100]))},
+        "restaurantRating": {"N": str(rng.randint(30, 50) / 10)},
+        "restaurantCuisine": {"L": [{"S": "Thai"}, {"S": "Noodles"}]},
+        "payment": {"M": {"method": {"S": "card"}, "amount": {"N": "50.75"}}},
+    }
+
+
+def resource_path(items, deserializer):
+    decoded = [{k: deserializer.deserialize(v) for k, v in item.items()} for item in items]
+    reservations = json.loads(json.dumps(decoded, cls=DecimalEncoder))
+    return json.dumps({"reservations": reservations})
+
+
+def fast_path(items):
+    return json.dumps({"reservations": [decode_item(item) for item in items]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = [wire_item(i, rng) for i in range(args.items)]
+    deserializer = TypeDeserializer()
+
+    # Same data either way (ints come back as 4 vs 4.0, equal once parsed)
+    assert json.loads(resource_path(items, deserializer)) == json.loads(fast_path(items))
+
+    timings = {"resource": [], "fast": []}
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        resource_path(items, deserializer)
+        timings["resource"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        fast_path(items)
+        timings["fast"].append((time.perf_counter() - start) * 1000)
+
+    print(f"{args.items} items per response, {args.rounds} rounds\n")
+    print(f"{'path':<9} | {'p50 ms':>8} | {'max ms':>8}")
+    print("-" * 32)
+    for name, samples in timings.items():
+        print(f"{name:<9} | {statistics.median(samples):>8.2f} | {max(samples):>8.2f}")
+    speedup = statistics.median(timings["resource"]) / statistics.median(timings["fast"])
+    print(f"\nspeedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DynamoDB GetItem throughput under concurrent workers for three
+ways of getting a client.
+
+  per-call   a new boto3 resource for every request (a fresh session per
+             get_dynamodb() call)
+  default    one shared resource with botocore defaults (10 pooled
+             connections, legacy retries)
+  registry   the shared api.aws.ClientRegistry (AWS_MAX_POOL_CONNECTIONS,
+             adaptive retries, keepalive)
+
+Usage (from FoodTok_Backend/, with `make backend-up` running):
+    python benchmarks/bench_client_pool.py --workers 64 --requests 100
+
+Each worker issues --requests GetItems against a throwaway table (created and
+deleted at the end unless --keep). Reports requests/sec and p50/p99 latency
+per mode, plus the registry's peak pool utilization.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from api.aws import ClientRegistry  # noqa: E402
+
+BENCH_TABLE = "BenchClientPool"
+ITEMS = 100
+
+
+def client_kwargs(endpoint):
+    return {
+        "region_name": os.getenv("AWS_REGION", "us-east-1"),
+        "endpoint_url": endpoint,
+        "aws_access_key_id": "test",
+        "aws_secret_access_key": "test",
+    }
+
+
+def create_bench_table(dynamodb):
+    client = dynamodb.meta.client
+    if BENCH_TABLE in client.list_tables()["TableNames"]:
+        dynamodb.Table(BENCH_TABLE).delete()
+        client.get_waiter("table_not_exists").wait(TableName=BENCH_TABLE)
+
+    table = dynamodb.create_table(
+        TableName=BENCH_TABLE,
+        KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "userId", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.wait_until_exists()
+    with table.batch_writer() as batch:
+        for i in range(ITEMS):
+            batch.put_item(Item={"userId": f"user_{i}", "email": f"user_{i}@example.com"})
+    return table
+
+
+def run(get_table, workers, requests_per_worker):
+    latencies, lock = [], threading.Lock()
+
+    def worker(w):
+        local = []
+        for i in range(requests_per_worker):
+            start = time.perf_counter()
+            get_table().get_item(Key={"userId": f"user_{(w + i) % ITEMS}"})
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, range(workers)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", default=os.getenv("LOCAL_DYNAMO_ENDPOINT", "http://localhost:8000"))
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=100, help="GetItems per worker")
+    parser.add_argument("--keep", action="store_true", help="keep the bench table afterwards")
+    args = parser.parse_args()
+
+    kwargs = client_kwargs(args.endpoint)
+    shared = boto3.resource("dynamodb", **kwargs)
+    table = create_bench_table(shared)
+
+    lock = threading.Lock()
+
+    def per_call_table():
+        with lock:  # boto3 sessions aren't safe to create clients from concurrently
+            session = boto3.session.Session()
+        return session.resource("dynamodb", **kwargs).Table(BENCH_TABLE)
+
+    registry = ClientRegistry(
+        region=kwargs["region_name"],
+        max_pool_connections=max(args.workers, 10),
+        local_endpoints={"dynamodb": args.endpoint},
+    )
+    registry_table = registry.resource("dynamodb").Table(BENCH_TABLE)
+
+    modes = [
+        ("per-call", per_call_table),
+        ("default", lambda: table),
+        ("registry", lambda: registry_table),
+    ]
+
+    print(f"{args.workers} workers x {args.requests} GetItems against {args.endpoint}\n")
+    print(f"{'mode':<10} | {'req/s':>9} | {'p50 ms':>8} | {'p99 ms':>8}")
+    print("-" * 45)
+    results = {}
+    for name, get_table in modes:
+        run(get_table, min(args.workers, 8), 5)  # warm up connections
+        results[name] = run(get_table, args.workers, args.requests)
+        r = results[name]
+        print(f"{name:<10} | {r['rps']:>9.0f} | {r['p50']:>8.2f} | {r['p99']:>8.2f}")
+
+    stats = registry.metrics()["resource.dynamodb:default"]
+    print(f"\nregistry pool: peak {stats['peak_in_flight']}/{stats['max_pool_connections']} connections in use, "
+          f"{stats['retries']} retries")
+    print(f"registry vs per-call: {results['registry']['rps'] / results['per-call']['rps']:.1f}x, "
+          f"vs default: {results['registry']['rps'] / results['default']['rps']:.1f}x")
+
+    if not args.keep:
+        table.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login email lookup (UsersByEmail GSI query vs. full-table scan)
+as the Users table grows, against DynamoDB Local.
+
+Usage (from FoodTok_Backend/, with `make backend-up` running):
+    python benchmarks/bench_email_lookup.py --sizes 1000 10000 100000 1000000
+
+A throwaway table is created (and deleted at the end unless --keep) so the
+real Users table is never touched. Sizes are cumulative: the table is grown
+to each size in turn and the lookups are re-measured.
+"""
+
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+
+BENCH_TABLE = "BenchUsersByEmail"
+
+
+def get_dynamodb():
+    return boto3.resource(
+        "dynamodb",
+        region_name=os.getenv("AWS_REGION", "us-east-1"),
+        endpoint_url=os.getenv("LOCAL_DYNAMO_ENDPOINT", "http://localhost:8000"),
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+
+
+def create_bench_table(dynamodb):
+    client = dynamodb.meta.client
+    if BENCH_TABLE in client.list_tables()["TableNames"]:
+        dynamodb.Table(BENCH_TABLE).delete()
+        client.get_waiter("table_not_exists").wait(TableName=BENCH_TABLE)
+
+    table = dynamodb.create_table(
+        TableName=BENCH_TABLE,
+        KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "userId", "AttributeType": "S"},
+            {"AttributeName": "email", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+        GlobalSecondaryIndexes=[{
+            "IndexName": "UsersByEmail",
+            "KeySchema": [{"AttributeName": "email", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+    )
+    table.wait_until_exists()
+    return table
+
+
+def grow_table(table, start: int, stop: int):
+    """Write synthetic users start..stop-1 (same shape as a signup item)."""
+    with table.batch_writer() as batch:
+        for i in range(start, stop):
+            batch.put_item(Item={
+                "userId": f"user_{uuid.uuid4().hex[:8]}",
+                "email": f"bench{i}@example.com",
+                "password": "$2b$12$" + "x" * 53,
+                "firstName": "Bench",
+                "lastName": str(i),
+                "preferences": {"cuisines": [], "dietaryRestrictions": [], "priceRange": "$$"},
+            })
+
+
+def lookup_query(table, email):
+    return table.query(IndexName="UsersByEmail", KeyConditionExpression=Key("email").eq(email))["Items"]
+
+
+def lookup_scan(table, email):
+    """The pre-GSI path, paginated so it is at least correct."""
+    items = []
+    kwargs = {"FilterExpression": Attr("email").eq(email)}
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def time_lookup(fn, table, emails):
+    samples = []
+    for email in emails:
+        start = time.perf_counter()
+        found = fn(table, email)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert found, f"{email} not found"
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--lookups", type=int, default=20, help="lookups per size")
+    parser.add_argument("--scan-limit", type=int, default=100_000,
+                        help="skip the scan measurement above this table size")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark table afterwards")
+    args = parser.parse_args()
+
+    dynamodb = get_dynamodb()
+    table = create_bench_table(dynamodb)
+
+    print(f"{'users':>10} | {'query p50':>10} {'query max':>10} | {'scan p50':>10} {'scan max':>10}  (ms)")
+    print("-" * 64)
+
+    size = 0
+    try:
+        for target in sorted(args.sizes):
+            grow_table(table, size, target)
+            size = target
+            emails = [f"bench{(i * 7919) % size}@example.com" for i in range(args.lookups)]
+
+            q50, qmax = time_lookup(lookup_query, table, emails)
+            if size <= args.scan_limit:
+                s50, smax = time_lookup(lookup_scan, table, emails[:3])
+                scan_cols = f"{s50:>10.1f} {smax:>10.1f}"
+            else:
+                scan_cols = f"{'skipped':>10} {'':>10}"
+            print(f"{size:>10} | {q50:>10.1f} {qmax:>10.1f} | {scan_cols}")
+    finally:
+        if not args.keep:
+            table.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: float -> Decimal conversion before DynamoDB writes.
+
+  recursive   the recursive convert_floats_to_decimal / marshal that rebuilt
+              every dict and list
+  iterative   api.conversion.convert_floats_to_decimal (explicit stack,
+              copy-on-write)
+
+Usage (from FoodTok_Backend/, no services needed):
+    python benchmarks/bench_float_conversion.py --items 10000 --rounds 20
+
+Two workloads:
+  preferences  a deeply nested preferences document (--depth levels), once
+               with a few floats at the bottom and once with none
+  seed         a --items batch of reservation-shaped seed items
+
+Reports median milliseconds per conversion and checks every path produces
+the same result.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from api.conversion import convert_floats_to_decimal  # noqa: E402
+
+
+def recursive_convert(obj):
+    if isinstance(obj, list):
+        return [recursive_convert(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {k: recursive_convert(v) for k, v in obj.items()}
+    elif isinstance(obj, float):
+        return Decimal(str(obj))
+    else:
+        return obj
+
+
+def preferences(depth, with_floats):
+    doc = {"cuisines": ["Thai", "Ramen", "Tacos"], "priceRange": [1, 3], "dietary": ["vegetarian"]}
+    node = doc
+    for level in range(depth):
+        node["history"] = {"level": level, "tags": ["a", "b", "c"], "visits": list(range(10))}
+        node = node["history"]
+    if with_floats:
+        node.update({"maxDistance": 2.5, "weights": [0.4, 0.35, 0.25]})
+    return doc
+
+
+def seed_item(i, rng):
+    return {
+        "reservationId": f"res_{i:06d}",
+        "userId": f"user_{rng.randint(1, 2000):04d}",
+        "restaurantId": f"rest_{rng.randint(1, 500)}",
+        "date": "2030-01-%02d" % rng.randint(1, 28),
+        "time": rng.choice(["18:00", "18:30", "19:00", "19:30"]),
+        "partySize": rng.randint(1, 8),
+        "status": "confirmed",
+        "dateTimeStatus": "2030-01-01#18:00#confirmed",
+        "confirmationCode": "ABC123",
+        "depositAmount": rng.choice([25.0, 50.0, 37.5]),
+        "depositPaid": True,
+        "paymentLast4": "4242",
+        "paymentBrand": "visa",
+        "createdAt": "2030-01-01T00:00:00Z",
+        "specialRequests": "window seat",
+        "restaurantCuisine": ["Thai", "Noodles"],
+        "restaurantRating": rng.randint(30, 50) / 10,
+    }
+
+
+def time_ms(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def report(title, paths, rounds):
+    expected = paths[0][1]()
+    for name, fn in paths:
+        assert fn() == expected, name
+
+    print(f"\n{title}")
+    print(f"{'path':<10} | {'p50 ms':>9}")
+    print("-" * 23)
+    baseline = None
+    for name, fn in paths:
+        p50 = time_ms(fn, rounds)
+        baseline = baseline or p50
+        print(f"{name:<10} | {p50:>9.3f}   ({baseline / p50:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for with_floats in (True, False):
+        doc = preferences(args.depth, with_floats)
+        report(
+            f"preferences, depth {args.depth}, {'floats at the bottom' if with_floats else 'no floats'}",
+            [("recursive", lambda: recursive_convert(doc)), ("iterative", lambda: convert_floats_to_decimal(doc))],
+            args.rounds * 50,
+        )
+
+    rng = random.Random(args.seed)
+    items = [seed_item(i, rng) for i in range(args.items)]
+    report(
+        f"seed batch, {args.items} items",
+        [
+            ("recursive", lambda: [recursive_convert(item) for item in items]),
+            ("iterative", lambda: [convert_floats_to_decimal(item) for item in items]),
+        ],
+        args.rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GET /api/auth/profile/<id> latency with and without the profile cache.
+
+Requests go through the WSGI app in-process (ecs_project.settings_api)
+against the DynamoDB stub from tests/api/dynamo_stub.py, which answers
+after --dynamo-latency seconds, like a same-region GetItem. The workload
+reads profiles of --users users in random order, and every --write-every
+reads one of them PATCHes its preferences (update_preferences, which
+writes the ALL_NEW item through to the cache). For each backend:
+
+  off         PROFILE_CACHE=off: every read is a GetItem
+  memory      in-process LRU + TTL
+  fake-redis  RedisBackend over tests/api/fake_redis.py: JSON and key
+              handling without a network hop
+  redis       RedisBackend over --redis-url (skipped without it)
+
+reports p50/p99/mean per read, the hit ratio and the GetItems sent.
+
+Usage (from FoodTok_Backend/, no services needed):
+    python benchmarks/bench_profile_cache.py --users 200 --reads 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+from api.dynamo import encode_item  # noqa: E402
+from bench_settings_profile import serve  # noqa: E402
+from tests.api.dynamo_stub import DynamoStubServer  # noqa: E402
+from tests.api.fake_redis import FakeRedis  # noqa: E402
+
+
+def make_user(user_id):
+    return {
+        "userId": user_id,
+        "email": f"{user_id}@example.com",
+        "password": "$2b$12$" + "x" * 53,
+        "firstName": "Bench",
+        "lastName": user_id,
+        "preferences": {"cuisines": ["thai", "italian"], "dietaryRestrictions": [], "priceRange": "$$",
+                        "maxDistance": 10, "favoriteRestaurants": []},
+        "createdAt": "2030-01-01T00:00:00",
+        "updatedAt": "2030-01-01T00:00:00",
+    }
+
+
+def stub_handler(users):
+    def handler(operation, request):
+        user_id = request["Key"]["userId"]["S"]
+        if operation == "GetItem":
+            return {"Item": users[user_id]} if user_id in users else {}
+        if operation == "UpdateItem":
+            users[user_id]["updatedAt"] = request["ExpressionAttributeValues"][":updated"]
+            return {"Attributes": users[user_id]}
+        raise ValueError(operation)
+    return handler
+
+
+def run_mode(app, stub, user_ids, reads, write_every, seed):
+    from api import metrics
+
+    metrics.registry = metrics.MetricsRegistry()
+    stub.requests.clear()
+    rng = random.Random(seed)
+    latencies = []
+    for i in range(reads):
+        user_id = rng.choice(user_ids)
+        if write_every and i and i % write_every == 0:
+            body = json.dumps({"userId": user_id, "bio": f"edit {i}"}).encode()
+            assert serve(app, "PATCH", "/api/auth/preferences", body).startswith("200")
+        started = time.perf_counter()
+        status = serve(app, "GET", f"/api/auth/profile/{user_id}", b"")
+        latencies.append(time.perf_counter() - started)
+        assert status.startswith("200"), status
+
+    cache = metrics.registry.cache.values
+    hits, lookups = cache.get(("profile", "hit"), 0), sum(cache.values())
+    latencies.sort()
+    return {
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+        "get_items": sum(1 for operation, _ in stub.requests if operation == "GetItem"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=5000)
+    parser.add_argument("--write-every", type=int, default=50, help="one preferences update per N reads (0: none)")
+    parser.add_argument("--dynamo-latency", type=float, default=0.004, help="seconds per DynamoDB call")
+    parser.add_argument("--ttl", type=int, default=30)
+    parser.add_argument("--redis-url", help="also measure a real Redis-compatible server")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    users = {f"user_{i:05d}": encode_item(make_user(f"user_{i:05d}")) for i in range(args.users)}
+    stub = DynamoStubServer(stub_handler(users), delay=args.dynamo_latency).start()
+    os.environ.update(
+        DJANGO_SETTINGS_MODULE="ecs_project.settings_api",
+        DJANGO_DEBUG="false",
+        IS_LOCAL="true",
+        LOCAL_DYNAMO_ENDPOINT=stub.endpoint,
+        AWS_ACCESS_KEY_ID="fake",
+        AWS_SECRET_ACCESS_KEY="fake",
+        METRICS_CONSUMED_CAPACITY="false",
+    )
+    from django.core.wsgi import get_wsgi_application
+
+    from api import views
+    from api.profiles import MemoryBackend, ProfileCache, RedisBackend
+
+    app = get_wsgi_application()
+    backends = {
+        "off": lambda: ProfileCache(None),
+        "memory": lambda: ProfileCache(MemoryBackend(ttl=args.ttl)),
+        "fake-redis": lambda: ProfileCache(RedisBackend(FakeRedis(), ttl=args.ttl)),
+    }
+    if args.redis_url:
+        backends["redis"] = lambda: ProfileCache(RedisBackend.from_url(args.redis_url, ttl=args.ttl))
+
+    results = {}
+    try:
+        serve(app, "GET", "/api/helloECS", b"")  # import the URLconf and views outside the timings
+        for name, make_cache in backends.items():
+            views.profile_cache = make_cache()
+            results[name] = run_mode(app, stub, list(users), args.reads, args.write_every, args.seed)
+    finally:
+        stub.stop()
+
+    print(f"\n{args.reads} profile reads over {args.users} users, a write every {args.write_every} reads, "
+          f"DynamoDB {args.dynamo_latency * 1000:.1f} ms per call\n")
+    print(f"{'cache':<11} | {'p50 us':>8} | {'p99 us':>8} | {'mean us':>8} | {'hit ratio':>9} | {'GetItems':>8}")
+    print("-" * 68)
+    for name, r in results.items():
+        print(f"{name:<11} | {r['p50_us']:>8.0f} | {r['p99_us']:>8.0f} | {r['mean_us']:>8.0f} | "
+              f"{r['hit_ratio']:>9.1%} | {r['get_items']:>8}")
+
+
+if __name__ == "__main__":
+    main()
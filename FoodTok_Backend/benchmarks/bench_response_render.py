@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CPU time to render a 500-reservation response body.
+
+  before          json.loads(json.dumps(items, cls=DecimalEncoder)) in the
+                  view, then DRF's JSONRenderer (two encodes, one decode)
+  after (json)    FoodTokJSONRenderer on the raw items, stdlib json backend
+  after (orjson)  FoodTokJSONRenderer on the raw items, orjson backend
+
+Usage (from FoodTok_Backend/, no services needed):
+    python benchmarks/bench_response_render.py --reservations 500 --rounds 300
+
+Items are shaped like boto3 resource output (Decimal numbers, a string set,
+nested maps). Reports median CPU milliseconds (process time) per response
+and checks all paths produce the same data.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+import django
+from django.conf import settings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+settings.configure(INSTALLED_APPS=["rest_framework"])
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api import renderers  # noqa: E402
+
+
+class DecimalEncoder(json.JSONEncoder):
+    """The encoder views used before FoodTokJSONRenderer."""
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        return super().default(obj)
+
+
+def reservation(i, rng):
+    return {
+        "reservationId": f"res_{i:06d}",
+        "userId": "user_001",
+        "restaurantId": f"rest_{rng.randint(1, 500)}",
+        "restaurantName": "Thai Basil",
+        "restaurantCuisine": ["Thai", "Noodles"],
+        "restaurantRating": Decimal(str(rng.randint(30, 50) / 10)),
+        "date": "2030-01-%02d" % rng.randint(1, 28),
+        "time": rng.choice(["18:00", "18:30", "19:00", "19:30"]),
+        "partySize": Decimal(rng.randint(1, 8)),
+        "status": "confirmed",
+        "depositAmount": Decimal(rng.choice([25, 50, 100])),
+        "confirmation": {"code": "ABC123", "amount": Decimal("50.75")},
+    }
+
+
+def cpu_ms(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.process_time()
+        fn()
+        samples.append((time.process_time() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = [reservation(i, rng) for i in range(args.reservations)]
+    drf, fast = JSONRenderer(), renderers.FoodTokJSONRenderer()
+
+    def before():
+        sanitized = json.loads(json.dumps(items, cls=DecimalEncoder))
+        return drf.render({"reservations": sanitized, "count": len(sanitized)})
+
+    paths = [
+        ("before", before),
+        ("after (json)", lambda: renderers.dumps({"reservations": items, "count": len(items)}, use_orjson=False)),
+    ]
+    if renderers.orjson is not None:
+        paths.append(("after (orjson)", lambda: fast.render({"reservations": items, "count": len(items)})))
+
+    expected = json.loads(before())
+    for name, fn in paths:
+        assert json.loads(fn()) == expected, name
+
+    print(f"{args.reservations} reservations per response, {args.rounds} rounds\n")
+    print(f"{'path':<15} | {'CPU p50 ms':>10} | {'CPU max ms':>10}")
+    print("-" * 42)
+    baseline = None
+    for name, fn in paths:
+        samples = cpu_ms(fn, args.rounds)
+        p50 = statistics.median(samples)
+        baseline = baseline or p50
+        print(f"{name:<15} | {p50:>10.3f} | {max(samples):>10.3f}   ({baseline / p50:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
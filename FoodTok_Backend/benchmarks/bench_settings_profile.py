@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ecs_project.settings (full) vs. ecs_project.settings_api (lean).
+
+For each profile, in fresh interpreters:
+
+  process     wall time of a child interpreter that builds the WSGI app and
+              serves one request (interpreter start included)
+  setup       django.setup() + get_wsgi_application() + the first request
+              (which imports the URLconf and api.views)
+  modules     entries in sys.modules once ready
+  per request median microseconds per request through the WSGI handler:
+                GET  /api/helloECS                      (200, no AWS)
+                POST /api/reservations/availability {}  (400, JSON parsed, no AWS)
+
+Usage (from FoodTok_Backend/, no services needed):
+    python benchmarks/bench_settings_profile.py --runs 5 --requests 2000
+
+Neither request reaches DynamoDB, so the numbers are framework overhead
+only: middleware, DRF request/response handling and rendering.
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PROFILES = {"full": "ecs_project.settings", "api": "ecs_project.settings_api"}
+REQUESTS = {
+    "GET /api/helloECS": ("GET", "/api/helloECS", b""),
+    "POST /api/reservations/availability": ("POST", "/api/reservations/availability", b"{}"),
+}
+
+
+def environ(method, path, body):
+    return {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": "bench",
+        "SERVER_PORT": "8080",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "bench",
+        "HTTP_ORIGIN": "http://localhost:3000",
+        "HTTP_ACCEPT": "application/json",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.url_scheme": "http",
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+
+def serve(app, method, path, body):
+    statuses = []
+    chunks = app(environ(method, path, body), lambda status, headers, exc_info=None: statuses.append(status))
+    b"".join(chunks)
+    chunks.close()
+    return statuses[0]
+
+
+def child(requests_per_round, rounds):
+    """Runs inside the fresh interpreter; prints one JSON line."""
+    start = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+
+    app = get_wsgi_application()
+    serve(app, *REQUESTS["GET /api/helloECS"])
+    result = {"setup_ms": (time.perf_counter() - start) * 1000, "modules": len(sys.modules), "per_request_us": {}}
+
+    for name, request in REQUESTS.items() if rounds else ():
+        status = serve(app, *request)
+        samples = []
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            for _ in range(requests_per_round):
+                serve(app, *request)
+            samples.append((time.perf_counter() - t0) / requests_per_round * 1e6)
+        result["per_request_us"][name] = {"status": status, "us": statistics.median(samples)}
+    print(json.dumps(result))
+
+
+def run_profile(settings_module, requests_per_round, rounds):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, DJANGO_DEBUG="false")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "--requests", str(requests_per_round),
+           "--rounds", str(rounds)]
+    start = time.perf_counter()
+    out = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per profile")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per timing round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, BACKEND_DIR)
+        child(args.requests, args.rounds)
+        return
+
+    results = {}
+    for name, module in PROFILES.items():
+        startups = [run_profile(module, 0, 0) for _ in range(args.runs)]
+        runs = [run_profile(module, args.requests, args.rounds) for _ in range(args.runs)]
+        results[name] = {
+            "process_ms": statistics.median(r["process_ms"] for r in startups),
+            "setup_ms": statistics.median(r["setup_ms"] for r in startups),
+            "modules": startups[-1]["modules"],
+            "per_request_us": {
+                request: statistics.median(r["per_request_us"][request]["us"] for r in runs) for request in REQUESTS
+            },
+            "statuses": {request: runs[-1]["per_request_us"][request]["status"] for request in REQUESTS},
+        }
+        assert results[name]["statuses"] == results["full"]["statuses"], (name, results[name]["statuses"])
+
+    print(f"\nmedian of {args.runs} fresh interpreters per profile\n")
+    print(f"{'profile':<8} | {'process ms':>10} | {'setup ms':>8} | {'modules':>7}")
+    print("-" * 43)
+    for name, r in results.items():
+        print(f"{name:<8} | {r['process_ms']:>10.0f} | {r['setup_ms']:>8.0f} | {r['modules']:>7}")
+
+    print(f"\n{'request':<38} | {'full us':>8} | {'api us':>8} | {'saved':>6}")
+    print("-" * 69)
+    for request in REQUESTS:
+        full, api = results["full"]["per_request_us"][request], results["api"]["per_request_us"][request]
+        print(f"{request:<38} | {full:>8.1f} | {api:>8.1f} | {1 - api / full:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
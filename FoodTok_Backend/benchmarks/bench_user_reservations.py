@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark: listing one user's reservations via the UserReservations GSI
+query vs. the old full-table scan, against DynamoDB Local.
+
+Usage (from FoodTok_Backend/, with `make backend-up` running):
+    python benchmarks/bench_user_reservations.py --total 1000000 --per-user 20
+
+Loads --total reservations spread over many users into a throwaway table
+(plus --per-user for the user being measured), then reports latency and
+consumed read capacity for each access path.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+import boto3
+from boto3.dynamodb.conditions import Attr, Key
+
+BENCH_TABLE = "BenchReservations"
+TARGET_USER = "user_bench_target"
+
+
+def get_dynamodb():
+    return boto3.resource(
+        "dynamodb",
+        region_name=os.getenv("AWS_REGION", "us-east-1"),
+        endpoint_url=os.getenv("LOCAL_DYNAMO_ENDPOINT", "http://localhost:8000"),
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+
+
+def create_bench_table(dynamodb):
+    client = dynamodb.meta.client
+    if BENCH_TABLE in client.list_tables()["TableNames"]:
+        dynamodb.Table(BENCH_TABLE).delete()
+        client.get_waiter("table_not_exists").wait(TableName=BENCH_TABLE)
+
+    table = dynamodb.create_table(
+        TableName=BENCH_TABLE,
+        KeySchema=[{"AttributeName": "reservationId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "reservationId", "AttributeType": "S"},
+            {"AttributeName": "userId", "AttributeType": "S"},
+            {"AttributeName": "date", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+        GlobalSecondaryIndexes=[{
+            "IndexName": "UserReservations",
+            "KeySchema": [
+                {"AttributeName": "userId", "KeyType": "HASH"},
+                {"AttributeName": "date", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+    )
+    table.wait_until_exists()
+    return table
+
+
+def reservation(user_id, day_offset):
+    return {
+        "reservationId": f"res_{uuid.uuid4().hex[:12]}",
+        "userId": user_id,
+        "restaurantId": f"rest_{random.randint(1, 500)}",
+        "date": (date.today() + timedelta(days=day_offset)).isoformat(),
+        "time": random.choice(["18:00", "18:30", "19:00", "19:30", "20:00"]),
+        "partySize": random.randint(1, 6),
+        "status": random.choice(["confirmed", "confirmed", "confirmed", "cancelled"]),
+        "confirmationCode": uuid.uuid4().hex[:6].upper(),
+        "depositAmount": 100,
+    }
+
+
+def load(table, total, per_user):
+    with table.batch_writer() as batch:
+        for i in range(per_user):
+            batch.put_item(Item=reservation(TARGET_USER, random.randint(-60, 60)))
+        for i in range(total):
+            batch.put_item(Item=reservation(f"user_{i // 5:07d}", random.randint(-60, 60)))
+            if i and i % 100_000 == 0:
+                print(f"  loaded {i} reservations...")
+
+
+def upcoming_query(table, today):
+    items, capacity, kwargs = [], 0.0, {
+        "IndexName": "UserReservations",
+        "KeyConditionExpression": Key("userId").eq(TARGET_USER) & Key("date").gte(today),
+        "FilterExpression": Attr("status").ne("cancelled"),
+        "ReturnConsumedCapacity": "TOTAL",
+    }
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response["Items"])
+        capacity += response.get("ConsumedCapacity", {}).get("CapacityUnits", 0)
+        if "LastEvaluatedKey" not in response:
+            return items, capacity
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def upcoming_scan(table, today):
+    items, capacity, kwargs = [], 0.0, {
+        "FilterExpression": Attr("userId").eq(TARGET_USER),
+        "ReturnConsumedCapacity": "TOTAL",
+    }
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response["Items"])
+        capacity += response.get("ConsumedCapacity", {}).get("CapacityUnits", 0)
+        if "LastEvaluatedKey" not in response:
+            break
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return [r for r in items if r["date"] >= today and r["status"] != "cancelled"], capacity
+
+
+def measure(fn, table, today, runs):
+    samples, capacity, found = [], 0.0, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        items, capacity = fn(table, today)
+        samples.append((time.perf_counter() - start) * 1000)
+        found = len(items)
+    return statistics.median(samples), capacity, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--total", type=int, default=100_000, help="background reservations")
+    parser.add_argument("--per-user", type=int, default=20, help="reservations for the measured user")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark table afterwards")
+    args = parser.parse_args()
+
+    dynamodb = get_dynamodb()
+    table = create_bench_table(dynamodb)
+    try:
+        print(f"Loading {args.total + args.per_user} reservations...")
+        load(table, args.total, args.per_user)
+        today = date.today().isoformat()
+
+        q_ms, q_cap, q_found = measure(upcoming_query, table, today, args.runs)
+        s_ms, s_cap, s_found = measure(upcoming_scan, table, today, max(1, args.runs // 5))
+        assert q_found == s_found, f"query found {q_found}, scan found {s_found}"
+
+        print(f"\n{'path':<8} | {'p50 ms':>10} | {'read units':>10} | results")
+        print("-" * 46)
+        print(f"{'query':<8} | {q_ms:>10.1f} | {q_cap:>10.1f} | {q_found}")
+        print(f"{'scan':<8} | {s_ms:>10.1f} | {s_cap:>10.1f} | {s_found}")
+    finally:
+        if not args.keep:
+            table.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-city Yelp catalog crawl, serial vs. api.yelp_ingest.
+
+  serial     one search page at a time, paging each cuisine x location
+             search in turn (the old script's loop, with pagination added)
+  ingester   CatalogIngester: concurrent searches under the token bucket
+
+Usage (from FoodTok_Backend/, no services needed):
+    python benchmarks/bench_yelp_ingest.py --restaurants 240 --latency 0.05 --rate 50
+
+Runs against the in-process Yelp stub from tests/api/yelp_stub.py with
+--latency seconds per response. Every cuisine has --restaurants matches,
+so each search is ceil(min(restaurants, 240) / 50) pages. Reports wall
+time, requests and restaurants written, and checks both crawls find the
+same restaurants.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from api.yelp_ingest import CUISINES, LOCATIONS, CatalogIngester, transform_to_foodtok_format  # noqa: E402
+from tests.api.yelp_stub import YelpStubServer, make_business  # noqa: E402
+
+
+def serial_crawl(base_url, cuisines, locations):
+    seen, items, requests_made = set(), [], 0
+    for cuisine in cuisines:
+        for location in locations:
+            offset = 0
+            while offset < 240:
+                params = {"term": f"{cuisine} restaurants", "location": location, "limit": min(50, 240 - offset), "offset": offset}
+                page = requests.get(f"{base_url}/businesses/search", params=params, timeout=10).json()
+                requests_made += 1
+                businesses = page.get("businesses", [])
+                for business in businesses:
+                    if business["id"] not in seen:
+                        seen.add(business["id"])
+                        items.append(transform_to_foodtok_format(business))
+                offset += len(businesses)
+                if len(businesses) < params["limit"] or offset >= page.get("total", 0):
+                    break
+    return items, requests_made
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=240, help="matches per cuisine")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub seconds per response")
+    parser.add_argument("--rate", type=float, default=50, help="ingester requests per second")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    businesses = {}
+    for cuisine in CUISINES:
+        for i in range(args.restaurants):
+            business_id = f"{cuisine}-{i:04d}"
+            businesses[business_id] = make_business(business_id, business_id, alias=cuisine, title=cuisine.title())
+    stub = YelpStubServer(businesses, delay=args.latency).start()
+
+    try:
+        start = time.perf_counter()
+        serial_items, serial_requests = serial_crawl(stub.base_url, CUISINES, LOCATIONS)
+        serial_seconds = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "restaurants.ndjson")
+            ingester = CatalogIngester(
+                output, base_url=stub.base_url, api_key="bench",
+                rate=args.rate, burst=args.concurrency, concurrency=args.concurrency,
+            )
+            stats = ingester.run(CUISINES, LOCATIONS)
+            with open(output) as f:
+                ingested = [json.loads(line) for line in f]
+    finally:
+        stub.stop()
+
+    assert sorted(i["id"] for i in ingested) == sorted(i["id"] for i in serial_items)
+
+    print(f"\n{len(CUISINES)} cuisines x {len(LOCATIONS)} locations, {args.restaurants} matches per cuisine, "
+          f"{args.latency * 1000:.0f} ms per response\n")
+    print(f"{'crawl':<9} | {'seconds':>8} | {'requests':>8} | {'restaurants':>11}")
+    print("-" * 46)
+    print(f"{'serial':<9} | {serial_seconds:>8.2f} | {serial_requests:>8} | {len(serial_items):>11}")
+    print(f"{'ingester':<9} | {stats['seconds']:>8.2f} | {stats['requests']:>8} | {stats['written']:>11}")
+    print(f"\nspeedup: {serial_seconds / stats['seconds']:.1f}x (ingester capped at {args.rate:g} req/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# ecs_project/gunicorn.conf.py
+"""
+gunicorn settings for the production serving profile (see serve.sh).
+
+Everything is env-driven so the same image serves local load tests and
+Fargate. gthread workers share one process's boto3 client pool across
+threads; SERVER_MODE=uvicorn swaps in the ASGI worker from the uvicorn-worker
+package (uvicorn.workers is deprecated).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+if os.getenv("SERVER_MODE") == "uvicorn":
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count())))
+
+# Keep idle connections open longer than the load balancer does (ALB
+# default: 60s), so the ALB never reuses a connection gunicorn has closed
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "65"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# On SIGTERM, finish in-flight requests for this long; ECS sends SIGKILL
+# 30s after SIGTERM by default
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "25"))
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+
+# Off by default: api/views.py builds its boto3 resources at import time,
+# and with preloading every worker would inherit the master's copies
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+accesslog = "-" if os.getenv("GUNICORN_ACCESS_LOG", "false").lower() == "true" else None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
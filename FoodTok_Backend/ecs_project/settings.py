@@ -1,14 +1,13 @@
 import os
 from pathlib import Path
-import boto3
-from botocore.client import Config
-from botocore.session import get_session
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = "dummy-secret-for-local"
 
-DEBUG = True
+# serve.sh turns this off for the gunicorn/uvicorn serving modes
+DEBUG = os.getenv("DJANGO_DEBUG", "true").lower() == "true"
 
 ALLOWED_HOSTS = ["*"]
 
@@ -40,6 +39,7 @@ STATICFILES_DIRS = []
 
 
 MIDDLEWARE = [
+    "api.metrics.MetricsMiddleware",  # outermost, so its timing covers the rest
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',     # REQUIRED
@@ -51,6 +51,16 @@ MIDDLEWARE = [
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["X-Next-Cursor", "Server-Timing"]
+
+# Responses are serialized once, straight from DynamoDB items (Decimal, sets)
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FoodTokJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
 
 ROOT_URLCONF = "ecs_project.urls"
 
@@ -71,6 +81,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "ecs_project.wsgi.application"
+ASGI_APPLICATION = "ecs_project.asgi.application"
 
 # -------------------------------------------------------------------
 # Environment Variables 
@@ -83,27 +94,6 @@ DYNAMODB_ENDPOINT = os.getenv("DYNAMODB_ENDPOINT")
 S3_ENDPOINT = os.getenv("S3_ENDPOINT")
 
 # -------------------------------------------------------------------
-# Global DynamoDB / S3 Setup 
+# DynamoDB / S3 clients live in api/aws.py (one shared, pooled registry
+# per process); pool size, retries and timeouts are AWS_* env vars there.
 # -------------------------------------------------------------------
-if IS_LOCAL:
-    session = get_session()
-    session.set_credentials(access_key="fake", secret_key="fake")
-    anon = Config(signature_version=None)
-
-    dynamodb = boto3.resource(
-        "dynamodb",
-        region_name=AWS_REGION,
-        endpoint_url=DYNAMODB_ENDPOINT,
-        config=anon,
-    )
-
-    s3 = boto3.client(
-        "s3",
-        region_name=AWS_REGION,
-        endpoint_url=S3_ENDPOINT,
-        config=anon,
-    )
-
-else:
-    dynamodb = boto3.resource("dynamodb", region_name=AWS_REGION)
-    s3 = boto3.client("s3", region_name=AWS_REGION)
@@ -0,0 +1,36 @@
+"""
+API-only settings: the JSON API and nothing else.
+
+Every view is a stateless DRF @api_view over DynamoDB, so this profile
+drops what only the admin and HTML pages use (auth, sessions, messages,
+CSRF, templates, static files, the browsable API) and declares no
+database. Select it with DJANGO_SETTINGS_MODULE=ecs_project.settings_api;
+ecs_project.settings stays the default for local development.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    "corsheaders",
+    "api",
+]
+
+MIDDLEWARE = [
+    "api.metrics.MetricsMiddleware",  # outermost, so its timing covers the rest
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
+]
+
+DATABASES = {}
+TEMPLATES = []
+STATICFILES_DIRS = []
+USE_I18N = False
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": ["api.renderers.FoodTokJSONRenderer"],
+    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
+    # No users in Django: accounts live in the Users table
+    "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_PERMISSION_CLASSES": [],
+    "UNAUTHENTICATED_USER": None,
+}
@@ -1,7 +1,15 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
 
+from api.views import prometheus_metrics
+
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
-]
\ No newline at end of file
+    path("metrics", prometheus_metrics, name="metrics"),
+]
+
+# settings_api leaves the admin out
+if apps.is_installed("django.contrib.admin"):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
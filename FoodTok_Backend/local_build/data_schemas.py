@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # ==========================================================
 # TABLE DEFINITIONS
@@ -12,6 +12,10 @@ class DynamoTables(Enum):
     RESERVATIONS = "Reservations"
     USER_STATS = "UserStats"
     HOLDS = "Holds"
+    SLOT_AVAILABILITY = "SlotAvailability"
+    RECOMMENDATION_SCORES = "RecommendationScores"
+    RESTAURANT_CACHE = "RestaurantCache"
+    CONFIRMATION_CODES = "ConfirmationCodes"
     
 
 # TODO: Update data classes to only include tables above
@@ -156,6 +160,15 @@ class TableAvailabilitySnapshots:
     date: str
     snapshot: Optional[dict] = None
 
+@dataclass
+class SlotAvailability:
+    slotKey: str              # <restaurantId>#<YYYY-MM-DD>
+    time: str                 # HH:MM
+    capacity: int
+    remaining: int
+    booked: int               # seats held by confirmed reservations
+    # plus one "hold#<holdId>" attribute per active hold: {partySize, expiresAt}
+
 @dataclass
 class ReservationTables:
     reservationId: str
@@ -235,7 +248,10 @@ class UserInteractions:
 class RecommendationScores:
     userId: str
     restaurantId: str
+    rankKey: Optional[str] = None
     overallScore: Optional[float] = None
+    reasons: Optional[List[str]] = None
+    restaurant: Optional[Dict] = None
 
 @dataclass
 class UserInteractions:
@@ -10,9 +10,20 @@ USERS_TABLE_SCHEMA = {
         {"AttributeName": "userId", "KeyType": "HASH"}
     ],
     "AttributeDefinitions": [
-        {"AttributeName": "userId", "AttributeType": "S"}
+        {"AttributeName": "userId", "AttributeType": "S"},
+        {"AttributeName": "email", "AttributeType": "S"}
     ],
-    "BillingMode": "PAY_PER_REQUEST"
+    "BillingMode": "PAY_PER_REQUEST",
+
+    "GlobalSecondaryIndexes": [
+        {
+            "IndexName": "UsersByEmail",
+            "KeySchema": [
+                {"AttributeName": "email", "KeyType": "HASH"},
+            ],
+            "Projection": {"ProjectionType": "ALL"}
+        }
+    ]
 }
 
 RESTAURANTS_TABLE_SCHEMA = {
@@ -35,8 +46,19 @@ FAVORITES_TABLE_SCHEMA = {
     "AttributeDefinitions": [
         {"AttributeName": "userId", "AttributeType": "S"},
         {"AttributeName": "restaurantId", "AttributeType": "S"},
+        {"AttributeName": "likedAt", "AttributeType": "S"},
     ],
-    "BillingMode": "PAY_PER_REQUEST"
+    "BillingMode": "PAY_PER_REQUEST",
+    "GlobalSecondaryIndexes": [
+        {
+            "IndexName": "UserFavoritesByLikedAt",
+            "KeySchema": [
+                {"AttributeName": "userId", "KeyType": "HASH"},
+                {"AttributeName": "likedAt", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"}
+        }
+    ]
 }
 
 RESERVATIONS_TABLE_SCHEMA = {
@@ -81,6 +103,93 @@ HOLDS_TABLE_SCHEMA = {
     ],
     "AttributeDefinitions": [
         {"AttributeName": "holdId", "AttributeType": "S"},
+        {"AttributeName": "userId", "AttributeType": "S"},
+        {"AttributeName": "ttl", "AttributeType": "N"}
+    ],
+    "BillingMode": "PAY_PER_REQUEST",
+
+    "GlobalSecondaryIndexes": [
+        {
+            "IndexName": "UserHolds",
+            "KeySchema": [
+                {"AttributeName": "userId", "KeyType": "HASH"},
+                {"AttributeName": "ttl", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"}
+        }
+    ]
+}
+
+SLOT_AVAILABILITY_TABLE_SCHEMA = {
+    "TableName": DynamoTables.SLOT_AVAILABILITY.value,
+    "KeySchema": [
+        {"AttributeName": "slotKey", "KeyType": "HASH"},
+        {"AttributeName": "time", "KeyType": "RANGE"},
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "slotKey", "AttributeType": "S"},
+        {"AttributeName": "time", "AttributeType": "S"},
+    ],
+    "BillingMode": "PAY_PER_REQUEST"
+}
+
+RECOMMENDATION_SCORES_TABLE_SCHEMA = {
+    "TableName": DynamoTables.RECOMMENDATION_SCORES.value,
+    "KeySchema": [
+        {"AttributeName": "userId", "KeyType": "HASH"},
+        {"AttributeName": "restaurantId", "KeyType": "RANGE"},
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "userId", "AttributeType": "S"},
+        {"AttributeName": "restaurantId", "AttributeType": "S"},
+        {"AttributeName": "rankKey", "AttributeType": "S"},
+        {"AttributeName": "rankedShard", "AttributeType": "S"}
+    ],
+    "BillingMode": "PAY_PER_REQUEST",
+    "GlobalSecondaryIndexes": [
+        {
+            "IndexName": "RankedUsers",
+            "KeySchema": [
+                {"AttributeName": "rankedShard", "KeyType": "HASH"},
+                {"AttributeName": "userId", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["preferences"]}
+        }
+    ],
+
+    "LocalSecondaryIndexes": [
+        {
+            "IndexName": "UserRanking",
+            "KeySchema": [
+                {"AttributeName": "userId", "KeyType": "HASH"},
+                {"AttributeName": "rankKey", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "ALL"}
+        }
+    ]
+}
+
+# Yelp details cached by RestaurantEnricher (RESTAURANT_DDB_CACHE=true);
+# kept out of Restaurants so cache rows never overwrite catalog rows
+RESTAURANT_CACHE_TABLE_SCHEMA = {
+    "TableName": DynamoTables.RESTAURANT_CACHE.value,
+    "KeySchema": [
+        {"AttributeName": "id", "KeyType": "HASH"},
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "id", "AttributeType": "S"}
+    ],
+    "BillingMode": "PAY_PER_REQUEST"
+}
+
+# Confirmation codes claimed by confirm_reservation, one row per code
+CONFIRMATION_CODES_TABLE_SCHEMA = {
+    "TableName": DynamoTables.CONFIRMATION_CODES.value,
+    "KeySchema": [
+        {"AttributeName": "code", "KeyType": "HASH"},
+    ],
+    "AttributeDefinitions": [
+        {"AttributeName": "code", "AttributeType": "S"}
     ],
     "BillingMode": "PAY_PER_REQUEST"
 }
@@ -96,4 +205,14 @@ TABLE_SCHEMAS = {
     DynamoTables.FAVORITES.value: FAVORITES_TABLE_SCHEMA,
     DynamoTables.USER_STATS.value: USER_STATS_TABLE_SCHEMA,
     DynamoTables.HOLDS.value: HOLDS_TABLE_SCHEMA,
-}
\ No newline at end of file
+    DynamoTables.SLOT_AVAILABILITY.value: SLOT_AVAILABILITY_TABLE_SCHEMA,
+    DynamoTables.RECOMMENDATION_SCORES.value: RECOMMENDATION_SCORES_TABLE_SCHEMA,
+    DynamoTables.RESTAURANT_CACHE.value: RESTAURANT_CACHE_TABLE_SCHEMA,
+    DynamoTables.CONFIRMATION_CODES.value: CONFIRMATION_CODES_TABLE_SCHEMA,
+}
+
+# Tables whose rows expire via DynamoDB TTL (attribute holds epoch seconds)
+TABLE_TTL_ATTRIBUTES = {
+    DynamoTables.HOLDS.value: "ttl",
+    DynamoTables.RESTAURANT_CACHE.value: "expiresAt",
+}
@@ -1,9 +1,17 @@
 import boto3
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 
-from dynamo_schemas import TABLE_SCHEMAS
+from dynamo_schemas import TABLE_SCHEMAS, TABLE_TTL_ATTRIBUTES
+
+PROVISION_WORKERS = int(os.getenv("PROVISION_WORKERS", "16"))  # tables provisioned at once
+# Diff mode brings existing tables up to their schema (missing GSIs, TTL)
+# instead of skipping them
+PROVISION_DIFF = os.getenv("PROVISION_DIFF", "false").lower() == "true"
+WAIT_DELAY = 1  # seconds between status polls; DynamoDB Local is ready almost at once
+WAIT_MAX_ATTEMPTS = 300
 
 def delete_dynamodb_table_if_exists(dynamodb, table_name: str):
     """Delete DynamoDB table if it already exists."""
@@ -24,26 +32,136 @@ def delete_dynamodb_table_if_exists(dynamodb, table_name: str):
     except ClientError as e:
         print(f"DynamoDB deletion error for '{table_name}': {e}")
 
-def create_dynamodb_table(dynamodb, table_name: str):
-    """Create DynamoDB table if it doesn’t exist."""
-    try:
-        schema = TABLE_SCHEMAS.get(table_name)
-        if not schema:
-            raise Exception(f"Unknown table schema for {table_name}")
+def list_table_names(client):
+    """Every table name in the account/endpoint (one paginated listing)."""
+    names = []
+    for page in client.get_paginator("list_tables").paginate():
+        names.extend(page["TableNames"])
+    return names
 
-        existing_tables = dynamodb.meta.client.list_tables()["TableNames"]
-        if table_name in existing_tables:
-            print(f"DynamoDB table '{table_name}' already exists.")
+
+def ensure_ttl(client, table_name: str):
+    """Enable TTL on table_name if its schema has a TTL attribute and it's off."""
+    ttl_attribute = TABLE_TTL_ATTRIBUTES.get(table_name)
+    if not ttl_attribute:
+        return False
+    description = client.describe_time_to_live(TableName=table_name)["TimeToLiveDescription"]
+    if description.get("TimeToLiveStatus") in ("ENABLED", "ENABLING"):
+        return False
+    client.update_time_to_live(
+        TableName=table_name,
+        TimeToLiveSpecification={"Enabled": True, "AttributeName": ttl_attribute},
+    )
+    print(f"TTL enabled on '{table_name}' ({ttl_attribute}).")
+    return True
+
+
+def wait_for_indexes(client, table_name: str):
+    """Poll until table_name and all of its GSIs are ACTIVE."""
+    for _ in range(WAIT_MAX_ATTEMPTS):
+        table = client.describe_table(TableName=table_name)["Table"]
+        statuses = [table["TableStatus"]] + [i["IndexStatus"] for i in table.get("GlobalSecondaryIndexes", [])]
+        if all(status == "ACTIVE" for status in statuses):
             return
+        time.sleep(WAIT_DELAY)
+    raise TimeoutError(f"'{table_name}' indexes not ACTIVE after {WAIT_MAX_ATTEMPTS * WAIT_DELAY}s")
 
-        print(f"Creating DynamoDB table: {table_name}")
 
-        table = dynamodb.create_table(**schema)
-        table.wait_until_exists()
-        print(f"DynamoDB table '{table_name}' created successfully.")
+def create_dynamodb_table(client, table_name: str):
+    """Create table_name from its schema and wait until it's ACTIVE."""
+    schema = TABLE_SCHEMAS.get(table_name)
+    if not schema:
+        raise Exception(f"Unknown table schema for {table_name}")
+
+    print(f"Creating DynamoDB table: {table_name}")
+    client.create_table(**{**schema, "TableName": table_name})
+    client.get_waiter("table_exists").wait(
+        TableName=table_name,
+        WaiterConfig={"Delay": WAIT_DELAY, "MaxAttempts": WAIT_MAX_ATTEMPTS},
+    )
+    print(f"DynamoDB table '{table_name}' created successfully.")
+    ensure_ttl(client, table_name)
+
+
+def sync_dynamodb_table(client, table_name: str):
+    """
+    Bring an existing table up to its schema: add missing GSIs (one
+    UpdateTable at a time, as DynamoDB requires) and enable TTL. LSIs and
+    key changes can't be applied in place and are only reported.
+    Returns the list of changes made.
+    """
+    schema = TABLE_SCHEMAS.get(table_name)
+    if not schema:
+        raise Exception(f"Unknown table schema for {table_name}")
+
+    table = client.describe_table(TableName=table_name)["Table"]
+    changes = []
+    if table["KeySchema"] != schema["KeySchema"]:
+        print(f"'{table_name}' key schema differs from dynamo_schemas.py; recreate the table to change it.")
+
+    existing_lsis = {i["IndexName"] for i in table.get("LocalSecondaryIndexes", [])}
+    for index in schema.get("LocalSecondaryIndexes", []):
+        if index["IndexName"] not in existing_lsis:
+            print(f"'{table_name}' is missing LSI '{index['IndexName']}'; LSIs can only be added by recreating the table.")
+
+    attribute_types = {a["AttributeName"]: a for a in schema["AttributeDefinitions"]}
+    existing_gsis = {i["IndexName"] for i in table.get("GlobalSecondaryIndexes", [])}
+    for index in schema.get("GlobalSecondaryIndexes", []):
+        if index["IndexName"] in existing_gsis:
+            continue
+        print(f"Adding GSI '{index['IndexName']}' to '{table_name}'...")
+        create = {k: index[k] for k in ("IndexName", "KeySchema", "Projection")}
+        if "ProvisionedThroughput" in index:
+            create["ProvisionedThroughput"] = index["ProvisionedThroughput"]
+        client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=[attribute_types[k["AttributeName"]] for k in index["KeySchema"]],
+            GlobalSecondaryIndexUpdates=[{"Create": create}],
+        )
+        wait_for_indexes(client, table_name)
+        changes.append(f"+GSI {index['IndexName']}")
+
+    if ensure_ttl(client, table_name):
+        changes.append("+TTL")
+    return changes
+
+
+def provision_dynamodb_tables(dynamodb, table_names, diff=PROVISION_DIFF, workers=PROVISION_WORKERS):
+    """
+    Create (or, in diff mode, update) all tables concurrently: one
+    list_tables pass up front, then every table's create/wait runs in its
+    own thread so the waits overlap. Prints wall-clock time per table.
+    """
+    client = dynamodb.meta.client  # clients are thread-safe, resources aren't
+    start = time.perf_counter()
+    existing = set(list_table_names(client))
+
+    def provision(table_name):
+        table_start = time.perf_counter()
+        try:
+            if table_name not in existing:
+                create_dynamodb_table(client, table_name)
+                result = "created"
+            elif diff:
+                result = ", ".join(sync_dynamodb_table(client, table_name)) or "up to date"
+            else:
+                print(f"DynamoDB table '{table_name}' already exists.")
+                result = "exists"
+        except Exception as e:  # one table's failure shouldn't stop the others
+            print(f"DynamoDB provisioning error for '{table_name}': {e}")
+            result = "error"
+        return table_name, result, time.perf_counter() - table_start
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(table_names)))) as pool:
+        results = list(pool.map(provision, table_names))
+
+    print(f"\n{'table':<24} | {'result':<20} | {'seconds':>7}")
+    print("-" * 58)
+    for table_name, result, seconds in results:
+        print(f"{table_name:<24} | {result:<20} | {seconds:>7.2f}")
+    print(f"DynamoDB provisioning took {time.perf_counter() - start:.2f}s")
+    return results
 
-    except ClientError as e:
-        print(f"DynamoDB creation error: {e}")
 
 def create_s3_bucket(s3_client, bucket_name: str, region: str):
     """Create S3 bucket if it doesn’t exist."""
@@ -86,7 +204,10 @@ def main():
         print("Using AWS production endpoints")
 
     # Initialize ddb client and s3 client with higher timeouts for local stacks
-    config = boto3.session.Config(connect_timeout=30, read_timeout=30, retries={"max_attempts": 1})
+    config = boto3.session.Config(
+        connect_timeout=30, read_timeout=30, retries={"max_attempts": 1},
+        max_pool_connections=max(10, PROVISION_WORKERS),
+    )
 
     print("Initializing DynamoDB/S3 clients...")
     dynamodb = boto3.resource(
@@ -109,28 +230,38 @@ def main():
 
     # Get DynamoDB table names
     table_users = os.getenv("DDB_USERS_TABLE", "Users")
+    table_restaurants = os.getenv("DDB_RESTAURANTS_TABLE", "Restaurants")
     table_favorites = os.getenv("DDB_FAVORITES_TABLE", "Favorites")
     table_reservations = os.getenv("DDB_RESERVATIONS_TABLE", "Reservations")
     #table_user_stats = os.getenv("DDB_USER_STATS_TABLE", "UserStats")
     table_holds = os.getenv("DDB_HOLDS_TABLE", "Holds")
+    table_slot_availability = os.getenv("DDB_SLOT_AVAILABILITY_TABLE", "SlotAvailability")
+    table_recommendation_scores = os.getenv("DDB_RECOMMENDATION_SCORES_TABLE", "RecommendationScores")
+    table_restaurant_cache = os.getenv("DDB_RESTAURANT_CACHE_TABLE", "RestaurantCache")
+    table_confirmation_codes = os.getenv("DDB_CONFIRMATION_CODES_TABLE", "ConfirmationCodes")
 
     # Get S3 Bucket names
     bucket_images = os.getenv("S3_IMAGES_BUCKET", "foodtok-local-images")
 
     table_names = [
         table_users,
+        table_restaurants,
         table_reservations,
         table_favorites,
         #table_user_stats,
         table_holds,
+        table_slot_availability,
+        table_recommendation_scores,
+        table_restaurant_cache,
+        table_confirmation_codes,
     ]
 
     # Create DDB tables and S3 Buckets
-    print("\nCreating DynamoDB tables:")
+    print(f"\nProvisioning DynamoDB tables{' (diff mode)' if PROVISION_DIFF else ''}:")
     for table_name in table_names:
         print(f"  -> {table_name}")
         # delete_dynamodb_table_if_exists(dynamodb, table_name)
-        create_dynamodb_table(dynamodb, table_name)
+    provision_dynamodb_tables(dynamodb, table_names)
 
     print("\nCreating S3 bucket:")
     print(f"  -> {bucket_images}")
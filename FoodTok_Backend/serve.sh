@@ -0,0 +1,29 @@
+#!/bin/sh
+# Start the backend. SERVER_MODE picks the server:
+#   runserver  Django's dev server, auto-reload, DEBUG on (default; local only)
+#   gunicorn   gunicorn + gthread workers over ecs_project/wsgi.py, DEBUG off
+#   uvicorn    gunicorn + uvicorn workers over ecs_project/asgi.py, DEBUG off,
+#              with the async I/O views (ASYNC_VIEWS, see api/urls.py)
+# Worker/thread counts, keepalive and shutdown grace are GUNICORN_* env
+# vars, see ecs_project/gunicorn.conf.py.
+set -e
+cd "$(dirname "$0")"
+
+case "${SERVER_MODE:-runserver}" in
+  gunicorn)
+    export DJANGO_DEBUG="${DJANGO_DEBUG:-false}"
+    exec gunicorn ecs_project.wsgi:application -c ecs_project/gunicorn.conf.py
+    ;;
+  uvicorn)
+    export DJANGO_DEBUG="${DJANGO_DEBUG:-false}"
+    export ASYNC_VIEWS="${ASYNC_VIEWS:-true}"
+    exec gunicorn ecs_project.asgi:application -c ecs_project/gunicorn.conf.py
+    ;;
+  runserver)
+    exec python manage.py runserver "0.0.0.0:${PORT:-8080}"
+    ;;
+  *)
+    echo "Unknown SERVER_MODE '${SERVER_MODE}' (expected runserver, gunicorn or uvicorn)" >&2
+    exit 1
+    ;;
+esac
@@ -0,0 +1,89 @@
+"""Tiny in-process stand-in for the DynamoDB JSON API, answering from a handler function."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+
+class DynamoError(Exception):
+    """
+    Raise from a handler to answer with a DynamoDB error, e.g. DynamoError("ValidationException", "...").
+    Extra fields go into the error body (CancellationReasons=[...]).
+    """
+
+    def __init__(self, code: str, message: str, status: int = 400, **fields) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+        self.fields = fields
+
+
+class DynamoStubServer:
+    """
+    Answers every POST with handler(operation, request), where operation is
+    the X-Amz-Target action ("GetItem", "Query", ...) and request the JSON
+    body, both in wire format. Each answer is delayed by `delay` seconds;
+    requests are recorded in order as (operation, request).
+    """
+
+    def __init__(self, handler: Callable[[str, dict], dict], delay: float = 0.0) -> None:
+        self.handler = handler
+        self.delay = delay
+        self.requests: List[Tuple[str, dict]] = []
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def endpoint(self) -> str:
+        assert self._server is not None, "server not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "DynamoStubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like DynamoDB
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                operation = self.headers.get("X-Amz-Target", "").rsplit(".", 1)[-1]
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests.append((operation, request))
+                if stub.delay:
+                    time.sleep(stub.delay)
+                try:
+                    self.reply(200, stub.handler(operation, request))
+                except DynamoError as e:
+                    self.reply(e.status, {"__type": f"com.amazonaws.dynamodb.v20120810#{e.code}", "message": e.message,
+                                          **e.fields})
+
+            def reply(self, status: int, payload: Dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/x-amz-json-1.0")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -30,6 +30,8 @@ EXPECTED_ENDPOINTS: Sequence[EndpointSpec] = (
     EndpointSpec("GET /favorites/<user_id>", "GET", r"^/favorites/[^/]+$"),
     EndpointSpec("POST /favorites", "POST", r"^/favorites$"),
     EndpointSpec("DELETE /favorites", "DELETE", r"^/favorites$"),
+    EndpointSpec("POST /favorites/check:batch", "POST", r"^/favorites/check:batch$"),
+    EndpointSpec("POST /favorites:batch", "POST", r"^/favorites:batch$"),
     # Reservations
     EndpointSpec("POST /reservations/availability", "POST", r"^/reservations/availability$"),
     EndpointSpec("POST /reservations/hold", "POST", r"^/reservations/hold$"),
@@ -47,5 +49,7 @@ EXPECTED_ENDPOINTS: Sequence[EndpointSpec] = (
         "DELETE",
         r"^/reservations/[^/]+/cancel$",
     ),
+    # Discovery
+    EndpointSpec("GET /discover/<user_id>", "GET", r"^/discover/[^/]+$"),
 )
 
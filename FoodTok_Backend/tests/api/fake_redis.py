@@ -0,0 +1,57 @@
+"""In-memory stand-in for the redis-py client calls api.profiles.RedisBackend makes."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+
+class FakeRedis:
+    """
+    get / set(ex=, nx=) / delete with redis-py's return values: bytes from
+    get, True or None from set, the number of keys removed from delete.
+    Keys expire on `clock`. Set `down` to make every call raise, like a
+    server that stopped answering.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self.down = False
+        self.calls: Dict[str, int] = {"get": 0, "set": 0, "delete": 0}
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def _check(self, command: str) -> None:
+        self.calls[command] += 1
+        if self.down:
+            raise ConnectionError("Error 111 connecting to localhost:6379. Connection refused.")
+
+    def _live(self, name: str) -> Optional[bytes]:
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= self.clock():
+            del self._data[name]
+            return None
+        return value
+
+    def get(self, name: str) -> Optional[bytes]:
+        with self._lock:
+            self._check("get")
+            return self._live(name)
+
+    def set(self, name: str, value, ex: Optional[float] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            self._check("set")
+            if nx and self._live(name) is not None:
+                return None
+            data = value if isinstance(value, bytes) else str(value).encode()
+            self._data[name] = (self.clock() + ex if ex else None, data)
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            self._check("delete")
+            return sum(self._data.pop(name, None) is not None for name in names)
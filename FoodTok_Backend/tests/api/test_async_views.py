@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+pytest.importorskip("aioboto3")
+pytest.importorskip("aiohttp")
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+
+from django.test import RequestFactory  # noqa: E402
+
+from api import async_views, metrics  # noqa: E402
+from api.aws import AsyncClientRegistry, ClientRegistry  # noqa: E402
+from api.dynamo import encode_item  # noqa: E402
+from api.restaurants import AsyncRestaurantEnricher, RestaurantEnricher  # noqa: E402
+
+from .dynamo_stub import DynamoError, DynamoStubServer  # noqa: E402
+from .yelp_stub import YelpStubServer, make_business  # noqa: E402
+
+RESERVATIONS = [
+    {"reservationId": "r1", "userId": "u1", "restaurantId": "thai-palace", "date": "2030-01-03", "time": "19:00",
+     "partySize": 2, "depositAmount": 12.5},
+    {"reservationId": "r2", "userId": "u1", "restaurantId": "thai-palace", "date": "2030-01-02", "time": "18:00",
+     "partySize": 4, "depositAmount": 25},
+]
+FAVORITES = [{"userId": "u1", "restaurantId": f"rest-{i}", "likedAt": f"2030-01-0{i}T00:00:00Z"} for i in range(1, 4)]
+
+
+def handler(operation, request):
+    if operation == "GetItem":
+        key = request["Key"]
+        if key.get("restaurantId") == {"S": "rest-1"}:
+            return {"Item": {"restaurantId": {"S": "rest-1"}}}
+        return {}
+    if operation == "Query" and request["TableName"] == "Reservations":
+        return {"Items": [encode_item(r) for r in RESERVATIONS]}
+    if operation == "Query" and request["TableName"] == "Favorites":
+        if "IndexName" in request:
+            raise DynamoError("ValidationException", "The table does not have the specified index: UserFavoritesByLikedAt")
+        page = FAVORITES[:request["Limit"]]
+        return {"Items": [encode_item(f) for f in page], "LastEvaluatedKey": encode_item(page[-1])}
+    raise DynamoError("UnknownOperationException", operation)
+
+
+@pytest.fixture
+def dynamo(monkeypatch):
+    stub = DynamoStubServer(handler).start()
+    registry = AsyncClientRegistry(ClientRegistry(region="us-east-1", local_endpoints={"dynamodb": stub.endpoint}))
+    monkeypatch.setattr(async_views, "async_registry", registry)
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def yelp(monkeypatch):
+    stub = YelpStubServer({"thai-palace": make_business("thai-palace", "Thai Palace")}).start()
+    enricher = AsyncRestaurantEnricher(RestaurantEnricher(base_url=stub.base_url, api_key="test"))
+    monkeypatch.setattr(async_views, "restaurant_enricher", enricher)
+    yield stub
+    stub.stop()
+
+
+def call(*requests):
+    """Run async views concurrently on one event loop, like one uvicorn worker."""
+    async def run():
+        try:
+            return await asyncio.gather(*(view(request, *args) for view, request, *args in requests))
+        finally:
+            await async_views.async_registry.close()
+            await async_views.restaurant_enricher.close()
+    return asyncio.run(run())
+
+
+def test_user_reservations_are_queried_and_enriched(dynamo, yelp):
+    request = RequestFactory().get("/api/reservations/user/u1", {"filter": "all"})
+
+    with metrics.request_scope() as outbound:
+        response, = call((async_views.get_user_reservations, request, "u1"))
+
+    body = json.loads(response.content)
+    assert response.status_code == 200
+    assert [r["reservationId"] for r in body["reservations"]] == ["r1", "r2"]  # newest first
+    assert body["reservations"][0]["restaurantName"] == "Thai Palace"
+    assert body["reservations"][0]["depositAmount"] == 12.5
+    assert body["nextCursor"] is None
+    operation, query = dynamo.requests[0]
+    assert (operation, query["IndexName"]) == ("Query", "UserReservations")
+    assert yelp.hits == {"thai-palace": 1}
+    assert outbound.calls == {"dynamodb": 1, "http": 1}
+
+
+def test_favorites_fall_back_to_base_table_order_without_the_index(dynamo):
+    request = RequestFactory().get("/api/favorites/u1", {"limit": "2"})
+
+    response, = call((async_views.get_favorites, request, "u1"))
+
+    assert response.status_code == 200
+    assert [f["restaurantId"] for f in json.loads(response.content)] == ["rest-2", "rest-1"]
+    assert response["X-Next-Cursor"]
+    assert ["IndexName" in query for _, query in dynamo.requests] == [True, False]
+
+
+def test_check_favorite_validates_and_rejects_other_methods(dynamo):
+    factory = RequestFactory()
+
+    found, missing, invalid, post = call(
+        (async_views.check_favorite, factory.get("/api/favorites/check", {"userId": "u1", "restaurantId": "rest-1"})),
+        (async_views.check_favorite, factory.get("/api/favorites/check", {"userId": "u1", "restaurantId": "rest-9"})),
+        (async_views.check_favorite, factory.get("/api/favorites/check", {"userId": "u1"})),
+        (async_views.check_favorite, factory.post("/api/favorites/check")),
+    )
+
+    assert json.loads(found.content) == {"isFavorite": True}
+    assert json.loads(missing.content) == {"isFavorite": False}
+    assert invalid.status_code == 400
+    assert (post.status_code, post["Allow"]) == (405, "GET")
+    assert json.loads(post.content) == {"detail": 'Method "POST" not allowed.'}
+
+
+def test_requests_wait_on_dynamodb_concurrently(dynamo):
+    dynamo.delay = 0.2
+    factory = RequestFactory()
+    requests = [
+        (async_views.check_favorite, factory.get("/api/favorites/check", {"userId": "u1", "restaurantId": f"rest-{i}"}))
+        for i in range(20)
+    ]
+
+    started = time.perf_counter()
+    responses = call(*requests)
+    elapsed = time.perf_counter() - started
+
+    assert all(r.status_code == 200 for r in responses)
+    assert elapsed < 20 * 0.2 / 4  # one thread, yet nowhere near serial
+
+
+def test_active_hold_reports_dynamodb_errors_instead_of_no_hold(dynamo):
+    request = RequestFactory().get("/api/reservations/hold/active", {"userId": "u1"})
+
+    response, = call((async_views.get_active_hold, request))
+
+    assert response.status_code == 500
+    assert "hold" not in json.loads(response.content)
+    operation, query = dynamo.requests[0]
+    assert (operation, query["IndexName"]) == ("Query", "UserHolds")
@@ -0,0 +1,88 @@
+import threading
+
+from botocore.awsrequest import AWSResponse
+
+from api.aws import ClientRegistry
+
+
+class _RawBody:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def _registry(**kwargs):
+    kwargs.setdefault("local_endpoints", {"dynamodb": "http://localhost:1"})
+    return ClientRegistry(region="us-east-1", **kwargs)
+
+
+def _respond(client, status, body=b"{}"):
+    def handler(request, **kwargs):
+        return AWSResponse(request.url, status, {}, _RawBody(body))
+    client.meta.events.register("before-send.dynamodb.*", handler)
+
+
+def test_clients_are_shared_across_threads():
+    registry = _registry()
+    seen, barrier = [], threading.Barrier(32)
+
+    def worker():
+        barrier.wait()
+        seen.append((registry.resource("dynamodb"), registry.client("dynamodb")))
+
+    threads = [threading.Thread(target=worker) for _ in range(32)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    resources, clients = zip(*seen)
+    assert len(set(map(id, resources))) == 1
+    assert len(set(map(id, clients))) == 1
+    assert clients[0] is not resources[0].meta.client  # plain client, no boto3 type (de)serialization
+    assert registry.client("dynamodb", "bulk") is not clients[0]
+
+
+def test_client_config_follows_profile():
+    registry = _registry(
+        max_pool_connections=48,
+        retry_mode="adaptive",
+        max_attempts=4,
+        timeout_profiles={"default": (1.0, 3.0), "bulk": (1.0, 20.0)},
+    )
+    default = registry.client("dynamodb").meta.config
+    bulk = registry.client("dynamodb", "bulk").meta.config
+
+    assert default.max_pool_connections == 48
+    assert default.retries == {"mode": "adaptive", "total_max_attempts": 4}
+    assert default.tcp_keepalive is True
+    assert (default.connect_timeout, default.read_timeout) == (1.0, 3.0)
+    assert bulk.read_timeout == 20.0
+    assert registry.client("dynamodb").meta.endpoint_url == "http://localhost:1"
+
+
+def test_clients_are_rebuilt_after_fork():
+    registry = _registry()
+    before = registry.client("dynamodb")
+    registry._pid = -1  # as seen from a forked child
+    assert registry.client("dynamodb") is not before
+
+
+def test_metrics_count_requests_and_errors():
+    registry = _registry(max_pool_connections=8, max_attempts=1)
+    client = registry.client("dynamodb")
+    _respond(client, 200, b'{"Item": {"userId": {"S": "u1"}}}')
+
+    for _ in range(3):
+        client.get_item(TableName="Users", Key={"userId": {"S": "u1"}})
+
+    stats = registry.metrics()["client.dynamodb:default"]
+    assert stats["calls"] == 3
+    assert stats["requests"] == 3
+    assert stats["retries"] == 0
+    assert stats["errors"] == 0
+    assert stats["in_flight"] == 0
+    assert stats["peak_in_flight"] == 1
+    assert stats["peak_utilization"] == 1 / 8
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from api.conversion import convert_floats_to_decimal
+
+
+def recursive_convert(obj):
+    """The recursive version views.py used to carry (legacy/seed_data.py still does)."""
+    if isinstance(obj, list):
+        return [recursive_convert(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {k: recursive_convert(v) for k, v in obj.items()}
+    elif isinstance(obj, float):
+        return Decimal(str(obj))
+    return obj
+
+
+def test_matches_recursive_version():
+    doc = {
+        "cuisines": ["Thai", "Ramen"],
+        "priceRange": [1, 3],
+        "maxDistance": 2.5,
+        "weights": {"cuisine": 0.4, "price": 0.35, "nested": [{"x": 1e-7}, [0.1, "a", None, True]]},
+        "empty": {},
+        "flag": False,
+    }
+    converted = convert_floats_to_decimal(doc)
+    assert converted == recursive_convert(doc)
+    assert converted["weights"]["nested"][1][0] == Decimal("0.1")
+    assert isinstance(converted["weights"]["nested"][0]["x"], Decimal)
+    assert doc["maxDistance"] == 2.5  # input left untouched
+    assert convert_floats_to_decimal(1.5) == Decimal("1.5")
+    assert convert_floats_to_decimal([[[0.25]]]) == [[[Decimal("0.25")]]]
+
+
+def test_copy_on_write():
+    doc = {"a": {"b": [1, 2, "x"]}, "c": {"d": [0.5]}}
+    same = {"a": {"b": [1, 2, "x"]}, "s": "x"}
+    assert convert_floats_to_decimal(same) is same
+
+    converted = convert_floats_to_decimal(doc)
+    assert converted is not doc
+    assert converted["a"] is doc["a"]  # untouched branch is shared
+    assert converted["c"] is not doc["c"] and converted["c"]["d"] == [Decimal("0.5")]
+
+
+def test_deep_nesting_does_not_recurse():
+    doc = leaf = {}
+    for _ in range(5000):
+        leaf["child"] = {}
+        leaf = leaf["child"]
+    leaf["score"] = 0.75
+
+    converted = convert_floats_to_decimal(doc)
+    for _ in range(5000):
+        converted = converted["child"]
+    assert converted == {"score": Decimal("0.75")}
@@ -0,0 +1,89 @@
+import base64
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+
+from django.test import RequestFactory  # noqa: E402
+
+from api import views  # noqa: E402
+from api.aws import ClientRegistry  # noqa: E402
+from api.dynamo import encode_item  # noqa: E402
+
+from .dynamo_stub import DynamoError, DynamoStubServer  # noqa: E402
+
+FAVORITES = [{"userId": "u1", "restaurantId": f"rest-{i}", "likedAt": f"2030-01-0{i}T00:00:00Z"} for i in range(1, 4)]
+
+
+def raw_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+@pytest.mark.parametrize("state", [
+    [1, 2],
+    {"s": None},
+    {"s": "x"},
+    {"s": True},
+    {"s": -1},
+    {"k": "x"},
+    {"k": {}},
+    {"k": {"bogus": "x"}},
+    {"k": {"userId": {"S": "u1"}}},
+    {"k": {"userId": "u2", "restaurantId": "rest-1"}},
+])
+def test_malformed_cursors_are_rejected(state):
+    with pytest.raises(ValueError):
+        views.decode_cursor(raw_cursor(state), views.FAVORITE_CURSOR_KEYS, userId="u1")
+
+
+def test_cursors_round_trip():
+    state = {"s": 1, "k": {"userId": "u1", "restaurantId": "rest-2", "likedAt": "2030-01-02T00:00:00Z"}}
+
+    assert views.decode_cursor(views.encode_cursor(state), views.FAVORITE_CURSOR_KEYS, userId="u1") == state
+    assert views.decode_cursor(None) is None
+    with pytest.raises(ValueError):
+        views.decode_cursor("not base64 json")
+
+
+@pytest.fixture
+def dynamo(monkeypatch):
+    def handler(operation, request):
+        if request["TableName"] == "Reservations":
+            raise DynamoError("ProvisionedThroughputExceededException", "Rate exceeded")
+        if operation == "Query" and "ExclusiveStartKey" in request:
+            return {"Items": [encode_item(f) for f in FAVORITES[2:]]}
+        if operation == "Query":
+            return {"Items": [encode_item(f) for f in FAVORITES[:2]], "LastEvaluatedKey": encode_item(FAVORITES[1])}
+        raise DynamoError("UnknownOperationException", operation)
+
+    stub = DynamoStubServer(handler).start()
+    registry = ClientRegistry(region="us-east-1", local_endpoints={"dynamodb": stub.endpoint}, max_attempts=1)
+    monkeypatch.setattr(views, "dynamodb_client", registry.client("dynamodb"))
+    yield stub
+    stub.stop()
+
+
+def test_favorites_page_with_cursor_and_reject_crafted_ones(dynamo):
+    factory = RequestFactory()
+
+    first = views.get_favorites(factory.get("/api/favorites/u1", {"limit": 2}), "u1")
+    second = views.get_favorites(factory.get("/api/favorites/u1", {"limit": 2, "cursor": first["X-Next-Cursor"]}), "u1")
+    crafted = views.get_favorites(factory.get("/api/favorites/u1", {"cursor": raw_cursor({"s": "x"})}), "u1")
+    foreign = views.get_favorites(factory.get("/api/favorites/u1", {"cursor": first["X-Next-Cursor"]}), "u2")
+
+    assert [f["restaurantId"] for f in json.loads(first.rendered_content)] == ["rest-1", "rest-2"]
+    assert [f["restaurantId"] for f in json.loads(second.rendered_content)] == ["rest-3"]
+    assert dynamo.requests[1][1]["ExclusiveStartKey"] == encode_item(FAVORITES[1])
+    assert crafted.status_code == foreign.status_code == 400
+    assert len(dynamo.requests) == 2
+
+
+def test_reservation_listing_errors_are_not_an_empty_list(dynamo):
+    request = RequestFactory().get("/api/reservations/user/u1", {"filter": "all"})
+
+    response = views.get_user_reservations(request, "u1")
+
+    assert response.status_code == 500
+    assert "reservations" not in json.loads(response.rendered_content)
@@ -0,0 +1,103 @@
+import json
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.conditions import Attr, Key
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from api.dynamo import FastTable, decode_item, encode_item, encode_value
+
+WIRE_ITEM = {
+    "reservationId": {"S": "res_1"},
+    "partySize": {"N": "4"},
+    "depositAmount": {"N": "25.5"},
+    "big": {"N": "12345678901234567890"},
+    "tiny": {"N": "1E-7"},
+    "paid": {"BOOL": True},
+    "note": {"NULL": True},
+    "tags": {"SS": ["quiet", "window"]},
+    "seats": {"NS": ["1", "2.5"]},
+    "restaurant": {"M": {"rating": {"N": "4.5"}, "cuisine": {"L": [{"S": "Thai"}, {"N": "3"}]}}},
+}
+
+
+class _RecordingClient:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def __getattr__(self, operation):
+        def call(**kwargs):
+            self.calls.append((operation, kwargs))
+            return json.loads(json.dumps(self.response))
+        return call
+
+
+def test_decode_gives_json_ready_values():
+    item = decode_item(WIRE_ITEM)
+
+    assert item["partySize"] == 4 and isinstance(item["partySize"], int)
+    assert item["depositAmount"] == 25.5
+    assert item["big"] == 12345678901234567890
+    assert item["tiny"] == 1e-7
+    assert item["note"] is None
+    assert item["tags"] == ["quiet", "window"]
+    assert item["seats"] == [1, 2.5]
+    assert item["restaurant"] == {"rating": 4.5, "cuisine": ["Thai", 3]}
+    json.dumps(item)  # no Decimal / set left over
+
+
+def test_decode_matches_resource_and_decimal_encoder_round_trip():
+    deserializer = TypeDeserializer()
+    # Sets don't survive DecimalEncoder, and "big" loses precision as a float there
+    wire = {k: v for k, v in WIRE_ITEM.items() if k not in ("tags", "seats", "big")}
+
+    expected = json.loads(json.dumps({k: deserializer.deserialize(v) for k, v in wire.items()}, default=float))
+    assert decode_item(wire) == expected
+
+
+def test_encode_matches_type_serializer():
+    serializer = TypeSerializer()
+    item = {
+        "userId": "u1",
+        "score": Decimal("85.5"),
+        "count": 3,
+        "flag": False,
+        "missing": None,
+        "nested": {"list": [1, "a", {"x": Decimal("2")}]},
+        "names": {"a"},
+    }
+    assert encode_item(item) == {k: serializer.serialize(v) for k, v in item.items()}
+    assert encode_value(4.5) == {"N": "4.5"}
+    with pytest.raises(ValueError):
+        encode_value(float("nan"))
+    assert decode_item(encode_item({"f": 0.1, "l": [1.5, 2]})) == {"f": 0.1, "l": [1.5, 2]}
+
+
+def test_fast_table_builds_wire_requests_and_decodes_responses():
+    client = _RecordingClient({
+        "Items": [{"userId": {"S": "u1"}, "matchScore": {"N": "90"}}],
+        "LastEvaluatedKey": {"userId": {"S": "u1"}, "restaurantId": {"S": "r9"}},
+    })
+    table = FastTable(client, "Favorites")
+
+    response = table.query(
+        IndexName="UserFavoritesByLikedAt",
+        KeyConditionExpression=Key("userId").eq("u1"),
+        FilterExpression=Attr("matchScore").gte(Decimal("50")),
+        ExclusiveStartKey={"userId": "u1", "restaurantId": "r1"},
+        ProjectionExpression="#f0, #f1",
+        ExpressionAttributeNames={"#f0": "userId", "#f1": "matchScore"},
+        Limit=10,
+    )
+
+    operation, request = client.calls[0]
+    assert operation == "query"
+    assert request["TableName"] == "Favorites"
+    assert request["KeyConditionExpression"] == "#n0 = :v0"
+    assert request["FilterExpression"] == "#n1 >= :v1"
+    assert request["ExpressionAttributeNames"] == {"#f0": "userId", "#f1": "matchScore", "#n0": "userId", "#n1": "matchScore"}
+    assert request["ExpressionAttributeValues"] == {":v0": {"S": "u1"}, ":v1": {"N": "50"}}
+    assert request["ExclusiveStartKey"] == {"userId": {"S": "u1"}, "restaurantId": {"S": "r1"}}
+    assert response["Items"] == [{"userId": "u1", "matchScore": 90}]
+    assert response["LastEvaluatedKey"] == {"userId": "u1", "restaurantId": "r9"}
@@ -0,0 +1,142 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+import pytest
+from botocore.config import Config
+
+from api.availability import AvailabilityEngine, SlotUnavailable, slot_key
+
+DYNAMO_ENDPOINT = os.getenv("FOODTOK_SMOKE_DYNAMO_ENDPOINT", "http://localhost:8000")
+DYNAMO_REGION = os.getenv("FOODTOK_SMOKE_DYNAMO_REGION", "us-east-1")
+
+SEATS = 10
+ATTEMPTS = 500
+
+
+@pytest.fixture
+def tables():
+    dynamodb = boto3.resource(
+        "dynamodb",
+        region_name=DYNAMO_REGION,
+        endpoint_url=DYNAMO_ENDPOINT,
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+        config=Config(max_pool_connections=64, connect_timeout=3, retries={"max_attempts": 1}),
+    )
+    try:
+        dynamodb.meta.client.list_tables(Limit=1)
+    except Exception as exc:
+        pytest.skip(f"DynamoDB Local not reachable on {DYNAMO_ENDPOINT} ({exc})")
+
+    suffix = uuid.uuid4().hex[:8]
+    slots = dynamodb.create_table(
+        TableName=f"TestSlotAvailability_{suffix}",
+        KeySchema=[
+            {"AttributeName": "slotKey", "KeyType": "HASH"},
+            {"AttributeName": "time", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "slotKey", "AttributeType": "S"},
+            {"AttributeName": "time", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    holds = dynamodb.create_table(
+        TableName=f"TestHolds_{suffix}",
+        KeySchema=[{"AttributeName": "holdId", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "holdId", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    slots.wait_until_exists()
+    holds.wait_until_exists()
+    yield slots, holds
+    slots.delete()
+    holds.delete()
+
+
+def _scan_all(table):
+    items, kwargs = [], {"ConsistentRead": True}
+    while True:
+        response = table.scan(**kwargs)
+        items.extend(response["Items"])
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def test_concurrent_holds_never_overbook_a_slot(tables):
+    slots, holds = tables
+    engine = AvailabilityEngine(slots, default_capacity=SEATS)
+    expires_at = int(time.time()) + 600
+
+    def attempt(i):
+        hold_id = f"hold_{i:04d}"
+        try:
+            engine.reserve(
+                "rest_contended", "2030-01-01", "19:00", 1,
+                hold_id=hold_id, expires_at=expires_at,
+                put={
+                    "TableName": holds.name,
+                    "Item": {"holdId": hold_id, "userId": f"user_{i}", "ttl": expires_at},
+                    "ConditionExpression": "attribute_not_exists(holdId)",
+                },
+            )
+            return True
+        except SlotUnavailable:
+            return False
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        results = list(pool.map(attempt, range(ATTEMPTS)))
+
+    slot = slots.get_item(
+        Key={"slotKey": slot_key("rest_contended", "2030-01-01"), "time": "19:00"},
+        ConsistentRead=True,
+    )["Item"]
+    held = {attr for attr in slot if attr.startswith("hold#")}
+    stored = _scan_all(holds)
+
+    assert sum(results) == SEATS
+    assert slot["remaining"] == 0
+    assert len(held) == SEATS
+    assert {"hold#" + item["holdId"] for item in stored} == held
+
+
+def test_running_out_of_conflict_retries_is_busy_not_an_error(monkeypatch):
+    import json
+
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+    django.setup()
+    from django.test import RequestFactory
+
+    from api import availability, views
+    from api.aws import ClientRegistry
+
+    from .dynamo_stub import DynamoError, DynamoStubServer
+
+    def handler(operation, request):
+        assert operation == "TransactWriteItems"
+        raise DynamoError("TransactionCanceledException", "Transaction cancelled",
+                          CancellationReasons=[{"Code": "TransactionConflict"}, {"Code": "None"}])
+
+    stub = DynamoStubServer(handler).start()
+    try:
+        registry = ClientRegistry(region="us-east-1", local_endpoints={"dynamodb": stub.endpoint}, max_attempts=1)
+        engine = AvailabilityEngine(registry.resource("dynamodb").Table("SlotAvailability"), default_capacity=SEATS)
+        monkeypatch.setattr(availability, "TRANSACTION_ATTEMPTS", 3)
+        monkeypatch.setattr(views, "availability", engine)
+
+        request = RequestFactory().post("/api/reservations/hold", json.dumps(
+            {"userId": "u1", "restaurantId": "rest_1", "date": "2030-01-01", "time": "19:00", "partySize": 2}
+        ), content_type="application/json")
+        response = views.create_hold(request)
+    finally:
+        stub.stop()
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == str(availability.SLOT_BUSY_RETRY_AFTER)
+    assert len(stub.requests) == 3
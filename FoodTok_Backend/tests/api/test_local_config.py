@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+import boto3  # noqa: E402
+
+# local_build/ holds scripts that import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "local_build"))
+
+import local_config  # noqa: E402
+from dynamo_schemas import TABLE_SCHEMAS, TABLE_TTL_ATTRIBUTES  # noqa: E402
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    monkeypatch.setattr(local_config, "WAIT_DELAY", 0)
+    with moto.mock_aws():
+        yield boto3.resource("dynamodb", region_name="us-east-1")
+
+
+def describe(dynamodb, table_name):
+    table = dynamodb.meta.client.describe_table(TableName=table_name)["Table"]
+    ttl = dynamodb.meta.client.describe_time_to_live(TableName=table_name)["TimeToLiveDescription"]
+    gsis = sorted(i["IndexName"] for i in table.get("GlobalSecondaryIndexes", []))
+    return gsis, ttl.get("AttributeName") if ttl["TimeToLiveStatus"] == "ENABLED" else None
+
+
+def without_gsis(table_name):
+    """table_name's schema as it was before its GSIs were added."""
+    schema = {k: v for k, v in TABLE_SCHEMAS[table_name].items() if k != "GlobalSecondaryIndexes"}
+    keys = schema["KeySchema"] + [k for i in schema.get("LocalSecondaryIndexes", []) for k in i["KeySchema"]]
+    names = {k["AttributeName"] for k in keys}
+    schema["AttributeDefinitions"] = [a for a in schema["AttributeDefinitions"] if a["AttributeName"] in names]
+    return schema
+
+
+def test_provision_creates_every_table_with_its_indexes_and_ttl(dynamodb):
+    results = local_config.provision_dynamodb_tables(dynamodb, list(TABLE_SCHEMAS))
+
+    assert {name: result for name, result, _ in results} == {name: "created" for name in TABLE_SCHEMAS}
+    for name, schema in TABLE_SCHEMAS.items():
+        gsis, ttl = describe(dynamodb, name)
+        assert gsis == sorted(i["IndexName"] for i in schema.get("GlobalSecondaryIndexes", []))
+        assert ttl == TABLE_TTL_ATTRIBUTES.get(name)
+
+
+def test_existing_tables_are_left_alone_without_diff(dynamodb):
+    dynamodb.meta.client.create_table(**without_gsis("Holds"))
+
+    results = local_config.provision_dynamodb_tables(dynamodb, ["Holds", "Favorites"], diff=False)
+
+    assert [(name, result) for name, result, _ in results] == [("Holds", "exists"), ("Favorites", "created")]
+    assert describe(dynamodb, "Holds") == ([], None)
+
+
+def test_diff_mode_adds_missing_gsis_and_ttl(dynamodb):
+    for name in ["Holds", "RecommendationScores", "Users", "Favorites"]:
+        dynamodb.meta.client.create_table(**without_gsis(name))
+
+    results = dict((name, result) for name, result, _ in local_config.provision_dynamodb_tables(
+        dynamodb, ["Holds", "RecommendationScores", "Users", "Favorites"], diff=True))
+
+    assert results["RecommendationScores"] == "+GSI RankedUsers"
+    assert results["Favorites"] == "+GSI UserFavoritesByLikedAt"  # in place, no table rebuild
+    assert results["Users"] == ", ".join(f"+GSI {i['IndexName']}" for i in TABLE_SCHEMAS["Users"]["GlobalSecondaryIndexes"])
+    assert describe(dynamodb, "RecommendationScores") == (["RankedUsers"], None)
+    assert describe(dynamodb, "Holds")[1] == "ttl"
+    assert "+TTL" in results["Holds"]
+
+    again = local_config.provision_dynamodb_tables(dynamodb, ["Holds", "RecommendationScores"], diff=True)
+    assert [result for _, result, _ in again] == ["up to date", "up to date"]
+
+
+def test_one_failing_table_does_not_stop_the_others(dynamodb):
+    results = local_config.provision_dynamodb_tables(dynamodb, ["NoSuchSchema", "Favorites"])
+
+    assert [(name, result) for name, result, _ in results] == [("NoSuchSchema", "error"), ("Favorites", "created")]
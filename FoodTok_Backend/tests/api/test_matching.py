@@ -0,0 +1,79 @@
+import json
+import random
+from decimal import Decimal
+
+from api.matching import MatchScorer, calculate_match_score
+
+CUISINES = ["Italian", "Thai", "Japanese", "Mexican", "Indian", "French", "Korean"]
+DIETARY = ["vegetarian", "vegan", "gluten-free", "halal", "kosher"]
+
+
+def _random_restaurant(rng, i):
+    return {
+        "id": f"rest_{i}",
+        "cuisine": rng.choice([
+            rng.sample(CUISINES, rng.randint(0, 3)),
+            rng.choice(CUISINES),
+        ]),
+        "priceRange": rng.choice(["$", "$$", "$$$", "$$$$", 1, 2, 3, 4, Decimal("2"), Decimal("3")]),
+        "dietaryOptions": rng.sample(DIETARY, rng.randint(0, 3)),
+        "rating": rng.choice([Decimal(str(rng.randint(0, 50) / 10)), rng.randint(0, 5), "4.5", 4.75]),
+    }
+
+
+def _random_preferences(rng):
+    return (
+        rng.sample(CUISINES + ["Ethiopian"], rng.randint(0, 3)),
+        rng.sample([1, 2, 3, 4, Decimal("2")], rng.randint(0, 3)),
+        rng.sample(DIETARY + ["paleo"], rng.randint(0, 2)),
+    )
+
+
+def _dump(results):
+    return json.dumps(results, ensure_ascii=False).encode("utf-8")
+
+
+def test_batch_scores_are_identical_to_scalar():
+    rng = random.Random(1234)
+    restaurants = [_random_restaurant(rng, i) for i in range(500)]
+    scorer = MatchScorer(restaurants)
+
+    for _ in range(50):
+        prefs = _random_preferences(rng)
+        expected = [calculate_match_score(r, *prefs) for r in restaurants]
+        assert _dump(scorer.score_all(*prefs)) == _dump(expected)
+        assert scorer.scores(*prefs).tolist() == [e["score"] for e in expected]
+
+
+def test_irregular_rows_and_preferences_fall_back_to_scalar():
+    restaurants = [
+        {"cuisine": {"Thai"}, "priceRange": 2, "rating": 4},
+        {"cuisine": ["Thai"], "priceRange": 2.5, "rating": 3},
+        {"cuisine": ["Thai"], "priceRange": Decimal("1.5"), "dietaryOptions": "vegan", "rating": "5"},
+        {"cuisine": "Thai", "priceRange": "$$", "dietaryOptions": ["vegan"], "rating": 5},
+    ]
+    scorer = MatchScorer(restaurants)
+
+    for prefs in [([], [2], []), ([], (1, 3), ["vegan"]), ({"Thai"}, [2], ["vegan"])]:
+        expected = [calculate_match_score(r, *prefs) for r in restaurants]
+        assert _dump(scorer.score_all(*prefs)) == _dump(expected)
+
+
+def test_top_k_matches_stable_sort_of_scalar_scores():
+    rng = random.Random(99)
+    restaurants = [_random_restaurant(rng, i) for i in range(300)]
+    scorer = MatchScorer(restaurants)
+    prefs = (["Thai", "Italian"], [2, 3], ["vegan"])
+
+    scored = [(r, calculate_match_score(r, *prefs)) for r in restaurants]
+    expected = sorted(scored, key=lambda pair: pair[1]["score"], reverse=True)[:25]
+
+    top = scorer.top_k(25, *prefs)
+    assert [r["id"] for r, _ in top] == [r["id"] for r, _ in expected]
+    assert [result for _, result in top] == [result for _, result in expected]
+
+
+def test_empty_catalog():
+    scorer = MatchScorer([])
+    assert scorer.top_k(10, ["Thai"], [2], []) == []
+    assert scorer.scores(["Thai"], [2], []).tolist() == []
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+
+from botocore.awsrequest import AWSResponse  # noqa: E402
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from asgiref.sync import iscoroutinefunction  # noqa: E402
+
+from api import metrics  # noqa: E402
+from api.aws import ClientRegistry  # noqa: E402
+
+from .test_aws import _RawBody  # noqa: E402
+
+
+def _client(body):
+    client = ClientRegistry(region="us-east-1", local_endpoints={"dynamodb": "http://localhost:1"}).client("dynamodb")
+    sent = []
+
+    def handler(request, **kwargs):
+        sent.append(json.loads(request.body))
+        return AWSResponse(request.url, 200, {"content-length": str(len(body))}, _RawBody(body))
+    client.meta.events.register("before-send.dynamodb.*", handler)
+    return client, sent
+
+
+def test_dynamodb_calls_and_capacity_are_recorded_per_request():
+    body = json.dumps({"Item": {}, "ConsumedCapacity": {"TableName": "Users", "CapacityUnits": 0.5}}).encode()
+    client, sent = _client(body)
+
+    with metrics.request_scope() as outbound:
+        for _ in range(3):
+            client.get_item(TableName="Users", Key={"userId": {"S": "u1"}})
+    client.get_item(TableName="Users", Key={"userId": {"S": "u1"}})  # outside a request
+
+    assert outbound.calls == {"dynamodb": 3}
+    assert outbound.capacity == {"Users": 1.5}
+    assert outbound.bytes_received["dynamodb"] == 3 * len(body)
+    assert outbound.bytes_sent["dynamodb"] > 0
+    assert [req.get("ReturnConsumedCapacity") for req in sent] == ["TOTAL", "TOTAL", "TOTAL", None]
+
+
+def test_bind_carries_the_request_into_other_threads():
+    def call():
+        metrics.current().record_call("http", 0.01)
+
+    with metrics.request_scope() as outbound, ThreadPoolExecutor(2) as pool:
+        bound = metrics.bind(call)  # in the request's thread, like RestaurantEnricher.get_many
+        list(pool.map(lambda _: bound(), range(4)))
+        unbound = pool.submit(metrics.current).result()
+
+    assert outbound.calls == {"http": 4}
+    assert unbound is None
+
+
+def test_middleware_records_route_and_sets_server_timing():
+    registry = metrics.MetricsRegistry()
+    metrics.registry, saved = registry, metrics.registry
+
+    def view(request):
+        request.resolver_match = SimpleNamespace(route="api/favorites/<str:user_id>")
+        for _ in range(2):
+            metrics.current().record_call("dynamodb", 0.004)
+        return HttpResponse("[]")
+
+    try:
+        response = metrics.MetricsMiddleware(view)(RequestFactory().get("/api/favorites/u1"))
+    finally:
+        metrics.registry = saved
+
+    assert response["Server-Timing"].startswith("app;dur=")
+    assert 'dynamodb;desc="2 calls";dur=8.0' in response["Server-Timing"]
+    text = registry.render()
+    route = 'route="/api/favorites/<str:user_id>"'
+    assert f'foodtok_http_requests_total{{{route},method="GET",status="200"}} 1' in text
+    assert f'foodtok_outbound_calls_per_request_bucket{{{route},service="dynamodb",le="1"}} 0' in text
+    assert f'foodtok_outbound_calls_per_request_bucket{{{route},service="dynamodb",le="2"}} 1' in text
+    assert f'foodtok_outbound_calls_per_request_bucket{{{route},service="s3",le="0"}} 1' in text
+    assert f'foodtok_outbound_calls_total{{{route},service="dynamodb"}} 2' in text
+
+
+def test_middleware_runs_async_around_async_views():
+    registry = metrics.MetricsRegistry()
+    metrics.registry, saved = registry, metrics.registry
+
+    async def view(request):
+        request.resolver_match = SimpleNamespace(route="api/favorites/check")
+        await asyncio.sleep(0)
+        metrics.current().record_call("dynamodb", 0.002)
+        return HttpResponse("{}")
+
+    middleware = metrics.MetricsMiddleware(view)
+    try:
+        response = asyncio.run(middleware(RequestFactory().get("/api/favorites/check")))
+    finally:
+        metrics.registry = saved
+
+    assert iscoroutinefunction(middleware)
+    assert 'dynamodb;desc="1 calls"' in response["Server-Timing"]
+    assert 'foodtok_outbound_calls_total{route="/api/favorites/check",service="dynamodb"} 1' in registry.render()
+
+
+def test_unknown_methods_are_recorded_as_other():
+    registry = metrics.MetricsRegistry()
+    metrics.registry, saved = registry, metrics.registry
+    try:
+        middleware = metrics.MetricsMiddleware(lambda request: HttpResponse(status=405))
+        for method in ["FOO", "BAR", "PATCH"]:
+            middleware(RequestFactory().generic(method, "/api/helloECS"))
+    finally:
+        metrics.registry = saved
+
+    text = registry.render()
+    assert 'foodtok_http_requests_total{route="unmatched",method="other",status="405"} 2' in text
+    assert 'method="PATCH",status="405"} 1' in text
+    assert "FOO" not in text and "BAR" not in text
+
+
+def test_metrics_endpoint_only_serves_allowed_scrapers():
+    from api.views import prometheus_metrics
+
+    factory = RequestFactory()
+    allowed = [
+        factory.get("/metrics", REMOTE_ADDR="127.0.0.1"),
+        factory.get("/metrics", REMOTE_ADDR="10.0.3.7"),
+        factory.get("/metrics", REMOTE_ADDR="::ffff:172.18.0.1"),
+    ]
+    refused = [
+        factory.get("/metrics", REMOTE_ADDR="203.0.113.9"),
+        factory.get("/metrics", REMOTE_ADDR="10.0.3.7", HTTP_X_FORWARDED_FOR="203.0.113.9"),  # via the ALB
+        factory.get("/metrics", REMOTE_ADDR="not an address"),
+    ]
+
+    for request in allowed:
+        response = prometheus_metrics(request)
+        assert response.status_code == 200
+        assert b"foodtok_http_requests_total" in response.content
+    for request in refused:
+        assert prometheus_metrics(request).status_code == 403
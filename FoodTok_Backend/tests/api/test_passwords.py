@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+django.setup()  # DRF's POST handling loads the auth models
+
+from django.test import RequestFactory  # noqa: E402
+
+from api import passwords  # noqa: E402
+from api.dynamo import encode_item  # noqa: E402
+
+from .dynamo_stub import DynamoStubServer  # noqa: E402
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A private pool with cheap hashes, shut down after the test."""
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(passwords, "_executor", None)
+    monkeypatch.setattr(passwords, "_slots", threading.BoundedSemaphore(2))
+    yield passwords
+    if passwords._executor is not None:
+        passwords._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def test_hash_and_check_round_trip(pool):
+    hashed = pool.hash_password("secret")
+
+    assert hashed.startswith("$2b$04$")
+    assert pool.check_password("secret", hashed)
+    assert not pool.check_password("wrong", hashed)
+
+
+def test_full_queue_is_rejected_without_waiting(pool):
+    pool._slots.acquire()
+    pool._slots.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(passwords.PasswordHasherBusy) as busy:
+        pool.hash_password("secret")
+
+    assert time.monotonic() - started < 0.5
+    assert busy.value.retry_after == passwords.PASSWORD_HASH_RETRY_AFTER
+
+
+def test_timeout_is_busy_and_keeps_the_slot_until_the_job_ends(pool, monkeypatch):
+    pool.hash_password("warm up the worker")
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_TIMEOUT", 0.05)
+
+    with pytest.raises(passwords.PasswordHasherBusy):
+        pool._submit(time.sleep, 1)
+
+    # The sleeping job still occupies a worker, so it still holds its slot
+    assert pool._slots.acquire(blocking=False)
+    assert not pool._slots.acquire(blocking=False)
+    pool._slots.release()
+    time.sleep(1.2)
+    assert pool._slots.acquire(blocking=False)
+    pool._slots.release()
+
+
+def test_crashed_worker_is_replaced(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool._submit(os._exit, 1)  # crashes the first pool and its replacement
+
+    hashed = pool.hash_password("secret")  # on a third, healthy pool
+    assert pool.check_password("secret", hashed)
+    assert pool._slots.acquire(blocking=False) and pool._slots.acquire(blocking=False)
+
+
+def test_broken_pool_is_retried_once(pool):
+    broken = pool._get_executor()
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    assert pool.hash_password("secret").startswith("$2b$04$")
+    assert pool._executor is not broken
+
+
+def test_login_answers_503_with_retry_after_when_saturated(pool, monkeypatch):
+    from api import views
+    from api.aws import ClientRegistry
+
+    user = encode_item({"userId": "u1", "email": "u1@example.com", "password": "$2b$04$" + "x" * 53})
+    stub = DynamoStubServer(lambda operation, request: {"Items": [user]}).start()
+    try:
+        registry = ClientRegistry(region="us-east-1", local_endpoints={"dynamodb": stub.endpoint})
+        monkeypatch.setattr(views, "dynamodb", registry.resource("dynamodb"))
+        pool._slots.acquire()
+        pool._slots.acquire()
+
+        request = RequestFactory().post("/api/auth/login", json.dumps({"email": "u1@example.com", "password": "pw"}),
+                                        content_type="application/json")
+        response = views.login(request)
+    finally:
+        stub.stop()
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == str(passwords.PASSWORD_HASH_RETRY_AFTER)
+    assert json.loads(response.rendered_content) == {"error": "Password service busy, retry later"}
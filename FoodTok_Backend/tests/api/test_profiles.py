@@ -0,0 +1,162 @@
+import asyncio
+import json
+import os
+from decimal import Decimal
+
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+
+from django.test import RequestFactory  # noqa: E402
+
+from api import metrics  # noqa: E402
+from api.dynamo import decode_item, encode_item  # noqa: E402
+from api.profiles import MemoryBackend, ProfileCache, RedisBackend  # noqa: E402
+
+from .dynamo_stub import DynamoStubServer  # noqa: E402
+from .fake_redis import FakeRedis  # noqa: E402
+
+USER = {
+    "userId": "u1",
+    "email": "u1@example.com",
+    "password": "$2b$12$hash",
+    "firstName": "Ada",
+    "preferences": {"cuisines": ["thai"], "maxDistance": Decimal("10"), "budget": Decimal("25.5")},
+}
+PROFILE = {
+    "id": "u1",
+    "email": "u1@example.com",
+    "firstName": "Ada",
+    "preferences": {"cuisines": ["thai"], "maxDistance": 10, "budget": 25.5},
+}
+
+
+@pytest.fixture
+def cache_metrics():
+    registry = metrics.MetricsRegistry()
+    metrics.registry, saved = registry, metrics.registry
+    yield registry.cache.values
+    metrics.registry = saved
+
+
+@pytest.fixture
+def now():
+    return [1000.0]
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, now):
+    if request.param == "memory":
+        return ProfileCache(MemoryBackend(max_entries=100, ttl=30, clock=lambda: now[0]))
+    return ProfileCache(RedisBackend(FakeRedis(clock=lambda: now[0]), ttl=30))
+
+
+def test_reads_through_and_never_caches_the_password(cache, cache_metrics):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return dict(USER)
+
+    first = cache.get_or_load("u1", load)
+    second = cache.get_or_load("u1", load)
+
+    assert first == second == PROFILE
+    assert len(loads) == 1
+    assert cache_metrics == {("profile", "miss"): 1, ("profile", "hit"): 1}
+    assert cache.get_or_load("nobody", lambda: None) is None
+    assert cache.get("nobody") is None  # missing users aren't cached
+
+
+def test_writes_repopulate_and_stale_fills_lose(cache):
+    cache.get_or_load("u1", lambda: dict(USER))
+    updated = dict(USER, firstName="Grace")
+
+    assert cache.put("u1", updated)["firstName"] == "Grace"
+    # A read that loaded the item before the write finishes after it
+    assert cache.get_or_load("u1", lambda: dict(USER))["firstName"] == "Grace"
+    cache.backend.add("u1", b"{}")
+    assert cache.get("u1")["firstName"] == "Grace"
+
+
+def test_entries_expire_after_the_ttl(cache, now):
+    cache.get_or_load("u1", lambda: dict(USER))
+    now[0] += 31
+
+    assert cache.get("u1") is None
+
+
+def test_unreachable_redis_falls_back_to_dynamodb(cache_metrics):
+    redis = FakeRedis()
+    cache = ProfileCache(RedisBackend(redis))
+    redis.down = True
+
+    assert cache.get_or_load("u1", lambda: dict(USER)) == PROFILE
+    assert cache.put("u1", dict(USER)) == PROFILE
+    assert cache_metrics == {("profile", "error"): 3}
+
+
+@pytest.mark.parametrize("backend", [MemoryBackend, lambda: RedisBackend(FakeRedis())])
+def test_async_reads_share_the_cache(backend):
+    cache = ProfileCache(backend())
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return dict(USER)
+
+    async def run():
+        return [await cache.aget_or_load("u1", load) for _ in range(3)]
+
+    assert asyncio.run(run()) == [PROFILE] * 3
+    assert len(loads) == 1
+    assert cache.get("u1") == PROFILE
+
+
+def test_off_always_loads():
+    cache = ProfileCache.from_env("off")
+    loads = []
+
+    for _ in range(2):
+        cache.get_or_load("u1", lambda: loads.append(1) or dict(USER))
+
+    assert len(loads) == 2
+    with pytest.raises(ValueError):
+        ProfileCache.from_env("memcached://localhost")
+
+
+def test_update_preferences_refreshes_the_cached_profile(monkeypatch):
+    from api import views
+    from api.aws import ClientRegistry
+
+    item = encode_item(USER)
+
+    def handler(operation, request):
+        if operation == "GetItem":
+            return {"Item": item}
+        if operation == "UpdateItem":
+            item["firstName"] = request["ExpressionAttributeValues"][":firstName"]
+            return {"Attributes": item}
+        raise AssertionError(operation)
+
+    stub = DynamoStubServer(handler).start()
+    try:
+        registry = ClientRegistry(region="us-east-1", local_endpoints={"dynamodb": stub.endpoint})
+        monkeypatch.setattr(views, "dynamodb", registry.resource("dynamodb"))
+        monkeypatch.setattr(views, "profile_cache", ProfileCache(MemoryBackend()))
+        factory = RequestFactory()
+
+        views.get_profile(factory.get("/api/auth/profile/u1"), "u1")
+        patch = factory.patch("/api/auth/preferences", json.dumps({"userId": "u1", "firstName": "Grace"}),
+                              content_type="application/json")
+        updated = views.update_preferences(patch)
+        profile = views.get_profile(factory.get("/api/auth/profile/u1"), "u1")
+    finally:
+        stub.stop()
+
+    assert updated.status_code == profile.status_code == 200
+    assert json.loads(profile.rendered_content)["user"]["firstName"] == "Grace"
+    assert "password" not in json.loads(profile.rendered_content)["user"]
+    assert [operation for operation, _ in stub.requests] == ["GetItem", "UpdateItem"]
+    assert stub.requests[1][1]["ReturnValues"] == "ALL_NEW"
+    assert decode_item(item)["firstName"] == "Grace"
@@ -0,0 +1,202 @@
+import pytest
+
+moto = pytest.importorskip("moto")
+
+import boto3  # noqa: E402
+
+from api import recommendations  # noqa: E402
+from api.recommendations import META_KEY, Recommender  # noqa: E402
+
+DEPTH = 3
+THAI = [["Thai"], [2], []]
+
+
+def restaurant(i, cuisine="Thai", rating=4):
+    return {"id": f"rest_{i}", "name": f"Place {i}", "cuisine": cuisine, "priceRange": 2, "rating": rating}
+
+
+class NoScans:
+    """A Table that fails the test if anything scans it."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def scan(self, **kwargs):
+        raise AssertionError("scanned the scores table")
+
+    def __getattr__(self, name):
+        return getattr(self.table, name)
+
+
+@pytest.fixture
+def dynamodb():
+    with moto.mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        dynamodb.create_table(
+            TableName="RecommendationScores",
+            KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"}, {"AttributeName": "restaurantId", "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": name, "AttributeType": "S"}
+                                  for name in ["userId", "restaurantId", "rankKey", "rankedShard"]],
+            BillingMode="PAY_PER_REQUEST",
+            LocalSecondaryIndexes=[{
+                "IndexName": "UserRanking",
+                "KeySchema": [{"AttributeName": "userId", "KeyType": "HASH"}, {"AttributeName": "rankKey", "KeyType": "RANGE"}],
+                "Projection": {"ProjectionType": "ALL"},
+            }],
+            GlobalSecondaryIndexes=[{
+                "IndexName": "RankedUsers",
+                "KeySchema": [{"AttributeName": "rankedShard", "KeyType": "HASH"},
+                              {"AttributeName": "userId", "KeyType": "RANGE"}],
+                "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["preferences"]},
+            }],
+        )
+        for name, key in [("Restaurants", "id"), ("Users", "userId")]:
+            dynamodb.create_table(
+                TableName=name,
+                KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+        yield dynamodb
+
+
+@pytest.fixture
+def catalog(dynamodb):
+    """Three Thai places that make the cut and two Mexican ones waiting below it."""
+    rows = [restaurant(1, rating=5), restaurant(2), restaurant(3), restaurant(4, "Mexican", 5), restaurant(5, "Mexican")]
+    with dynamodb.Table("Restaurants").batch_writer() as batch:
+        for row in rows:
+            batch.put_item(Item=row)
+    return rows
+
+
+@pytest.fixture
+def recommender(dynamodb, catalog):
+    return Recommender(NoScans(dynamodb.Table("RecommendationScores")), dynamodb.Table("Restaurants"),
+                       dynamodb.Table("Users"), depth=DEPTH)
+
+
+def ranking(recommender, user_id="u1"):
+    rows, _ = recommender.feed(user_id, limit=100)
+    return [row["restaurantId"] for row in rows]
+
+
+def test_refresh_user_builds_a_ranking_once_per_preferences(recommender):
+    assert recommender.refresh_user("u1", {"cuisineTypes": ["Thai"], "priceRange": "$$"})
+    assert not recommender.refresh_user("u1", {"cuisines": ["Thai"], "priceRange": ["$$"]})
+
+    assert ranking(recommender) == ["rest_1", "rest_2", "rest_3"]
+    assert recommender.meta("u1")["preferences"] == THAI
+
+
+def test_ranked_users_come_from_the_index(recommender, monkeypatch):
+    monkeypatch.setattr(recommendations, "RANKED_USER_SHARDS", 2)
+    for user_id in ["u1", "u2", "u3", "u4"]:
+        recommender.refresh_user(user_id, {"cuisineTypes": ["Thai"], "priceRange": "$$"})
+
+    users = list(recommender.ranked_users())
+
+    assert sorted(user["userId"] for user in users) == ["u1", "u2", "u3", "u4"]
+    assert all(user["preferences"] == THAI for user in users)
+    assert all(user_id != META_KEY for user_id in ranking(recommender))
+
+
+def test_restaurant_dropping_below_the_cutoff_is_backfilled(recommender, dynamodb):
+    recommender.refresh_user("u1", {"cuisineTypes": ["Thai"], "priceRange": "$$"})
+    moved = restaurant(2, "Mexican", 1)
+    dynamodb.Table("Restaurants").put_item(Item=moved)
+
+    assert recommender.refresh_restaurants([moved]) == 1
+
+    assert ranking(recommender) == ["rest_1", "rest_3", "rest_4"]
+
+
+def test_removed_restaurant_is_backfilled_without_coming_back(recommender, dynamodb):
+    recommender.refresh_user("u1", {"cuisineTypes": ["Thai"], "priceRange": "$$"})
+
+    # Still in the table: the backfill must not pick the removed id back up
+    assert recommender.refresh_restaurants([], removed_ids=["rest_1"]) == 1
+
+    assert ranking(recommender) == ["rest_2", "rest_3", "rest_4"]
+
+
+def test_better_restaurant_pushes_the_last_one_out(recommender, dynamodb):
+    recommender.refresh_user("u1", {"cuisineTypes": ["Thai"], "priceRange": "$$"})
+    added = restaurant(6, rating=5)
+    dynamodb.Table("Restaurants").put_item(Item=added)
+
+    recommender.refresh_restaurants([added])
+
+    assert ranking(recommender) == ["rest_1", "rest_6", "rest_2"]
+
+
+def test_refresh_user_later_rebuilds_off_the_calling_thread(recommender):
+    recommender.refresh_user("u1", {"cuisineTypes": ["Mexican"], "priceRange": "$$"})
+
+    future = recommender.refresh_user_later("u1", {"cuisineTypes": ["Thai"], "priceRange": "$$"}, only_if_ranked=True)
+    skipped = recommender.refresh_user_later("u2", {"cuisineTypes": ["Thai"]}, only_if_ranked=True)
+
+    assert future.result(timeout=10) is True
+    assert skipped.result(timeout=10) is False
+    assert ranking(recommender) == ["rest_1", "rest_2", "rest_3"]
+    assert ranking(recommender, "u2") == []
+
+
+def test_failed_background_refresh_is_logged_not_raised(recommender, monkeypatch, capsys):
+    def broken(*args, **kwargs):
+        raise RuntimeError("throttled")
+
+    monkeypatch.setattr(recommender, "refresh_user", broken)
+
+    assert recommender.refresh_user_later("u1", {}).result(timeout=10) is False
+    assert "Recommendation refresh failed for u1: throttled" in capsys.readouterr().out
+
+
+def test_preview_scores_only_from_a_loaded_catalog(recommender, monkeypatch):
+    prefs = {"cuisineTypes": ["Thai"], "priceRange": "$$"}
+    restaurants_table = recommender.restaurants_table
+    monkeypatch.setattr(recommender, "restaurants_table", NoScans(restaurants_table))
+
+    assert recommender.preview("u1", prefs, limit=2) == []
+
+    monkeypatch.setattr(recommender, "restaurants_table", restaurants_table)
+    recommender.scorer()
+    rows = recommender.preview("u1", prefs, limit=2)
+
+    assert [row["restaurantId"] for row in rows] == ["rest_1", "rest_2"]
+    assert ranking(recommender) == []  # nothing stored
+
+
+def test_first_feed_request_builds_the_ranking_in_the_background(recommender, dynamodb, monkeypatch):
+    import json
+    import os
+
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+    django.setup()
+    from django.test import RequestFactory
+
+    from api import views
+
+    dynamodb.Table("Users").put_item(Item={"userId": "u1", "preferences": {"cuisineTypes": ["Thai"], "priceRange": "$$"}})
+    monkeypatch.setattr(views, "dynamodb", dynamodb)
+    monkeypatch.setattr(views, "recommender", recommender)
+    queued = []
+    refresh_user_later = recommender.refresh_user_later
+    monkeypatch.setattr(recommender, "refresh_user", lambda *a, **kw: pytest.fail("ranking built on the request"))
+    monkeypatch.setattr(recommender, "refresh_user_later", lambda *a, **kw: queued.append(a))
+
+    first = json.loads(views.discover(RequestFactory().get("/api/discover/u1"), "u1").rendered_content)
+
+    assert first == {"restaurants": [], "count": 0, "nextCursor": None, "rankingPending": True}  # catalog still cold
+    assert queued == [("u1", {"cuisineTypes": ["Thai"], "priceRange": "$$"})]
+
+    monkeypatch.undo()
+    monkeypatch.setattr(views, "recommender", recommender)
+    monkeypatch.setattr(views, "dynamodb", dynamodb)
+    refresh_user_later(*queued[0]).result(timeout=10)
+    built = json.loads(views.discover(RequestFactory().get("/api/discover/u1", {"limit": 2}), "u1").rendered_content)
+
+    assert [r["id"] for r in built["restaurants"]] == ["rest_1", "rest_2"]
+    assert built["rankingPending"] is False and built["nextCursor"]
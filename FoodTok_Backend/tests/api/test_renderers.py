@@ -0,0 +1,61 @@
+import base64
+import datetime
+import json
+import os
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import Binary
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+
+from api.renderers import FoodTokJSONRenderer, dumps  # noqa: E402
+
+RESERVATION = {
+    "reservationId": "res_1",
+    "partySize": Decimal("4"),
+    "depositAmount": Decimal("25.50"),
+    "refund": {"percentage": Decimal("100"), "amount": Decimal("12.5")},
+    "tags": {"window"},
+    "createdAt": datetime.datetime(2030, 1, 2, 19, 0, tzinfo=datetime.timezone.utc),
+    "date": datetime.date(2030, 1, 2),
+    "history": [Decimal("1.5"), None, True, "x"],
+    "name": "Café",
+}
+
+EXPECTED = {
+    "reservationId": "res_1",
+    "partySize": 4,
+    "depositAmount": 25.5,
+    "refund": {"percentage": 100, "amount": 12.5},
+    "tags": ["window"],
+    "createdAt": "2030-01-02T19:00:00Z",
+    "date": "2030-01-02",
+    "history": [1.5, None, True, "x"],
+    "name": "Café",
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dynamodb_types_serialize_in_one_pass(use_orjson):
+    body = dumps(RESERVATION, use_orjson=use_orjson)
+    assert json.loads(body) == EXPECTED
+    assert isinstance(json.loads(body)["partySize"], int)
+    assert "Café".encode("utf-8") in body
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_binary_attributes_are_base64(use_orjson):
+    blob = bytes(range(256))  # not UTF-8
+    body = json.loads(dumps({"b": blob, "resource": Binary(b"\xff\x00"), "set": [b"\x80"]}, use_orjson=use_orjson))
+    assert base64.b64decode(body["b"]) == blob
+    assert body["resource"] == "/wA="
+    assert body["set"] == ["gA=="]
+
+
+def test_renderer_output():
+    renderer = FoodTokJSONRenderer()
+    assert renderer.render(None) == b""
+    assert json.loads(renderer.render([RESERVATION])) == [EXPECTED]
+    with pytest.raises(TypeError):
+        renderer.render({"bad": object()})
@@ -0,0 +1,225 @@
+import json
+import os
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+import boto3  # noqa: E402
+import django  # noqa: E402
+from botocore.exceptions import ClientError  # noqa: E402
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ecs_project.settings")
+django.setup()  # DRF's request handling loads the auth models
+
+from django.test import RequestFactory  # noqa: E402
+
+from api import availability, views  # noqa: E402
+from api.availability import AvailabilityEngine, slot_key  # noqa: E402
+
+SEATS = 4
+RESERVATION = {
+    "reservationId": "res_1",
+    "userId": "u1",
+    "restaurantId": "rest_1",
+    "date": "2099-01-01",
+    "time": "19:00",
+    "partySize": 2,
+    "status": "confirmed",
+    "depositAmount": 50,
+}
+
+
+class StaleReads:
+    """Wraps a Table so get_item keeps returning what it first read, like a request that read before another wrote."""
+
+    def __init__(self, table):
+        self.table = table
+        self.seen = {}
+
+    def get_item(self, **kwargs):
+        key = json.dumps(kwargs["Key"], sort_keys=True)
+        if key not in self.seen:
+            self.seen[key] = self.table.get_item(**kwargs)
+        return self.seen[key]
+
+    def __getattr__(self, name):
+        return getattr(self.table, name)
+
+
+class Resource:
+    def __init__(self, dynamodb, stale=()):
+        self.dynamodb = dynamodb
+        self.stale = {name: StaleReads(dynamodb.Table(name)) for name in stale}
+
+    def Table(self, name):  # noqa: N802 - boto3 naming
+        return self.stale.get(name) or self.dynamodb.Table(name)
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    with moto.mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        dynamodb.create_table(
+            TableName="Reservations",
+            KeySchema=[{"AttributeName": "reservationId", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "reservationId", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        slots = dynamodb.create_table(
+            TableName="SlotAvailability",
+            KeySchema=[{"AttributeName": "slotKey", "KeyType": "HASH"}, {"AttributeName": "time", "KeyType": "RANGE"}],
+            AttributeDefinitions=[{"AttributeName": "slotKey", "AttributeType": "S"},
+                                  {"AttributeName": "time", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        for name, key in [("Holds", "holdId"), ("ConfirmationCodes", "code")]:
+            dynamodb.create_table(
+                TableName=name,
+                KeySchema=[{"AttributeName": key, "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": key, "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+        engine = AvailabilityEngine(slots, default_capacity=SEATS)
+        engine.reserve("rest_1", "2099-01-01", "19:00", 2)
+        dynamodb.Table("Reservations").put_item(Item=RESERVATION)
+        monkeypatch.setattr(views, "availability", engine)
+        monkeypatch.setattr(views, "dynamodb", Resource(dynamodb))
+        yield dynamodb
+
+
+def slot(dynamodb, slot_time):
+    item = dynamodb.Table("SlotAvailability").get_item(
+        Key={"slotKey": slot_key("rest_1", "2099-01-01"), "time": slot_time}, ConsistentRead=True
+    ).get("Item")
+    return (int(item["remaining"]), int(item["booked"])) if item else None
+
+
+def cancel():
+    request = RequestFactory().delete("/api/reservations/res_1/cancel", json.dumps({"userId": "u1"}),
+                                      content_type="application/json")
+    return views.cancel_reservation(request, "res_1")
+
+
+def modify(**changes):
+    request = RequestFactory().patch("/api/reservations/res_1/modify", json.dumps({"userId": "u1", **changes}),
+                                     content_type="application/json")
+    return views.modify_reservation(request, "res_1")
+
+
+def test_racing_cancels_release_the_seats_once(dynamodb, monkeypatch):
+    monkeypatch.setattr(views, "dynamodb", Resource(dynamodb, stale=["Reservations"]))
+
+    first, second = cancel(), cancel()  # both read the reservation while it was confirmed
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert json.loads(second.rendered_content) == {"error": "Reservation already cancelled"}
+    assert slot(dynamodb, "19:00") == (SEATS, 0)
+
+
+def failing_transactions(monkeypatch, code, **response):
+    client = views.availability.slots_table.meta.client
+    calls = []
+
+    def transact_write_items(**kwargs):
+        calls.append(kwargs["TransactItems"])
+        raise ClientError({"Error": {"Code": code, "Message": code}, **response}, "TransactWriteItems")
+
+    monkeypatch.setattr(client, "transact_write_items", transact_write_items)
+    return calls
+
+
+def test_cancel_and_seat_release_fail_together(dynamodb, monkeypatch):
+    calls = failing_transactions(monkeypatch, "ThrottlingException")
+
+    response = cancel()
+
+    assert response.status_code == 500
+    assert [len(items) for items in calls] == [2]  # status update and seats in one request
+    assert dynamodb.Table("Reservations").get_item(Key={"reservationId": "res_1"})["Item"]["status"] == "confirmed"
+    assert slot(dynamodb, "19:00") == (SEATS - 2, 2)
+
+
+def test_cancel_that_keeps_conflicting_is_busy(dynamodb, monkeypatch):
+    monkeypatch.setattr(availability, "TRANSACTION_ATTEMPTS", 2)
+    calls = failing_transactions(monkeypatch, "TransactionCanceledException",
+                                 CancellationReasons=[{"Code": "TransactionConflict"}, {"Code": "None"}])
+
+    response = cancel()
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == str(availability.SLOT_BUSY_RETRY_AFTER)
+    assert len(calls) == 2
+    assert dynamodb.Table("Reservations").get_item(Key={"reservationId": "res_1"})["Item"]["status"] == "confirmed"
+
+
+def test_cancel_of_an_untracked_booking_still_cancels(dynamodb):
+    dynamodb.Table("Reservations").put_item(Item=dict(RESERVATION, time="20:00"))  # seats never counted
+
+    response = cancel()
+
+    assert response.status_code == 200
+    assert json.loads(response.rendered_content)["reservation"]["status"] == "cancelled"
+    assert slot(dynamodb, "20:00") is None
+    assert slot(dynamodb, "19:00") == (SEATS - 2, 2)
+
+
+def test_modify_moves_seats_with_the_reservation(dynamodb):
+    response = modify(time="20:00", partySize=3)
+
+    assert response.status_code == 200
+    assert json.loads(response.rendered_content)["reservation"]["time"] == "20:00"
+    assert slot(dynamodb, "19:00") == (SEATS, 0)
+    assert slot(dynamodb, "20:00") == (SEATS - 3, 3)
+
+    assert modify(partySize=1).status_code == 200
+    assert slot(dynamodb, "20:00") == (SEATS - 1, 1)
+
+
+def test_modify_of_a_cancelled_reservation_keeps_the_seats(dynamodb, monkeypatch):
+    stale = Resource(dynamodb, stale=["Reservations"])
+    monkeypatch.setattr(views, "dynamodb", stale)
+    stale.Table("Reservations").get_item(Key={"reservationId": "res_1"})  # read while confirmed
+    assert cancel().status_code == 200
+
+    response = modify(time="20:00")
+
+    assert response.status_code == 400
+    assert slot(dynamodb, "19:00") == (SEATS, 0)
+    assert slot(dynamodb, "20:00") is None
+    assert dynamodb.Table("Reservations").get_item(Key={"reservationId": "res_1"})["Item"]["time"] == "19:00"
+
+
+def test_modify_into_a_full_slot_changes_nothing(dynamodb):
+    views.availability.reserve("rest_1", "2099-01-01", "20:00", SEATS)
+
+    response = modify(time="20:00")
+
+    assert response.status_code == 409
+    assert slot(dynamodb, "19:00") == (SEATS - 2, 2)
+    assert dynamodb.Table("Reservations").get_item(Key={"reservationId": "res_1"})["Item"]["time"] == "19:00"
+
+
+def test_confirmation_codes_are_claimed_outside_the_reservations_table(dynamodb, monkeypatch):
+    codes = iter(["TAKEN1", "FRESH1"])
+    monkeypatch.setattr(views, "new_confirmation_code", lambda: next(codes))
+    dynamodb.Table("ConfirmationCodes").put_item(Item={"code": "TAKEN1", "reservationId": "res_old"})
+    factory = RequestFactory()
+    hold = views.create_hold(factory.post("/api/reservations/hold", json.dumps(
+        {"userId": "u1", "restaurantId": "rest_1", "date": "2099-01-01", "time": "19:00", "partySize": 2}
+    ), content_type="application/json"))
+    hold_id = json.loads(hold.rendered_content)["hold"]["holdId"]
+
+    response = views.confirm_reservation(factory.post("/api/reservations/confirm", json.dumps(
+        {"holdId": hold_id, "userId": "u1", "paymentMethod": "card_1"}
+    ), content_type="application/json"))
+
+    reservation = json.loads(response.rendered_content)["reservation"]
+    assert response.status_code == 201
+    assert reservation["confirmationCode"] == "FRESH1"
+    assert dynamodb.Table("ConfirmationCodes").get_item(Key={"code": "FRESH1"})["Item"] == {
+        "code": "FRESH1", "reservationId": reservation["reservationId"]}
+    stored = dynamodb.Table("Reservations").scan()["Items"]
+    assert sorted(r["reservationId"] for r in stored) == sorted(["res_1", reservation["reservationId"]])
+    assert slot(dynamodb, "19:00") == (SEATS - 4, 4)
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from api import restaurants
+from api.restaurants import AsyncRestaurantEnricher, RestaurantEnricher, TTLCache
+
+from .yelp_stub import YelpStubServer, make_business
+
+
+@pytest.fixture
+def yelp_stub():
+    stub = YelpStubServer({
+        "thai-palace": make_business("thai-palace", "Thai Palace"),
+        "pizza-place": make_business("pizza-place", "Pizza Place", rating=4.0),
+    }).start()
+    yield stub
+    stub.stop()
+
+
+def test_enrich_dedupes_restaurant_ids(yelp_stub):
+    enricher = RestaurantEnricher(base_url=yelp_stub.base_url, api_key="test")
+    reservations = [
+        {"reservationId": "r1", "restaurantId": "thai-palace"},
+        {"reservationId": "r2", "restaurantId": "thai-palace"},
+        {"reservationId": "r3", "restaurantId": "pizza-place"},
+        {"reservationId": "r4", "restaurantId": "test_skip_me"},
+    ]
+
+    enricher.enrich(reservations)
+
+    assert reservations[0]["restaurantName"] == "Thai Palace"
+    assert reservations[1]["restaurantCuisine"] == ["Thai"]
+    assert reservations[2]["restaurantRating"] == 4.0
+    assert reservations[2]["restaurantAddress"] == "1 Test St, New York, NY 10001"
+    assert "restaurantName" not in reservations[3]
+    assert yelp_stub.hits == {"thai-palace": 1, "pizza-place": 1}
+
+
+def test_enrich_serves_repeat_lookups_from_cache(yelp_stub):
+    enricher = RestaurantEnricher(base_url=yelp_stub.base_url, api_key="test")
+
+    enricher.get_many(["thai-palace"])
+    enricher.get_many(["thai-palace"])
+
+    assert yelp_stub.hits["thai-palace"] == 1
+
+
+def test_enrich_falls_back_for_unknown_restaurant(yelp_stub):
+    enricher = RestaurantEnricher(base_url=yelp_stub.base_url, api_key="test")
+    reservations = [{"reservationId": "r1", "restaurantId": "gone"}]
+
+    enricher.enrich(reservations)
+
+    assert reservations[0]["restaurantName"] == "gone"
+    assert reservations[0]["restaurantCuisine"] == []
+
+
+def test_misses_are_fetched_concurrently():
+    ids = [f"rest-{i}" for i in range(8)]
+    stub = YelpStubServer({rid: make_business(rid, rid) for rid in ids}, delay=0.2).start()
+    try:
+        enricher = RestaurantEnricher(base_url=stub.base_url, api_key="test", max_workers=8)
+        start = time.perf_counter()
+        details = enricher.get_many(ids)
+        elapsed = time.perf_counter() - start
+    finally:
+        stub.stop()
+
+    assert set(details) == set(ids)
+    assert elapsed < 0.2 * len(ids) / 2
+
+
+def test_ttl_cache_expires_and_evicts():
+    now = [0.0]
+    cache = TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # evicts least recently used ("b")
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] = 11
+    assert cache.get("a") is None
+
+
+def test_dynamodb_cache_is_shared_and_skips_expired_rows(yelp_stub):
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    with moto.mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName="RestaurantCache",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        table.put_item(Item={"id": "pizza-place", "details": '{"restaurantName": "Stale"}', "expiresAt": 1})
+
+        RestaurantEnricher(base_url=yelp_stub.base_url, api_key="test", ddb_table=table).get_many(["thai-palace"])
+        other_worker = RestaurantEnricher(base_url=yelp_stub.base_url, api_key="test", ddb_table=table)
+        details = other_worker.get_many(["thai-palace", "pizza-place"])
+
+        assert details["thai-palace"]["restaurantName"] == "Thai Palace"
+        assert details["pizza-place"]["restaurantName"] == "Pizza Place"
+        assert yelp_stub.hits == {"thai-palace": 1, "pizza-place": 1}
+        assert int(table.get_item(Key={"id": "pizza-place"})["Item"]["expiresAt"]) > time.time()
+
+
+class ThrottledCacheClient:
+    """A DynamoDB client that never processes anything, like one throttled for good."""
+
+    def __init__(self):
+        self.calls = []
+
+    def batch_get_item(self, RequestItems):  # noqa: N803 - boto3 naming
+        self.calls.append("get")
+        return {"Responses": {}, "UnprocessedKeys": RequestItems}
+
+    def batch_write_item(self, RequestItems):  # noqa: N803 - boto3 naming
+        self.calls.append("put")
+        return {"UnprocessedItems": RequestItems}
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    waits = []
+    monkeypatch.setattr(restaurants, "batch_backoff", lambda attempt: waits.append(attempt) or 0)
+    return waits
+
+
+def test_throttled_cache_table_is_retried_a_bounded_number_of_times(yelp_stub, backoffs):
+    client = ThrottledCacheClient()
+    table = SimpleNamespace(name="RestaurantCache", meta=SimpleNamespace(client=client))
+    enricher = RestaurantEnricher(base_url=yelp_stub.base_url, api_key="test", ddb_table=table)
+
+    details = enricher.get_many(["thai-palace"])
+
+    attempts = restaurants.RESTAURANT_CACHE_BATCH_ATTEMPTS
+    assert details["thai-palace"]["restaurantName"] == "Thai Palace"  # unread keys count as misses
+    assert client.calls == ["get"] * attempts + ["put"] * attempts
+    assert backoffs == list(range(1, attempts)) * 2
+
+
+def test_async_throttled_cache_table_backs_off_instead_of_spinning(yelp_stub, backoffs):
+    pytest.importorskip("aiohttp")
+    client = ThrottledCacheClient()
+
+    async def ddb_client():
+        async def call(method, **kwargs):
+            return getattr(client, method)(**kwargs)
+        return SimpleNamespace(batch_get_item=lambda **kw: call("batch_get_item", **kw),
+                               batch_write_item=lambda **kw: call("batch_write_item", **kw))
+
+    enricher = AsyncRestaurantEnricher(RestaurantEnricher(base_url=yelp_stub.base_url, api_key="test"),
+                                       get_ddb_client=ddb_client, ddb_table_name="RestaurantCache")
+
+    async def run():
+        try:
+            return await enricher.get_many(["thai-palace"])
+        finally:
+            await enricher.close()
+
+    details = asyncio.run(run())
+
+    attempts = restaurants.RESTAURANT_CACHE_BATCH_ATTEMPTS
+    assert details["thai-palace"]["restaurantName"] == "Thai Palace"
+    assert client.calls == ["get"] * attempts + ["put"] * attempts
+    assert backoffs == list(range(1, attempts)) * 2
@@ -0,0 +1,182 @@
+import json
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+import boto3  # noqa: E402
+
+# legacy/seed_data.py is a standalone script, not part of the backend package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "legacy"))
+
+import seed_data  # noqa: E402
+
+ITEMS = [
+    {"id": "r1", "name": "Café [\"Brackets\"], {braces}", "rating": 4.75, "tags": ["a", "b"]},
+    {"id": "r2", "name": "", "rating": 12345678901234567890, "nested": {"x": [1, 2.5, None, True]}},
+    {"id": "r3", "name": "back\\slash \\\"quote\\\"", "rating": -0.001, "empty": {}},
+    [],
+    "plain string",
+    7,
+]
+
+
+@pytest.fixture
+def stdlib_parser(monkeypatch):
+    monkeypatch.setattr(seed_data, "ijson", None)
+
+
+def expected(items):
+    return json.loads(json.dumps(items), parse_float=Decimal)
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 5, 7, 64, 1 << 16])
+def test_json_array_parses_across_chunk_boundaries(stdlib_parser, monkeypatch, tmp_path, chunk):
+    monkeypatch.setattr(seed_data, "READ_CHUNK", chunk)
+    path = tmp_path / "items.json"
+    path.write_text(" \n" + json.dumps(ITEMS, indent=2) + "\n", encoding="utf-8")
+
+    assert list(seed_data.iter_json_array(str(path))) == expected(ITEMS)
+
+
+@pytest.mark.parametrize("chunk", [1, 4, 7, 1 << 16])
+def test_number_split_at_the_end_of_a_read_is_not_cut_short(stdlib_parser, monkeypatch, tmp_path, chunk):
+    monkeypatch.setattr(seed_data, "READ_CHUNK", chunk)
+    path = tmp_path / "numbers.json"
+    path.write_text("[1234,5.678,90,1e3,-0.5]", encoding="utf-8")
+
+    assert list(seed_data.iter_json_array(str(path))) == [1234, Decimal("5.678"), 90, Decimal("1e3"), Decimal("-0.5")]
+
+
+@pytest.mark.parametrize("text", ["", "{}", "[1, 2", "[1, {\"a\": ]", "[5.x]"])
+def test_malformed_arrays_raise_value_error(stdlib_parser, monkeypatch, tmp_path, text):
+    monkeypatch.setattr(seed_data, "READ_CHUNK", 2)
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        list(seed_data.iter_json_array(str(path)))
+
+
+def test_ndjson_is_read_line_by_line(tmp_path):
+    path = tmp_path / "items.ndjson"
+    path.write_text("\n".join(json.dumps(item) for item in ITEMS[:3]) + "\n\n", encoding="utf-8")
+
+    assert list(seed_data.iter_json_array(str(path))) == expected(ITEMS[:3])
+
+
+def test_batches_never_repeat_a_key():
+    items = [{"id": f"r{i % 30}", "n": i} for i in range(60)]
+
+    batches = list(seed_data.iter_batches(items, ["id"]))
+
+    assert [len(batch) for batch in batches] == [25, 25, 10]
+    for batch in batches:
+        keys = [request["PutRequest"]["Item"]["id"] for request in batch]
+        assert len(keys) == len(set(keys))
+
+
+def test_repeated_key_in_a_batch_keeps_the_last_item():
+    items = [{"userId": "u1", "restaurantId": "a", "n": 1},
+             {"userId": "u1", "restaurantId": "b", "n": 2},
+             {"userId": "u1", "restaurantId": "a", "n": 3}]
+
+    (batch,) = seed_data.iter_batches(items, ["userId", "restaurantId"])
+
+    assert [request["PutRequest"]["Item"]["n"] for request in batch] == [3, 2]
+
+
+def test_seed_table_writes_every_unique_item(stdlib_parser, tmp_path):
+    items = [{"id": f"r{i % 40}", "rating": i / 4} for i in range(100)]
+    path = tmp_path / "Restaurants.json"
+    path.write_text(json.dumps(items), encoding="utf-8")
+
+    with moto.mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        dynamodb.create_table(
+            TableName="Restaurants",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        written, _ = seed_data.seed_dynamodb_table(dynamodb, "Restaurants", str(path))
+        stored = dynamodb.Table("Restaurants").scan()["Items"]
+
+    assert written == 100
+    assert len(stored) == 40
+    assert {row["id"]: row["rating"] for row in stored}["r0"] == Decimal("20")  # the last r0 (i=80) won
+
+
+MIB = 1024 * 1024
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    # S3's smallest part; parts of the large file below go up at this size
+    monkeypatch.setattr(seed_data, "MULTIPART_THRESHOLD", 5 * MIB)
+    monkeypatch.setattr(seed_data, "MULTIPART_CHUNKSIZE", 5 * MIB)
+    with moto.mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="images")
+        yield s3
+
+
+@pytest.fixture
+def seed_dir(tmp_path):
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + bytes(range(256)) * 40)
+    (tmp_path / "menu.json").write_text('{"items": []}', encoding="utf-8")
+    (tmp_path / "video.mp4").write_bytes(os.urandom(11 * MIB))  # three parts
+    return tmp_path
+
+
+def uploads(s3, monkeypatch):
+    calls = []
+    upload_file = s3.upload_file
+
+    def counting(path, bucket, key, **kwargs):
+        calls.append(key)
+        return upload_file(path, bucket, key, **kwargs)
+
+    monkeypatch.setattr(s3, "upload_file", counting)
+    return calls
+
+
+def test_local_etag_matches_what_s3_reports(bucket, seed_dir):
+    seed_data.seed_s3_bucket(bucket, "images", str(seed_dir))
+
+    remote = seed_data.remote_etags(bucket, "images")
+
+    assert remote.keys() == {"logo.png", "menu.json", "video.mp4"}
+    assert remote["video.mp4"].endswith("-3")
+    for name, etag in remote.items():
+        assert seed_data.s3_etag(str(seed_dir / name)) == etag
+
+
+def test_unchanged_files_are_not_uploaded_again(bucket, seed_dir, monkeypatch):
+    seed_data.seed_s3_bucket(bucket, "images", str(seed_dir))
+    calls = uploads(bucket, monkeypatch)
+
+    seed_data.seed_s3_bucket(bucket, "images", str(seed_dir))
+    assert calls == []
+
+    (seed_dir / "menu.json").write_text('{"items": ["pad thai"]}', encoding="utf-8")
+    seed_data.seed_s3_bucket(bucket, "images", str(seed_dir))
+    assert calls == ["menu.json"]
+    assert bucket.get_object(Bucket="images", Key="menu.json")["Body"].read() == b'{"items": ["pad thai"]}'
+
+
+def test_manifest_reuses_hashes_of_untouched_files(bucket, seed_dir, monkeypatch):
+    seed_data.seed_s3_bucket(bucket, "images", str(seed_dir))
+    manifest = json.loads((seed_dir / seed_data.S3_MANIFEST_NAME).read_text())
+    hashed = []
+    s3_etag = seed_data.s3_etag
+    monkeypatch.setattr(seed_data, "s3_etag", lambda path: hashed.append(os.path.basename(path)) or s3_etag(path))
+
+    seed_data.seed_s3_bucket(bucket, "images", str(seed_dir))
+
+    assert manifest.keys() == {"logo.png", "menu.json", "video.mp4"}
+    assert hashed == []
+    assert seed_data.S3_MANIFEST_NAME not in seed_data.remote_etags(bucket, "images")
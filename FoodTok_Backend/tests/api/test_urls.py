@@ -17,6 +17,7 @@ DYNAMO_SECRET = os.getenv("FOODTOK_SMOKE_AWS_SECRET", "test")
 DDB_USERS_TABLE = os.getenv("DDB_USERS_TABLE", "Users")
 DDB_RESERVATIONS_TABLE = os.getenv("DDB_RESERVATIONS_TABLE", "Reservations")
 DDB_HOLDS_TABLE = os.getenv("DDB_HOLDS_TABLE", "Holds")
+DDB_CONFIRMATION_CODES_TABLE = os.getenv("DDB_CONFIRMATION_CODES_TABLE", "ConfirmationCodes")
 
 
 def test_healthcheck_url_is_available():
@@ -230,6 +231,130 @@ def test_favorites_endpoints_flow():
     assert recheck_response.json().get("isFavorite") is False
 
 
+def test_favorites_batch_endpoints():
+    _require_backend()
+    user = _signup_test_user("favbatch")
+    liked = [f"smoke-rest-{uuid.uuid4().hex[:6]}" for _ in range(30)]
+    unseen = [f"smoke-rest-{uuid.uuid4().hex[:6]}" for _ in range(5)]
+    try:
+        add_response = requests.post(
+            f"{BASE_URL}/favorites:batch",
+            json={
+                "userId": user["id"],
+                "add": [{"restaurantId": rid, "restaurantName": rid, "matchScore": 80.5} for rid in liked],
+            },
+            timeout=DEFAULT_TIMEOUT,
+        )
+        assert add_response.status_code == 200, add_response.text
+        assert sorted(add_response.json()["added"]) == sorted(liked)
+
+        check_response = requests.post(
+            f"{BASE_URL}/favorites/check:batch",
+            json={"userId": user["id"], "restaurantIds": liked + unseen},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        assert check_response.status_code == 200, check_response.text
+        membership = check_response.json()["favorites"]
+        assert all(membership[rid] for rid in liked)
+        assert not any(membership[rid] for rid in unseen)
+
+        remove_response = requests.post(
+            f"{BASE_URL}/favorites:batch",
+            json={"userId": user["id"], "remove": liked},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        assert remove_response.status_code == 200, remove_response.text
+
+        recheck_response = requests.post(
+            f"{BASE_URL}/favorites/check:batch",
+            json={"userId": user["id"], "restaurantIds": liked},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        assert not any(recheck_response.json()["favorites"].values())
+
+        too_many = requests.post(
+            f"{BASE_URL}/favorites/check:batch",
+            json={"userId": user["id"], "restaurantIds": [f"r{i}" for i in range(101)]},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        assert too_many.status_code == 400
+    finally:
+        _cleanup_test_user(user["id"])
+
+
+def test_favorites_listing_pages_most_recent_first():
+    _require_backend()
+    user = _signup_test_user("favpage")
+    liked = []
+    try:
+        for i in range(5):
+            restaurant_id = f"smoke-rest-{i}-{uuid.uuid4().hex[:6]}"
+            resp = requests.post(
+                f"{BASE_URL}/favorites",
+                json={"userId": user["id"], "restaurantId": restaurant_id, "restaurantName": restaurant_id, "matchScore": 50},
+                timeout=DEFAULT_TIMEOUT,
+            )
+            assert resp.status_code == 201, resp.text
+            liked.append(restaurant_id)
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, "fields": "restaurantId,likedAt"}
+            if cursor:
+                params["cursor"] = cursor
+            page = requests.get(f"{BASE_URL}/favorites/{user['id']}", params=params, timeout=DEFAULT_TIMEOUT)
+            assert page.status_code == 200, page.text
+            assert len(page.json()) <= 2
+            assert all(set(fav) == {"restaurantId", "likedAt"} for fav in page.json())
+            seen.extend(page.json())
+            cursor = page.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert [fav["restaurantId"] for fav in seen] == list(reversed(liked))
+
+        bad_fields = requests.get(f"{BASE_URL}/favorites/{user['id']}", params={"fields": "password"}, timeout=DEFAULT_TIMEOUT)
+        assert bad_fields.status_code == 400
+    finally:
+        requests.post(f"{BASE_URL}/favorites:batch", json={"userId": user["id"], "remove": liked}, timeout=DEFAULT_TIMEOUT)
+        _cleanup_test_user(user["id"])
+
+
+def test_discover_feed_is_ranked_and_paginated():
+    _require_backend()
+    user = _signup_test_user("discover")
+    try:
+        prefs = requests.patch(
+            f"{BASE_URL}/auth/preferences",
+            json={"userId": user["id"], "preferences": {"cuisineTypes": ["Thai"], "priceRange": "$$"}},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        assert prefs.status_code == 200, prefs.text
+
+        seen, cursor = [], None
+        for _ in range(5):
+            params = {"limit": 5}
+            if cursor:
+                params["cursor"] = cursor
+            page = requests.get(f"{BASE_URL}/discover/{user['id']}", params=params, timeout=DEFAULT_TIMEOUT)
+            assert page.status_code == 200, page.text
+            payload = page.json()
+            assert len(payload["restaurants"]) <= 5
+            seen.extend(payload["restaurants"])
+            cursor = payload["nextCursor"]
+            if not cursor:
+                break
+
+        scores = [r["matchScore"] for r in seen]
+        assert scores == sorted(scores, reverse=True)
+        assert len({r["id"] for r in seen}) == len(seen)
+
+        assert requests.get(f"{BASE_URL}/discover/{user['id']}", params={"limit": 0}, timeout=DEFAULT_TIMEOUT).status_code == 400
+        assert requests.get(f"{BASE_URL}/discover/missing-{uuid.uuid4().hex}", timeout=DEFAULT_TIMEOUT).status_code == 404
+    finally:
+        _cleanup_test_user(user["id"])
+
+
 def test_reservations_availability_returns_slots():
     _require_backend()
     restaurant_id = _ensure_restaurant_via_dynamo(_random_restaurant_payload("avail"))
@@ -245,6 +370,20 @@ def test_reservations_availability_returns_slots():
     assert isinstance(payload.get("availableSlots"), list)
 
 
+def test_reservations_hold_consumes_slot_capacity():
+    _require_backend()
+    user = _signup_test_user("capacity")
+    restaurant_id = _ensure_restaurant_via_dynamo(_random_restaurant_payload("capacity"))
+    date_str = (datetime.utcnow() + timedelta(days=6)).date().isoformat()
+    before = _slot_remaining(restaurant_id, date_str, "19:00")
+    hold = _create_hold_via_api(user["id"], restaurant_id, date_str, "19:00")
+    try:
+        assert _slot_remaining(restaurant_id, date_str, "19:00") == before - hold["partySize"]
+    finally:
+        _delete_hold(hold["holdId"])
+        _cleanup_test_user(user["id"])
+
+
 def test_reservations_hold_and_active():
     _require_backend()
     user = _signup_test_user("hold")
@@ -285,6 +424,40 @@ def test_reservations_confirm_creates_reservation():
         _cleanup_test_user(user["id"])
 
 
+def test_reservations_confirm_retry_is_idempotent():
+    _require_backend()
+    user = _signup_test_user("idem")
+    restaurant_id = _ensure_restaurant_via_dynamo(_random_restaurant_payload("idem"))
+    date_str = (datetime.utcnow() + timedelta(days=8)).date().isoformat()
+    time_slot = _pick_time_slot(restaurant_id, date_str)
+    hold = _create_hold_via_api(user["id"], restaurant_id, date_str, time_slot)
+    payload = {"holdId": hold["holdId"], "userId": user["id"], "paymentMethod": "card_api_1111"}
+    headers = {"Idempotency-Key": f"confirm-{uuid.uuid4().hex}"}
+    reservation = None
+    try:
+        first = requests.post(f"{BASE_URL}/reservations/confirm", json=payload, headers=headers, timeout=DEFAULT_TIMEOUT)
+        assert first.status_code == 201, first.text
+        reservation = first.json()["reservation"]
+
+        retry = requests.post(f"{BASE_URL}/reservations/confirm", json=payload, headers=headers, timeout=DEFAULT_TIMEOUT)
+        assert retry.status_code == 201, retry.text
+        assert retry.json()["reservation"]["reservationId"] == reservation["reservationId"]
+        assert retry.json()["reservation"]["confirmationCode"] == reservation["confirmationCode"]
+
+        other_key = requests.post(
+            f"{BASE_URL}/reservations/confirm",
+            json=payload,
+            headers={"Idempotency-Key": "someone-else"},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        assert other_key.status_code == 409, other_key.text
+    finally:
+        if reservation:
+            _delete_reservation(reservation["reservationId"])
+        _delete_hold(hold["holdId"])
+        _cleanup_test_user(user["id"])
+
+
 def test_reservations_user_listing_includes_reservation():
     _require_backend()
     user = _signup_test_user("list")
@@ -308,6 +481,44 @@ def test_reservations_user_listing_includes_reservation():
         _cleanup_test_user(user["id"])
 
 
+def test_reservations_user_listing_paginates_with_cursor():
+    _require_backend()
+    user = _signup_test_user("page")
+    restaurant_id = _ensure_restaurant_via_dynamo(_random_restaurant_payload("page"))
+    created = []
+    try:
+        for offset in (12, 13, 14):
+            date_str = (datetime.utcnow() + timedelta(days=offset)).date().isoformat()
+            hold = _create_hold_via_api(user["id"], restaurant_id, date_str, "19:00")
+            created.append((hold["holdId"], _confirm_reservation_via_api(user["id"], hold["holdId"])))
+
+        seen = []
+        cursor = None
+        for _ in range(5):
+            params = {"filter": "upcoming", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            resp = requests.get(
+                f"{BASE_URL}/reservations/user/{user['id']}",
+                params=params,
+                timeout=DEFAULT_TIMEOUT,
+            )
+            assert resp.status_code == 200, resp.text
+            body = resp.json()
+            assert body["count"] <= 2
+            seen.extend(r["reservationId"] for r in body["reservations"])
+            cursor = body.get("nextCursor")
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(r["reservationId"] for _, r in created)
+    finally:
+        for hold_id, reservation in created:
+            _delete_reservation(reservation["reservationId"])
+            _delete_hold(hold_id)
+        _cleanup_test_user(user["id"])
+
+
 def test_reservations_detail_returns_payload():
     _require_backend()
     user = _signup_test_user("detail")
@@ -520,7 +731,12 @@ def _delete_reservation(reservation_id: str) -> None:
         aws_access_key_id=DYNAMO_KEY,
         aws_secret_access_key=DYNAMO_SECRET,
     )
-    dynamodb.Table(DDB_RESERVATIONS_TABLE).delete_item(Key={"reservationId": reservation_id})
+    deleted = dynamodb.Table(DDB_RESERVATIONS_TABLE).delete_item(
+        Key={"reservationId": reservation_id}, ReturnValues="ALL_OLD"
+    ).get("Attributes", {})
+    # ...and the confirmation code it claimed
+    if deleted.get("confirmationCode"):
+        dynamodb.Table(DDB_CONFIRMATION_CODES_TABLE).delete_item(Key={"code": deleted["confirmationCode"]})
 
 
 def _delete_hold(hold_id: str) -> None:
@@ -579,6 +795,17 @@ def _pick_time_slot(restaurant_id: str, date_str: str) -> str:
     return slots[0]["time"]
 
 
+def _slot_remaining(restaurant_id: str, date_str: str, time_str: str) -> int:
+    resp = requests.post(
+        f"{BASE_URL}/reservations/availability",
+        json={"restaurantId": restaurant_id, "date": date_str, "partySize": 1},
+        timeout=DEFAULT_TIMEOUT,
+    )
+    assert resp.status_code == 200, resp.text
+    slot = next(s for s in resp.json()["availableSlots"] if s["time"] == time_str)
+    return slot["remainingCapacity"]
+
+
 def _create_hold_via_api(user_id: str, restaurant_id: str, date_str: str, time_str: str) -> Dict[str, Any]:
     resp = requests.post(
         f"{BASE_URL}/reservations/hold",
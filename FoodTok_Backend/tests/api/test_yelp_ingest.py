@@ -0,0 +1,108 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from api.yelp_ingest import CatalogIngester, TokenBucket, retry_after_seconds
+
+from .yelp_stub import YelpStubServer, make_business
+
+
+def catalog(prefix, count, alias, title):
+    return {f"{prefix}-{i:03d}": make_business(f"{prefix}-{i:03d}", f"{title} {i}", alias=alias, title=title)
+            for i in range(count)}
+
+
+@pytest.fixture
+def yelp_search():
+    # 120 thai places is three pages of 50. The stub ignores location, so
+    # searching two locations returns every place twice.
+    stub = YelpStubServer({**catalog("thai", 120, "thai", "Thai"), **catalog("korean", 7, "korean", "Korean")}).start()
+    yield stub
+    stub.stop()
+
+
+def read_ndjson(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_crawl_pages_past_50_and_dedupes_across_locations(yelp_search, tmp_path):
+    output = tmp_path / "restaurants.ndjson"
+    ingester = CatalogIngester(str(output), base_url=yelp_search.base_url, api_key="test", rate=1000, burst=1000)
+
+    stats = ingester.run(["thai", "korean"], ["Manhattan, NY", "Brooklyn, NY"])
+
+    items = read_ndjson(output)
+    assert len(items) == 127 and len({item["id"] for item in items}) == 127
+    assert items[0]["id"].startswith("rest_") and items[0]["cuisine"] in ("Thai", "Korean")
+    assert stats["written"] == 127 and stats["duplicates"] == 127
+    thai_offsets = sorted(int(s["offset"]) for s in yelp_search.searches
+                          if s["term"] == "thai restaurants" and s["location"] == "Manhattan, NY")
+    assert thai_offsets == [0, 50, 100]
+
+
+def test_resume_skips_finished_searches_and_written_ids(yelp_search, tmp_path):
+    output = tmp_path / "restaurants.ndjson"
+    CatalogIngester(str(output), base_url=yelp_search.base_url, api_key="test", rate=1000, burst=1000).run(
+        ["thai"], ["Manhattan, NY"]
+    )
+    with open(output, "a") as f:
+        f.write('{"id": "rest_partial')  # a line cut off by a crash
+    searches_before = len(yelp_search.searches)
+
+    stats = CatalogIngester(str(output), base_url=yelp_search.base_url, api_key="test", rate=1000, burst=1000).run(
+        ["thai", "korean"], ["Manhattan, NY"]
+    )
+
+    assert [s["term"] for s in yelp_search.searches[searches_before:]] == ["korean restaurants"]
+    assert stats["written"] == 7
+    assert len(read_ndjson(output)) == 127
+
+
+@pytest.mark.parametrize("retry_after", ["0", "Wed, 21 Oct 2015 07:28:00 GMT", "soon"])
+def test_rate_limited_searches_are_retried(tmp_path, monkeypatch, retry_after):
+    monkeypatch.setattr("api.yelp_ingest.YELP_INGEST_BACKOFF", 0.01)
+    stub = YelpStubServer(catalog("thai", 3, "thai", "Thai"), rate_limited=2, retry_after=retry_after).start()
+    try:
+        output = tmp_path / "restaurants.ndjson"
+        stats = CatalogIngester(str(output), base_url=stub.base_url, api_key="test", rate=1000, burst=1000).run(
+            ["thai"], ["Manhattan, NY"]
+        )
+    finally:
+        stub.stop()
+
+    assert stats["retries"] == 2 and stats["written"] == 3
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    in_a_minute = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+
+    assert retry_after_seconds("2") == 2.0
+    assert retry_after_seconds("-5") == 0.0
+    assert 55 < retry_after_seconds(in_a_minute) <= 60
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00") == 0.0  # no zone: read as UTC
+    for value in [None, "", "soon", "inf", "nan"]:
+        assert retry_after_seconds(value) is None
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    now = [0.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    async def take(n):
+        bucket = TokenBucket(rate=2, capacity=3, clock=lambda: now[0], sleep=fake_sleep)
+        for _ in range(n):
+            await bucket.acquire()
+
+    asyncio.run(take(7))
+
+    assert sleeps == [0.5] * 4  # 3 from the burst, then one every 1/rate seconds
+    assert now[0] == 2.0
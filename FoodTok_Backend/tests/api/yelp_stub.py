@@ -0,0 +1,115 @@
+"""Tiny in-process stand-in for the Yelp Fusion business and search endpoints."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+SEARCH_MAX_RESULTS = 240  # Yelp rejects searches with offset + limit past this
+
+
+class YelpStubServer:
+    """
+    Serves GET /v3/businesses/<id> from a dict; unknown ids return 404.
+
+    GET /v3/businesses/search returns, in id order, the businesses with a
+    category alias that appears in `term` (location is recorded but not
+    used), paged by offset/limit. The first `rate_limited` searches get a
+    429 with `retry_after` as its Retry-After header instead.
+    """
+
+    def __init__(self, businesses: Dict[str, dict], delay: float = 0.0, rate_limited: int = 0,
+                 retry_after: str = "0") -> None:
+        self.businesses = businesses
+        self.delay = delay
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.hits: Counter[str] = Counter()
+        self.searches: List[dict] = []
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None, "server not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v3"
+
+    def start(self) -> "YelpStubServer":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                url = urlsplit(self.path)
+                business_id = url.path.rstrip("/").rsplit("/", 1)[-1]
+                if business_id == "search":
+                    return self.search({k: v[0] for k, v in parse_qs(url.query).items()})
+                with stub._lock:
+                    stub.hits[business_id] += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+
+                business = stub.businesses.get(business_id)
+                status = 200 if business is not None else 404
+                self.reply(status, business or {"error": {"code": "BUSINESS_NOT_FOUND"}})
+
+            def search(self, params: Dict[str, str]) -> None:
+                with stub._lock:
+                    stub.searches.append(params)
+                    throttled = stub.rate_limited > 0
+                    stub.rate_limited -= throttled
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if throttled:
+                    return self.reply(429, {"error": {"code": "TOO_MANY_REQUESTS_PER_SECOND"}}, {"Retry-After": stub.retry_after})
+
+                offset, limit = int(params.get("offset", 0)), int(params.get("limit", 20))
+                if limit > 50 or offset + limit > SEARCH_MAX_RESULTS:
+                    return self.reply(400, {"error": {"code": "VALIDATION_ERROR"}})
+                term = params.get("term", "")
+                matches = [
+                    b for _, b in sorted(stub.businesses.items())
+                    if any(c["alias"] in term for c in b.get("categories", []))
+                ]
+                self.reply(200, {"businesses": matches[offset:offset + limit], "total": len(matches)})
+
+            def reply(self, status: int, payload: dict, headers: Dict[str, str] | None = None) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def make_business(business_id: str, name: str, rating: float = 4.5, alias: str = "thai", title: str = "Thai") -> dict:
+    return {
+        "id": business_id,
+        "name": name,
+        "image_url": f"https://img.example.com/{business_id}.jpg",
+        "categories": [{"alias": alias, "title": title}],
+        "location": {"display_address": ["1 Test St", "New York, NY 10001"]},
+        "rating": rating,
+    }
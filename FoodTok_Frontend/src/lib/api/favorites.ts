@@ -96,3 +96,42 @@ export async function checkFavorite(
     return false;
   }
 }
+
+/**
+ * Check many restaurants at once (up to 100), e.g. a whole feed of cards
+ * POST /api/favorites/check:batch
+ */
+export async function checkFavorites(
+  userId: string,
+  restaurantIds: string[]
+): Promise<Record<string, boolean>> {
+  try {
+    const response = await apiRequest<{ favorites: Record<string, boolean> }>(
+      '/favorites/check:batch',
+      {
+        method: 'POST',
+        body: JSON.stringify({ userId, restaurantIds })
+      }
+    );
+
+    return response.favorites;
+  } catch (error) {
+    console.error('Error checking favorites:', error);
+    return Object.fromEntries(restaurantIds.map((id) => [id, false]));
+  }
+}
+
+/**
+ * Add and/or remove many favorites in one request (up to 100 operations)
+ * POST /api/favorites:batch
+ */
+export async function updateFavorites(
+  userId: string,
+  add: Omit<Favorite, 'userId' | 'likedAt'>[],
+  remove: string[] = []
+): Promise<{ success: boolean; added: string[]; removed: string[]; unprocessed: string[] }> {
+  return apiRequest('/favorites:batch', {
+    method: 'POST',
+    body: JSON.stringify({ userId, add, remove })
+  });
+}
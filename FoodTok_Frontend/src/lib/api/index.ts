@@ -76,7 +76,14 @@ export const searchRestaurants = useMockRestaurants
   : RealRestaurants.searchRestaurants;
 
 // Favorites (always use real backend)
-export { addFavorite, getUserFavorites, removeFavorite, checkFavorite } from './favorites';
+export {
+  addFavorite,
+  getUserFavorites,
+  removeFavorite,
+  checkFavorite,
+  checkFavorites,
+  updateFavorites,
+} from './favorites';
 
 // Stats (always use real backend)
 export { getUserStats } from './stats';
@@ -105,8 +105,10 @@ export async function confirmReservation(
   request: ConfirmReservationRequest
 ): Promise<ReservationResponse> {
   try {
+    // Same key on every retry of this hold, so the backend never books twice
     return await apiRequest('/reservations/confirm', {
       method: 'POST',
+      headers: { 'Idempotency-Key': `confirm-${request.holdId}` },
       body: JSON.stringify(request),
     });
   } catch (error) {
@@ -12,6 +12,10 @@ interface BackendECSProps {
   favorites: Table;
   reservations: Table;
   holds: Table;
+  slotAvailability: Table;
+  recommendationScores: Table;
+  restaurantCache: Table;
+  confirmationCodes: Table;
   imageBucket: Bucket;
   projectPrefix: string; 
 }
@@ -52,10 +56,17 @@ export class BackendECSConstruct extends Construct {
         DDB_RESERVATIONS_TABLE: props.reservations.tableName,
         //DDB_USER_STATS_TABLE:  props.userStats.tableName,
         DDB_HOLDS_TABLE: props.holds.tableName,      
+        DDB_SLOT_AVAILABILITY_TABLE: props.slotAvailability.tableName,
+        DDB_RECOMMENDATION_SCORES_TABLE: props.recommendationScores.tableName,
+        DDB_RESTAURANT_CACHE_TABLE: props.restaurantCache.tableName,
+        DDB_CONFIRMATION_CODES_TABLE: props.confirmationCodes.tableName,
         AWS_REGION: process.env.CDK_DEFAULT_REGION ?? 'us-east-1',
         IS_LOCAL: 'false',
         S3_IMAGE_BUCKET: props.imageBucket.bucketName,
-        DJANGO_SETTINGS_MODULE: 'ecs_project.settings'
+        DJANGO_SETTINGS_MODULE: 'ecs_project.settings_api',
+        SERVER_MODE: 'gunicorn',
+        GUNICORN_WORKERS: '2',
+        GUNICORN_THREADS: '8',
       },
       logging: LogDriver.awsLogs({
         logGroup,
@@ -94,6 +105,10 @@ export class BackendECSConstruct extends Construct {
     props.favorites.grantReadWriteData(taskDef.taskRole);
     props.reservations.grantReadWriteData(taskDef.taskRole);
     props.holds.grantReadWriteData(taskDef.taskRole);
+    props.slotAvailability.grantReadWriteData(taskDef.taskRole);
+    props.recommendationScores.grantReadWriteData(taskDef.taskRole);
+    props.restaurantCache.grantReadWriteData(taskDef.taskRole);
+    props.confirmationCodes.grantReadWriteData(taskDef.taskRole);
 
     props.imageBucket.grantReadWrite(taskDef.taskRole);
 
@@ -11,6 +11,10 @@ export class DdbConstruct extends Construct {
   public readonly favorites: Table;
   public readonly reservations: Table;
   public readonly holds: Table;
+  public readonly slotAvailability: Table;
+  public readonly recommendationScores: Table;
+  public readonly restaurantCache: Table;
+  public readonly confirmationCodes: Table;
 
   constructor(scope: Construct, id: string, props: DdbProps) {
     super(scope, id);
@@ -25,6 +29,12 @@ export class DdbConstruct extends Construct {
       removalPolicy: RemovalPolicy.DESTROY,
     });
 
+    this.users.addGlobalSecondaryIndex({
+      indexName: "UsersByEmail",
+      partitionKey: { name: "email", type: AttributeType.STRING },
+      projectionType: ProjectionType.ALL,
+    });
+
     // ------------------------------
     // Favorites Table
     // ------------------------------
@@ -36,6 +46,16 @@ export class DdbConstruct extends Construct {
       removalPolicy: RemovalPolicy.DESTROY,
     });
 
+    // "Most recently liked first" listing. A GSI rather than an LSI so it
+    // can be added to the existing table in place (an LSI would force a
+    // replacement, which CloudFormation refuses for a named table).
+    this.favorites.addGlobalSecondaryIndex({
+      indexName: "UserFavoritesByLikedAt",
+      partitionKey: { name: "userId", type: AttributeType.STRING },
+      sortKey: { name: "likedAt", type: AttributeType.STRING },
+      projectionType: ProjectionType.ALL,
+    });
+
     // ------------------------------
     // Reservations Table
     // ------------------------------
@@ -61,6 +81,73 @@ export class DdbConstruct extends Construct {
       partitionKey: { name: "holdId", type: AttributeType.STRING },
       billingMode: BillingMode.PAY_PER_REQUEST,
       removalPolicy: RemovalPolicy.DESTROY,
+      timeToLiveAttribute: "ttl",
+    });
+
+    this.holds.addGlobalSecondaryIndex({
+      indexName: "UserHolds",
+      partitionKey: { name: "userId", type: AttributeType.STRING },
+      sortKey: { name: "ttl", type: AttributeType.NUMBER },
+      projectionType: ProjectionType.ALL,
+    });
+
+    // ------------------------------
+    // Slot Availability Table
+    // ------------------------------
+    this.slotAvailability = new Table(this, `${props.projectPrefix}-SlotAvailability`, {
+      tableName: `${props.projectPrefix}-SlotAvailability`,
+      partitionKey: { name: "slotKey", type: AttributeType.STRING },
+      sortKey: { name: "time", type: AttributeType.STRING },
+      billingMode: BillingMode.PAY_PER_REQUEST,
+      removalPolicy: RemovalPolicy.DESTROY,
+    });
+
+    // ------------------------------
+    // Recommendation Scores Table
+    // ------------------------------
+    this.recommendationScores = new Table(this, `${props.projectPrefix}-RecommendationScores`, {
+      tableName: `${props.projectPrefix}-RecommendationScores`,
+      partitionKey: { name: "userId", type: AttributeType.STRING },
+      sortKey: { name: "restaurantId", type: AttributeType.STRING },
+      billingMode: BillingMode.PAY_PER_REQUEST,
+      removalPolicy: RemovalPolicy.DESTROY,
+    });
+
+    this.recommendationScores.addLocalSecondaryIndex({
+      indexName: "UserRanking",
+      sortKey: { name: "rankKey", type: AttributeType.STRING },
+      projectionType: ProjectionType.ALL,
+    });
+
+    // Sparse: only the per-user "#meta" rows carry rankedShard
+    this.recommendationScores.addGlobalSecondaryIndex({
+      indexName: "RankedUsers",
+      partitionKey: { name: "rankedShard", type: AttributeType.STRING },
+      sortKey: { name: "userId", type: AttributeType.STRING },
+      projectionType: ProjectionType.INCLUDE,
+      nonKeyAttributes: ["preferences"],
+    });
+
+    // ------------------------------
+    // Restaurant Cache Table
+    // ------------------------------
+    // Yelp details cached by RestaurantEnricher (RESTAURANT_DDB_CACHE=true)
+    this.restaurantCache = new Table(this, `${props.projectPrefix}-RestaurantCache`, {
+      tableName: `${props.projectPrefix}-RestaurantCache`,
+      partitionKey: { name: "id", type: AttributeType.STRING },
+      billingMode: BillingMode.PAY_PER_REQUEST,
+      removalPolicy: RemovalPolicy.DESTROY,
+      timeToLiveAttribute: "expiresAt",
+    });
+
+    // ------------------------------
+    // Confirmation Codes Table
+    // ------------------------------
+    this.confirmationCodes = new Table(this, `${props.projectPrefix}-ConfirmationCodes`, {
+      tableName: `${props.projectPrefix}-ConfirmationCodes`,
+      partitionKey: { name: "code", type: AttributeType.STRING },
+      billingMode: BillingMode.PAY_PER_REQUEST,
+      removalPolicy: RemovalPolicy.DESTROY,
     });
   }
-}
\ No newline at end of file
+}
@@ -25,6 +25,10 @@ export class MainStack extends Stack {
       favorites: ddb.favorites,
       reservations: ddb.reservations,
       holds: ddb.holds,
+      slotAvailability: ddb.slotAvailability,
+      recommendationScores: ddb.recommendationScores,
+      restaurantCache: ddb.restaurantCache,
+      confirmationCodes: ddb.confirmationCodes,
       imageBucket: s3.imageBucket,
       projectPrefix,     
     });
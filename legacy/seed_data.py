@@ -2,40 +2,198 @@ import boto3
 import os
 import json
 import time
+import random
+import hashlib
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+try:
+    import ijson
+except ImportError:  # the stdlib streaming parser below is used instead
+    ijson = None
+
 
 def marshal(obj):
-    """Recursively convert all float values to Decimal for DynamoDB."""
+    """
+    Recursively convert float values to Decimal for DynamoDB. Kept inline
+    (rather than imported from the backend) so the seed image only needs
+    this file and boto3. The JSON readers below already return fractions
+    as Decimal, so this only rewrites floats that arrive another way.
+    """
+    if isinstance(obj, float):
+        return Decimal(str(obj))
     if isinstance(obj, list):
         return [marshal(x) for x in obj]
-    elif isinstance(obj, dict):
+    if isinstance(obj, dict):
         return {k: marshal(v) for k, v in obj.items()}
-    elif isinstance(obj, float):
-        return Decimal(str(obj))   
-    else:
-        return obj
-    
+    return obj
+
+
+SEED_WORKERS = int(os.getenv("SEED_WORKERS", "8"))  # tables seeded at once
+BATCH_SIZE = 25  # BatchWriteItem's per-request item limit
+BATCH_MAX_ATTEMPTS = int(os.getenv("SEED_BATCH_MAX_ATTEMPTS", "8"))
+BATCH_BACKOFF = 0.05  # seconds, doubled per retry of unprocessed items
+READ_CHUNK = 1 << 16
+
+S3_UPLOAD_WORKERS = int(os.getenv("S3_UPLOAD_WORKERS", "8"))  # files uploaded at once
+MULTIPART_THRESHOLD = 8 * 1024 * 1024  # bytes; larger files go up in parts
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+S3_MANIFEST_NAME = ".s3_manifest.json"  # local hash cache, written into the seed directory
+
+
+def iter_json_array(path):
+    """
+    Yield the elements of the JSON array in path one at a time, without
+    loading the whole file. Numbers with a fraction come back as Decimal.
+    .ndjson/.jsonl files (one item per line) are read with iter_ndjson.
+    Uses ijson when it's installed, otherwise json.JSONDecoder.raw_decode
+    over a sliding buffer.
+    """
+    if path.endswith((".ndjson", ".jsonl")):
+        yield from iter_ndjson(path)
+        return
+    if ijson is not None:
+        with open(path, "rb") as f:
+            yield from ijson.items(f, "item")
+        return
+
+    decoder = json.JSONDecoder(parse_float=Decimal)
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, eof = "", 0, False
+        consumed = 0  # characters dropped from the front of buffer
+
+        def fill():
+            nonlocal buffer, pos, eof, consumed
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            consumed += pos
+            buffer, pos = buffer[pos:] + chunk, 0
+
+        def skip(chars):
+            # Advance past chars, reading more as needed; False at end of file
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer):
+                    return True
+                if eof:
+                    return False
+                fill()
+
+        if not skip(" \t\r\n") or buffer[pos] != "[":
+            raise ValueError(f"{path} is not a JSON array")
+        pos += 1
+        while skip(" \t\r\n,"):
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                item, end = None, None
+            # A value is only complete once a delimiter follows it: a number
+            # split across reads decodes short ("5." as 5, "1e" as 1)
+            if end is None or end == len(buffer) or buffer[end] not in " \t\r\n,]":
+                if eof:
+                    raise ValueError(f"{path}: malformed JSON at character {consumed + pos}")
+                fill()
+                continue
+            pos = end
+            yield item
+        raise ValueError(f"{path}: unterminated JSON array")
+
+
+def iter_ndjson(path):
+    """Yield one item per non-blank line of an NDJSON file (fractions as Decimal)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line, parse_float=Decimal)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{number}: {e}")
+
+
+def iter_batches(items, key_names, size=BATCH_SIZE):
+    """
+    Group items into PutRequest batches of up to size. BatchWriteItem
+    rejects a batch with the same key twice, so a repeated key replaces the
+    earlier item in its batch (the last one wins, as with put_item).
+    """
+    batch = {}
+    for item in items:
+        key = tuple(item.get(name) for name in key_names)
+        if key not in batch and len(batch) == size:
+            yield list(batch.values())
+            batch = {}
+        batch[key] = {"PutRequest": {"Item": item}}
+    if batch:
+        yield list(batch.values())
+
+
+def batch_write_all(client, table_name, write_requests):
+    """
+    One BatchWriteItem call, re-sending UnprocessedItems with backoff.
+    Returns the write requests still unprocessed after all retries.
+    """
+    pending = {table_name: write_requests}
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = client.batch_write_item(RequestItems=pending)
+        pending = response.get("UnprocessedItems") or {}
+        if not pending:
+            return []
+        time.sleep(random.uniform(0, BATCH_BACKOFF * 2 ** attempt))
+    return pending.get(table_name, [])
+
+
 def seed_dynamodb_table(dynamodb, table_name: str, seed_file_path: str):
-    """Insert initial seed items into DynamoDB."""
+    """
+    Stream seed items into DynamoDB in 25-item batches.
+    Returns (items written, seconds taken).
+    """
+    start = time.perf_counter()
+    written = failed = 0
     try:
-        with open(seed_file_path, "r") as f:
-            items = json.load(f)
+        if not os.path.exists(seed_file_path):
+            raise FileNotFoundError(seed_file_path)
+        client = dynamodb.meta.client  # clients are thread-safe, resources aren't
+        key_schema = client.describe_table(TableName=table_name)["Table"]["KeySchema"]
+        key_names = [k["AttributeName"] for k in key_schema]
 
-        print(f"Seeding DynamoDB table '{table_name}' with {len(items)} items...")
+        print(f"Seeding DynamoDB table '{table_name}' from {seed_file_path}...")
+        items = (marshal(item) for item in iter_json_array(seed_file_path))
+        for batch in iter_batches(items, key_names):
+            unprocessed = batch_write_all(client, table_name, batch)
+            written += len(batch) - len(unprocessed)
+            failed += len(unprocessed)
 
-        table = dynamodb.Table(table_name)
-
-        for item in items:
-            item = marshal(item)
-            table.put_item(Item=item)
-        print(f"DynamoDB table '{table_name}' seeded successfully.")
+        elapsed = time.perf_counter() - start
+        rate = written / elapsed if elapsed else 0.0
+        print(f"DynamoDB table '{table_name}' seeded: {written} items in {elapsed:.2f}s ({rate:,.0f} items/s)")
+        if failed:
+            print(f"DynamoDB table '{table_name}': {failed} items still unprocessed after {BATCH_MAX_ATTEMPTS} attempts")
 
     except FileNotFoundError:
         print(f"DynamoDB seed file not found: {seed_file_path}")
-    except ClientError as e:
-        print(f"DynamoDB seeding error: {e}")
+    except (ClientError, ValueError) as e:
+        print(f"DynamoDB seeding error for '{table_name}': {e}")
+    return written, time.perf_counter() - start
+
+
+def seed_dynamodb_tables(dynamodb, tables, workers=SEED_WORKERS):
+    """Seed [(table_name, seed_file_path), ...] concurrently and print the overall rate."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda t: seed_dynamodb_table(dynamodb, *t), tables))
+    elapsed = time.perf_counter() - start
+    total = sum(written for written, _ in results)
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Seeded {total} items across {len(results)} tables in {elapsed:.2f}s ({rate:,.0f} items/s)")
+    return total
 
 
 def wait_for_bucket(s3_client, bucket_name, max_retries=5, delay=2):
@@ -55,8 +213,77 @@ def wait_for_bucket(s3_client, bucket_name, max_retries=5, delay=2):
     print(f"Bucket '{bucket_name}' not found after waiting.")
     return False
 
-def seed_s3_bucket(s3_client, bucket_name: str, seed_dir_path: str):
-    """Upload seed files to S3 bucket using direct boto3 control."""
+def s3_etag(path, threshold=None, chunksize=None):
+    """
+    The ETag S3 reports for path uploaded with these multipart settings:
+    the MD5 hex for a single-part upload, otherwise the MD5 of the parts'
+    MD5 digests plus "-<part count>". Defaults to the module's settings.
+    """
+    threshold = threshold or MULTIPART_THRESHOLD
+    chunksize = chunksize or MULTIPART_CHUNKSIZE
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if size < threshold:
+            digest = hashlib.md5()
+            for block in iter(lambda: f.read(READ_CHUNK), b""):
+                digest.update(block)
+            return digest.hexdigest()
+        parts = [hashlib.md5(part).digest() for part in iter(lambda: f.read(chunksize), b"")]
+    return f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+
+
+def load_manifest(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    try:
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    except OSError as e:  # e.g. a read-only mount; hashes are just recomputed next run
+        print(f"Could not write S3 manifest {path}: {e}")
+
+
+def local_etags(seed_dir_path, files, manifest):
+    """
+    {file_name: etag} for files, reusing the manifest's hash when a file's
+    size and mtime haven't changed. Updates manifest in place.
+    """
+    etags = {}
+    for file_name in files:
+        stat = os.stat(os.path.join(seed_dir_path, file_name))
+        entry = manifest.get(file_name)
+        if not entry or entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            entry = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "etag": s3_etag(os.path.join(seed_dir_path, file_name)),
+            }
+            manifest[file_name] = entry
+        etags[file_name] = entry["etag"]
+    for stale in set(manifest) - set(files):
+        del manifest[stale]
+    return etags
+
+
+def remote_etags(s3_client, bucket_name):
+    """{key: etag} for every object in the bucket (one paginated listing)."""
+    etags = {}
+    for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket_name):
+        for obj in page.get("Contents", []):
+            etags[obj["Key"]] = obj["ETag"].strip('"')
+    return etags
+
+
+def seed_s3_bucket(s3_client, bucket_name: str, seed_dir_path: str, workers=S3_UPLOAD_WORKERS):
+    """
+    Upload seed files to the S3 bucket, skipping files whose content already
+    matches the object there. Large files go up as concurrent multipart uploads.
+    """
     if not os.path.exists(seed_dir_path):
         print(f"No S3 seed directory found at {seed_dir_path}")
         return
@@ -65,24 +292,68 @@ def seed_s3_bucket(s3_client, bucket_name: str, seed_dir_path: str):
         print(f"Aborting S3 seeding because bucket '{bucket_name}' was never ready.")
         return
 
-    files = [f for f in os.listdir(seed_dir_path) if os.path.isfile(os.path.join(seed_dir_path, f))]
+    files = [
+        f for f in os.listdir(seed_dir_path)
+        if f != S3_MANIFEST_NAME and os.path.isfile(os.path.join(seed_dir_path, f))
+    ]
     if not files:
         print(f"No files found in {seed_dir_path}")
         return
 
-    print(f"Uploading {len(files)} files to S3 bucket '{bucket_name}'...")
-    for file_name in files:
-        local_path = os.path.join(seed_dir_path, file_name)
-        try:
-            with open(local_path, "rb") as f:
-                s3_client.put_object(Bucket=bucket_name, Key=file_name, Body=f)
-            print(f"Uploaded {file_name}")
-        except ClientError as e:
-            print(f"Failed to upload {file_name}: {e}")
-        except Exception as e:
-            print(f"Unexpected error uploading {file_name}: {e}")
+    manifest_path = os.path.join(seed_dir_path, S3_MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    local = local_etags(seed_dir_path, files, manifest)
+    save_manifest(manifest_path, manifest)
+    try:
+        remote = remote_etags(s3_client, bucket_name)
+    except ClientError as e:
+        print(f"Could not list bucket '{bucket_name}', uploading everything: {e}")
+        remote = {}
+
+    changed = [f for f in files if remote.get(f) != local[f]]
+    print(f"Uploading {len(changed)} of {len(files)} files to S3 bucket '{bucket_name}' "
+          f"({len(files) - len(changed)} unchanged)...")
+    if not changed:
+        return
+
+    transfer_config = TransferConfig(
+        multipart_threshold=MULTIPART_THRESHOLD,
+        multipart_chunksize=MULTIPART_CHUNKSIZE,
+        max_concurrency=4,  # parts per file; files themselves run in the pool below
+    )
+    total_bytes = sum(manifest[f]["size"] for f in changed)
+
+    def upload(file_name):
+        content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+        s3_client.upload_file(
+            os.path.join(seed_dir_path, file_name), bucket_name, file_name,
+            ExtraArgs={"ContentType": content_type}, Config=transfer_config,
+        )
+
+    start = time.perf_counter()
+    uploaded_bytes = failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(upload, f): f for f in changed}
+        for done, future in enumerate(as_completed(futures), 1):
+            file_name = futures[future]
+            try:
+                future.result()
+                uploaded_bytes += manifest[file_name]["size"]
+                print(f"[{done}/{len(changed)}] Uploaded {file_name}")
+            except ClientError as e:
+                failed += 1
+                print(f"Failed to upload {file_name}: {e}")
+            except Exception as e:
+                failed += 1
+                print(f"Unexpected error uploading {file_name}: {e}")
+
+    elapsed = time.perf_counter() - start
+    rate = uploaded_bytes / elapsed / (1024 * 1024) if elapsed else 0.0
+    print(f"Uploaded {len(changed) - failed} files ({uploaded_bytes / (1024 * 1024):.1f} of "
+          f"{total_bytes / (1024 * 1024):.1f} MiB) to '{bucket_name}' in {elapsed:.2f}s ({rate:.1f} MiB/s)")
+    if failed:
+        print(f"{failed} files failed to upload to '{bucket_name}'")
 
-    print(f"All seed files uploaded successfully to '{bucket_name}'.")
 
 def main():
     print("Starting data seeding...")
@@ -135,6 +406,9 @@ def main():
     # Add DDB tables and S3 Buckets seeding paths
     users_seed_file_path = os.path.join("/app/seed_data/dynamo_seed", "users.json")
     restaurants_seed_file_path = os.path.join("/app/seed_data/dynamo_seed", "restaurants.json")
+    restaurants_ndjson_path = os.path.join("/app/seed_data/dynamo_seed", "restaurants.ndjson")
+    if os.path.exists(restaurants_ndjson_path):  # written by scripts/fetch_yelp_restaurants.py
+        restaurants_seed_file_path = restaurants_ndjson_path
     reservations_seed_file_path = os.path.join("/app/seed_data/dynamo_seed", "reservations.json")
     user_preferences_seed_file_path = os.path.join("/app/seed_data/dynamo_seed", "user_preferences.json")
     user_favorite_cuisines_seed_file_path = os.path.join("/app/seed_data/dynamo_seed", "user_favorite_cuisine.json")
@@ -188,6 +462,7 @@ def main():
         endpoint_url=dynamo_endpoint,
         aws_access_key_id="test" if is_local else None,
         aws_secret_access_key="test" if is_local else None,
+        config=Config(max_pool_connections=max(10, SEED_WORKERS)),
     )
 
     s3 = boto3.client(
@@ -196,6 +471,7 @@ def main():
         endpoint_url=s3_endpoint,
         aws_access_key_id="test" if is_local else None,
         aws_secret_access_key="test" if is_local else None,
+        config=Config(max_pool_connections=max(10, S3_UPLOAD_WORKERS * 4)),
     )
 
     table_names = [
@@ -272,9 +548,7 @@ def main():
         holds_seed_file_path,
     ]
 
-    for table_name, path_name in zip(table_names, path_names):
-        print(f"Preparing to seed table '{table_name}' from '{path_name}'")
-        seed_dynamodb_table(dynamodb, table_name, path_name)
+    seed_dynamodb_tables(dynamodb, list(zip(table_names, path_names)))
 
     """
     # Seed DDB tables and S3 Buckets
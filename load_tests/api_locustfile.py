@@ -0,0 +1,368 @@
+"""
+Backend API suite: every endpoint in
+FoodTok_Backend/tests/api/endpoint_manifest.py, against the Django API.
+Run with `make load-test-api` (compose stack on BACKEND_HOST).
+
+  ApiBookingUser   signup -> login -> preferences -> discover ->
+                   favorite swipes -> availability -> hold -> confirm ->
+                   modify -> cancel -> change password
+  ApiBrowsingUser  weighted reads (BROWSE_WEIGHTS) as one of the accounts
+                   created in the seeding phase
+
+Requests are named with the manifest labels. When the run ends, any
+endpoint over its p95/p99 budget (API_SLOS) or failure ratio sets a
+non-zero exit code, and endpoints the run never reached are listed.
+503s shed by bcrypt admission control are failures reported as
+"<label> (shed)", and count towards their endpoint's failure ratio.
+
+Kept out of locustfile.py so LoadTestRampUp doesn't take over --users
+and --run-time.
+"""
+from locust import HttpUser, task, between, events
+from locust.runners import MasterRunner
+from datetime import date, timedelta
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "FoodTok_Backend"))
+
+from tests.api.endpoint_manifest import EXPECTED_ENDPOINTS  # noqa: E402
+
+BACKEND_HOST = os.getenv("BACKEND_HOST", "http://localhost:8080")
+API_ENDPOINTS = {spec.label: spec for spec in EXPECTED_ENDPOINTS}
+API_PASSWORD = "LoadTest!1234"
+API_SEED_USERS = int(os.getenv("API_SEED_USERS", "20"))
+API_SWIPES = int(os.getenv("API_SWIPES", "8"))  # discover cards swiped per booking flow
+API_BOOKING_DAYS = int(os.getenv("API_BOOKING_DAYS", "30"))  # bookings spread over this many days
+
+# Default budget (ms) for every endpoint; bcrypt endpoints get their own
+API_SLO_P95_MS = float(os.getenv("API_SLO_P95_MS", "500"))
+API_SLO_P99_MS = float(os.getenv("API_SLO_P99_MS", "1000"))
+API_SLO_MAX_FAILURE_RATIO = float(os.getenv("API_SLO_MAX_FAILURE_RATIO", "0.01"))
+API_SLOS = {
+    "POST /auth/signup": (1500, 3000),
+    "POST /auth/login": (1500, 3000),
+    "POST /auth/change-password": (2500, 5000),  # two bcrypt jobs
+}
+SHED_SUFFIX = " (shed)"  # stats name suffix for 503s from the bcrypt endpoints
+
+# Endpoints the booking flow walks through once per iteration
+FLOW_ENDPOINTS = (
+    "POST /auth/signup",
+    "POST /auth/login",
+    "PATCH /auth/preferences",
+    "GET /discover/<user_id>",
+    "POST /favorites",
+    "POST /favorites/check:batch",
+    "DELETE /favorites",
+    "POST /favorites:batch",
+    "POST /reservations/availability",
+    "POST /reservations/hold",
+    "GET /reservations/hold/active",
+    "POST /reservations/confirm",
+    "GET /reservations/<reservation_id>",
+    "PATCH /reservations/<reservation_id>/modify",
+    "DELETE /reservations/<reservation_id>/cancel",
+    "POST /auth/change-password",
+)
+
+# Relative task weights for ApiBrowsingUser
+BROWSE_WEIGHTS = {
+    "GET /discover/<user_id>": 10,
+    "GET /favorites/check": 8,
+    "POST /favorites/check:batch": 4,
+    "GET /favorites/<user_id>": 4,
+    "POST /reservations/availability": 3,
+    "GET /auth/profile/<user_id>": 3,
+    "GET /reservations/user/<user_id>": 3,
+    "GET /reservations/hold/active": 2,
+    "PATCH /auth/preferences": 1,
+    "GET /helloECS": 1,
+}
+
+_uncovered = set(API_ENDPOINTS) - set(FLOW_ENDPOINTS) - set(BROWSE_WEIGHTS)
+if _uncovered:
+    raise RuntimeError(f"endpoint_manifest endpoints missing from the API suite: {sorted(_uncovered)}")
+
+CUISINES = ["Italian", "Japanese", "Mexican", "Chinese", "Indian", "Thai", "American", "French", "Korean"]
+SEEDED_USERS = []  # [{"id", "email"}], filled in by seed_api_users
+SEEDED_RESTAURANTS = []
+
+
+def random_preferences():
+    return {"cuisineTypes": random.sample(CUISINES, 2), "priceRange": random.choice(["$", "$$", "$$$"])}
+
+
+def booking_date():
+    return (date.today() + timedelta(days=random.randint(1, API_BOOKING_DAYS))).isoformat()
+
+
+class ApiUser(HttpUser):
+    abstract = True
+    host = BACKEND_HOST
+
+    def call(self, label, path, expect=(200, 201), **kwargs):
+        """
+        One request to a manifest endpoint, reported under its label.
+        Returns the JSON body, or None if the status wasn't expected.
+        """
+        spec = API_ENDPOINTS[label]
+        with self.client.request(spec.method, f"/api{path}", name=label, catch_response=True, **kwargs) as response:
+            if response.status_code in expect:
+                response.success()
+                return response.json()
+            if response.status_code == 503 and label in API_SLOS:
+                # bcrypt admission control shedding load (see LoginStormUser).
+                # Still a failure, but kept apart so the fast 503s don't
+                # flatter the endpoint's latency percentiles
+                response.request_meta["name"] = label + SHED_SUFFIX
+            response.failure(f"{response.status_code}: {response.text[:200]}")
+            return None
+
+
+class ApiBookingUser(ApiUser):
+    weight = 1
+    wait_time = between(0.5, 1.5)
+
+    @task
+    def booking_flow(self):
+        email = f"loadtest+{uuid.uuid4().hex}@example.com"
+        body = self.call("POST /auth/signup", "/auth/signup", expect=(201,), json={
+            "email": email,
+            "password": API_PASSWORD,
+            "firstName": "Load",
+            "lastName": "Tester",
+        })
+        if not body:
+            return
+        user_id = body["user"]["id"]
+        self.call("POST /auth/login", "/auth/login", json={"email": email, "password": API_PASSWORD})
+        self.call("PATCH /auth/preferences", "/auth/preferences",
+                  json={"userId": user_id, "preferences": random_preferences()})
+        self.wait()
+
+        liked = self.swipe(user_id)
+        self.wait()
+
+        restaurant_id = liked[0] if liked else random.choice(SEEDED_RESTAURANTS or ["rest_1"])
+        if self.book(user_id, restaurant_id):
+            self.call("POST /auth/change-password", "/auth/change-password", json={
+                "userId": user_id,
+                "currentPassword": API_PASSWORD,
+                "newPassword": API_PASSWORD + "2",
+            })
+
+    def swipe(self, user_id):
+        """Swipe through the discover feed; returns the restaurants still favorited."""
+        feed = self.call("GET /discover/<user_id>", f"/discover/{user_id}", params={"limit": API_SWIPES})
+        cards = (feed or {}).get("restaurants", [])
+        liked = []
+        for card in cards:
+            if random.random() < 0.4:
+                self.call("POST /favorites", "/favorites", json={
+                    "userId": user_id,
+                    "restaurantId": card["id"],
+                    "restaurantName": card.get("name", card["id"]),
+                    "matchScore": card.get("matchScore", 0),
+                })
+                liked.append(card["id"])
+        if cards:
+            self.call("POST /favorites/check:batch", "/favorites/check:batch",
+                      json={"userId": user_id, "restaurantIds": [card["id"] for card in cards]})
+        if len(liked) > 1:
+            # change of heart on the last one
+            self.call("DELETE /favorites", "/favorites", params={"userId": user_id, "restaurantId": liked.pop()})
+        saved = [{"restaurantId": rid, "restaurantName": rid, "matchScore": 50}
+                 for rid in random.sample(SEEDED_RESTAURANTS, min(2, len(SEEDED_RESTAURANTS)))]
+        if saved:
+            self.call("POST /favorites:batch", "/favorites:batch", json={"userId": user_id, "add": saved})
+        return liked
+
+    def book(self, user_id, restaurant_id):
+        """availability -> hold -> confirm -> view -> modify -> cancel; False if it stopped early."""
+        party_size = random.randint(2, 4)
+        day = booking_date()
+        body = self.call("POST /reservations/availability", "/reservations/availability",
+                         json={"restaurantId": restaurant_id, "date": day, "partySize": party_size})
+        slots = [s["time"] for s in (body or {}).get("availableSlots", []) if s["remainingCapacity"] >= party_size]
+        if not slots:
+            return False
+        slot = random.choice(slots)
+        body = self.call("POST /reservations/hold", "/reservations/hold", json={
+            "userId": user_id,
+            "restaurantId": restaurant_id,
+            "date": day,
+            "time": slot,
+            "partySize": party_size,
+        })
+        if not body:
+            return False
+        hold_id = body["hold"]["holdId"]
+        self.call("GET /reservations/hold/active", "/reservations/hold/active", params={"userId": user_id})
+        self.wait()
+
+        body = self.call("POST /reservations/confirm", "/reservations/confirm",
+                         json={"holdId": hold_id, "userId": user_id, "paymentMethod": "card_api_1111"},
+                         headers={"Idempotency-Key": uuid.uuid4().hex})
+        if not body:
+            return False
+        reservation_id = body["reservation"]["reservationId"]
+        self.call("GET /reservations/<reservation_id>", f"/reservations/{reservation_id}")
+        self.wait()
+
+        other_slots = [s for s in slots if s != slot]
+        if other_slots:
+            self.call("PATCH /reservations/<reservation_id>/modify", f"/reservations/{reservation_id}/modify",
+                      json={"userId": user_id, "time": random.choice(other_slots)})
+        self.call("DELETE /reservations/<reservation_id>/cancel", f"/reservations/{reservation_id}/cancel",
+                  json={"userId": user_id})
+        return True
+
+
+class ApiBrowsingUser(ApiUser):
+    weight = 4
+    wait_time = between(0.2, 1)
+
+    def on_start(self):
+        self.user_id = random.choice(SEEDED_USERS)["id"] if SEEDED_USERS else f"user_{uuid.uuid4().hex[:8]}"
+        self.cursor = None
+
+    def restaurant_ids(self, count):
+        return random.sample(SEEDED_RESTAURANTS, min(count, len(SEEDED_RESTAURANTS))) or ["rest_1"]
+
+    @task(BROWSE_WEIGHTS["GET /discover/<user_id>"])
+    def discover(self):
+        params = {"limit": 10}
+        if self.cursor:
+            params["cursor"] = self.cursor
+        body = self.call("GET /discover/<user_id>", f"/discover/{self.user_id}", params=params)
+        self.cursor = (body or {}).get("nextCursor")
+
+    @task(BROWSE_WEIGHTS["GET /favorites/check"])
+    def check_favorite(self):
+        self.call("GET /favorites/check", "/favorites/check",
+                  params={"userId": self.user_id, "restaurantId": self.restaurant_ids(1)[0]})
+
+    @task(BROWSE_WEIGHTS["POST /favorites/check:batch"])
+    def check_favorites_batch(self):
+        self.call("POST /favorites/check:batch", "/favorites/check:batch",
+                  json={"userId": self.user_id, "restaurantIds": self.restaurant_ids(20)})
+
+    @task(BROWSE_WEIGHTS["GET /favorites/<user_id>"])
+    def list_favorites(self):
+        self.call("GET /favorites/<user_id>", f"/favorites/{self.user_id}")
+
+    @task(BROWSE_WEIGHTS["POST /reservations/availability"])
+    def availability(self):
+        self.call("POST /reservations/availability", "/reservations/availability",
+                  json={"restaurantId": self.restaurant_ids(1)[0], "date": booking_date(), "partySize": 2})
+
+    @task(BROWSE_WEIGHTS["GET /auth/profile/<user_id>"])
+    def profile(self):
+        self.call("GET /auth/profile/<user_id>", f"/auth/profile/{self.user_id}")
+
+    @task(BROWSE_WEIGHTS["GET /reservations/user/<user_id>"])
+    def user_reservations(self):
+        self.call("GET /reservations/user/<user_id>", f"/reservations/user/{self.user_id}")
+
+    @task(BROWSE_WEIGHTS["GET /reservations/hold/active"])
+    def active_hold(self):
+        self.call("GET /reservations/hold/active", "/reservations/hold/active", params={"userId": self.user_id})
+
+    @task(BROWSE_WEIGHTS["PATCH /auth/preferences"])
+    def update_preferences(self):
+        self.call("PATCH /auth/preferences", "/auth/preferences",
+                  json={"userId": self.user_id, "preferences": random_preferences()})
+        self.cursor = None
+
+    @task(BROWSE_WEIGHTS["GET /helloECS"])
+    def health(self):
+        self.call("GET /helloECS", "/helloECS")
+
+
+@events.test_start.add_listener
+def seed_api_users(environment, **kwargs):
+    """
+    Seeding phase: sign up API_SEED_USERS accounts with preferences and a
+    few favorites before any simulated user starts, and collect restaurant
+    ids from their feeds. Runs on each worker (or the local runner), outside
+    the stats.
+    """
+    if isinstance(environment.runner, MasterRunner):
+        return
+    base_url = f"{(environment.host or BACKEND_HOST).rstrip('/')}/api"
+    session = requests.Session()
+    restaurants = set()
+    start = time.perf_counter()
+    for _ in range(API_SEED_USERS):
+        email = f"loadseed+{uuid.uuid4().hex}@example.com"
+        try:
+            response = session.post(f"{base_url}/auth/signup", json={
+                "email": email,
+                "password": API_PASSWORD,
+                "firstName": "Seed",
+                "lastName": "User",
+            }, timeout=30)
+            if response.status_code != 201:
+                logging.warning("Seeding signup failed with %s: %s", response.status_code, response.text[:200])
+                continue
+            user_id = response.json()["user"]["id"]
+            session.patch(f"{base_url}/auth/preferences",
+                          json={"userId": user_id, "preferences": random_preferences()}, timeout=30)
+            feed = session.get(f"{base_url}/discover/{user_id}", params={"limit": 20}, timeout=30)
+            ids = [r["id"] for r in feed.json().get("restaurants", [])] if feed.ok else []
+            if ids:
+                session.post(f"{base_url}/favorites:batch", json={
+                    "userId": user_id,
+                    "add": [{"restaurantId": rid, "restaurantName": rid, "matchScore": 50}
+                            for rid in random.sample(ids, min(5, len(ids)))],
+                }, timeout=30)
+        except requests.RequestException as e:
+            logging.warning("Seeding request failed: %s", e)
+            continue
+        restaurants.update(ids)
+        SEEDED_USERS.append({"id": user_id, "email": email})
+    SEEDED_RESTAURANTS[:] = sorted(restaurants) or [f"rest_{i}" for i in range(1, 51)]
+    logging.info("Seeded %d users and %d restaurants in %.1fs",
+                 len(SEEDED_USERS), len(restaurants), time.perf_counter() - start)
+
+
+@events.quitting.add_listener
+def check_api_slos(environment, **kwargs):
+    """Fail the run (exit code 1) if any manifest endpoint missed its SLO."""
+    if environment.parsed_options and environment.parsed_options.worker:
+        return  # the master has the aggregated stats
+    breaches, unreached = [], []
+    for spec in EXPECTED_ENDPOINTS:
+        entry = environment.stats.entries.get((spec.label, spec.method))
+        shed = environment.stats.entries.get((spec.label + SHED_SUFFIX, spec.method))
+        served = entry.num_requests if entry is not None else 0
+        shed_count = shed.num_requests if shed is not None else 0
+        if served + shed_count == 0:
+            unreached.append(spec.label)
+            continue
+        if served:
+            p95_budget, p99_budget = API_SLOS.get(spec.label, (API_SLO_P95_MS, API_SLO_P99_MS))
+            p95 = entry.get_response_time_percentile(0.95)
+            p99 = entry.get_response_time_percentile(0.99)
+            if p95 > p95_budget:
+                breaches.append(f"{spec.label}: p95 {p95:.0f} ms > {p95_budget:.0f} ms")
+            if p99 > p99_budget:
+                breaches.append(f"{spec.label}: p99 {p99:.0f} ms > {p99_budget:.0f} ms")
+        fail_ratio = ((entry.num_failures if served else 0) + shed_count) / (served + shed_count)
+        if fail_ratio > API_SLO_MAX_FAILURE_RATIO:
+            breaches.append(f"{spec.label}: {fail_ratio:.1%} failed > {API_SLO_MAX_FAILURE_RATIO:.1%}"
+                            + (f" ({shed_count} shed)" if shed_count else ""))
+    if unreached:
+        logging.warning("Endpoints never reached: %s", ", ".join(unreached))
+    if breaches:
+        logging.error("SLO breaches:\n  %s", "\n  ".join(breaches))
+        environment.process_exit_code = 1
+    else:
+        logging.info("All %d reached endpoints within SLO", len(EXPECTED_ENDPOINTS) - len(unreached))
@@ -1,6 +1,8 @@
 from locust import HttpUser, task, between, LoadTestShape
 import logging
+import os
 import random
+import uuid
 
 logging.basicConfig(level=logging.DEBUG)
 
@@ -45,6 +47,60 @@ class FrontendUser(HttpUser):
         self.client.get("/settings", name="GET /settings")
 
 
+# ---------------------------------------------------------------
+# Backend login storm: bcrypt-heavy logins alongside cheap reads.
+# Run with `make load-test-login-storm`; /favorites/check p99 should
+# stay flat while the login rate climbs (hashing runs in its own pool
+# and sheds load with 503s instead of starving request threads).
+# ---------------------------------------------------------------
+BACKEND_HOST = os.getenv("BACKEND_HOST", "http://localhost:8080")
+STORM_PASSWORD = "Storm!1234"
+
+
+class LoginStormUser(HttpUser):
+    host = BACKEND_HOST
+    weight = 3
+    wait_time = between(0.05, 0.2)
+
+    def on_start(self):
+        self.email = f"storm+{uuid.uuid4().hex}@example.com"
+        self.client.post("/api/auth/signup", json={
+            "email": self.email,
+            "password": STORM_PASSWORD,
+            "firstName": "Storm",
+            "lastName": "User",
+        }, name="POST /api/auth/signup")
+
+    @task
+    def login(self):
+        with self.client.post(
+            "/api/auth/login",
+            json={"email": self.email, "password": STORM_PASSWORD},
+            name="POST /api/auth/login",
+            catch_response=True,
+        ) as response:
+            # 503 + Retry-After is the admission control working, not a failure
+            if response.status_code == 503:
+                response.success()
+
+
+class FavoritesCheckUser(HttpUser):
+    host = BACKEND_HOST
+    weight = 1
+    wait_time = between(0.1, 0.3)
+
+    def on_start(self):
+        self.user_id = f"user_{uuid.uuid4().hex[:8]}"
+
+    @task
+    def check_favorite(self):
+        self.client.get(
+            "/api/favorites/check",
+            params={"userId": self.user_id, "restaurantId": f"rest_{random.randint(1, 50)}"},
+            name="GET /api/favorites/check",
+        )
+
+
 class LoadTestRampUp(LoadTestShape):
     """
     Ramps up from 1 to 200 users over 60 seconds, holds for 120 seconds.
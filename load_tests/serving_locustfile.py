@@ -0,0 +1,45 @@
+"""
+Serving throughput: runserver vs gunicorn/uvicorn. Start the stack in one
+mode and run `make load-test-serving`, e.g.
+
+    SERVER_MODE=gunicorn make backend-up && make load-test-serving SERVER_MODE=gunicorn
+
+then compare load_tests/results_serving_<mode>_stats.csv across modes. No
+think time, so requests/s is what the server sustains.
+
+Kept out of locustfile.py so LoadTestRampUp doesn't take over --users and
+--run-time.
+"""
+from locust import HttpUser, task, constant
+import os
+import random
+import uuid
+
+BACKEND_HOST = os.getenv("BACKEND_HOST", "http://localhost:8080")
+
+
+class ServingThroughputUser(HttpUser):
+    host = BACKEND_HOST
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.user_id = f"user_{uuid.uuid4().hex[:8]}"
+
+    @task(2)
+    def health(self):
+        # framework/server overhead only
+        self.client.get("/api/helloECS", name="GET /api/helloECS")
+
+    @task(3)
+    def check_favorite(self):
+        # one DynamoDB read
+        self.client.get(
+            "/api/favorites/check",
+            params={"userId": self.user_id, "restaurantId": f"rest_{random.randint(1, 50)}"},
+            name="GET /api/favorites/check",
+        )
+
+    @task(1)
+    def user_reservations(self):
+        # one GSI query
+        self.client.get(f"/api/reservations/user/{self.user_id}", name="GET /api/reservations/user/<id>")